@@ -0,0 +1,78 @@
+# ice_aktarim_benchmark.py
+# Toplu içe aktarım hızı: ice_aktarim.ice_aktar ile alış, üretim ve satış dosyalarının
+# doğrulanıp yüklenmesi (satır/sn).
+#
+# Kullanım (db_config.ini'nin bulunduğu klasörden):
+#     python benchmarks/ice_aktarim_benchmark.py [dosya_basina_satir]
+#
+# Test verisi BENCH_ önekli ürün ve malzemelerle geçici klasördeki CSV dosyalarına yazılır;
+# yüklenen kayıtlar sonunda silinir.
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ice_aktarim
+from veritabani import DatabaseManager
+
+ONEK = "BENCH_"
+URUN = ONEK + "URUN"
+MALZEMELER = [f"{ONEK}M{i}" for i in range(5)]
+
+
+def dosyalari_olustur(klasor, satir_sayisi):
+    """Günlük biçiminde reçete, alış, üretim ve satış dosyaları yaz"""
+    tarihler = pd.date_range("2015-01-01", periods=satir_sayisi, freq="h").strftime("%Y-%m-%d")
+    pd.DataFrame({'Urun': URUN, 'Malzeme': MALZEMELER, 'Yuzde': 20}).to_csv(
+        os.path.join(klasor, "Urun_Receteleri.csv"), index=False)
+    pd.DataFrame({'Tarih': tarihler,
+                  'Malzeme': [MALZEMELER[i % len(MALZEMELER)] for i in range(satir_sayisi)],
+                  'Miktar (kg)': 100, 'Birim Fiyat': 12.5, 'Toplam Tutar': 1250}).to_csv(
+        os.path.join(klasor, "Alislar.csv"), index=False)
+    pd.DataFrame({'Tarih': tarihler, 'Urun': URUN, 'Gramaj (kg)': 50}).to_csv(
+        os.path.join(klasor, "Uretimler.csv"), index=False)
+    pd.DataFrame({'Tarih': tarihler, 'Urun': URUN, 'Musteri': "Musteri", 'Miktar (kg)': 50,
+                  'Birim Fiyat': 30, 'Toplam Satis': 1500, 'Net Kar': 200}).to_csv(
+        os.path.join(klasor, "Satislar.csv"), index=False)
+    return [os.path.join(klasor, ad) for ad in sorted(os.listdir(klasor))]
+
+
+def temizle(db):
+    """Benchmark verilerini sil"""
+    for tablo, sutun in (('alislar', 'malzeme'), ('stok', 'malzeme'), ('urunler', 'urun'),
+                         ('uretimler', 'urun'), ('satislar', 'urun'), ('stok_hareketleri', 'malzeme'),
+                         ('maliyet_gecmisi', 'malzeme'), ('maliyet_lotlari', 'malzeme'),
+                         ('malzeme_maliyetleri', 'malzeme')):
+        db.execute_query(f"DELETE FROM {tablo} WHERE {sutun} LIKE %s", [ONEK + '%'])
+
+
+def main():
+    satir_sayisi = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    db = DatabaseManager()
+    klasor = tempfile.mkdtemp(prefix="ice_aktarim_bench_")
+
+    try:
+        temizle(db)
+        dosyalar = dosyalari_olustur(klasor, satir_sayisi)
+
+        baslangic = time.perf_counter()
+        satir_sayilari = ice_aktarim.ice_aktar(db, dosyalar)
+        sure = time.perf_counter() - baslangic
+
+        toplam = sum(satir_sayilari.values())
+        print(f"{toplam} kayıt ({', '.join(f'{k}: {v}' for k, v in satir_sayilari.items())})")
+        print(f"  süre  : {sure:7.2f} sn")
+        print(f"  hız   : {toplam / sure:9.0f} satır/sn")
+    finally:
+        temizle(db)
+        db.close()
+        shutil.rmtree(klasor, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
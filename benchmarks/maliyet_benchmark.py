@@ -0,0 +1,128 @@
+# maliyet_benchmark.py
+# Satış maliyetlendirmesi: eski "son alış fiyatı" sorgusu (malzeme başına alislar'da LATERAL arama)
+# ile malzeme_maliyetleri birincil anahtar okuması karşılaştırması; ayrıca geçmiş net kârların
+# toplu yeniden hesaplanma süresi. Eski sorgunun indeksi (idx_alislar_malzeme_tarih) göç 10'da
+# kaldırıldığı için ölçüm süresince aynı tanımla geçici olarak yeniden oluşturulur.
+#
+# Kullanım (db_config.ini'nin bulunduğu klasörden):
+#     python benchmarks/maliyet_benchmark.py [tekrar_sayisi]
+#
+# Test verisi BENCH_ önekli ürün ve malzemelerle oluşturulur ve sonunda silinir.
+import os
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from veritabani import DatabaseManager
+
+ONEK = "BENCH_"
+ALIS_SAYISI = 200
+SATIS_SAYISI = 20000
+
+ESKI_RECETE_MALIYETI_SORGUSU = """
+    SELECT r.malzeme,
+           %(miktar)s * r.oran AS gereken_miktar,
+           a.birim_fiyat,
+           %(miktar)s * r.oran * a.birim_fiyat AS maliyet
+    FROM unnest(%(malzemeler)s::varchar[], %(oranlar)s::numeric[])
+         WITH ORDINALITY AS r(malzeme, oran, sira)
+    LEFT JOIN LATERAL (
+        SELECT birim_fiyat
+        FROM alislar
+        WHERE malzeme = r.malzeme
+        ORDER BY tarih DESC, id DESC
+        LIMIT 1
+    ) a ON TRUE
+    ORDER BY r.sira
+"""
+
+# Eski sorgunun kullandığı, göç 10'da kaldırılan indeks
+ESKI_INDEKS = "bench_alislar_malzeme_tarih"
+
+
+def temizle(db):
+    """Benchmark verilerini sil"""
+    for tablo, sutun in (('satislar', 'urun'), ('urunler', 'urun'), ('alislar', 'malzeme'),
+                         ('stok', 'malzeme'), ('stok_hareketleri', 'malzeme'),
+                         ('maliyet_gecmisi', 'malzeme'), ('maliyet_lotlari', 'malzeme'),
+                         ('malzeme_maliyetleri', 'malzeme')):
+        db.execute_query(f"DELETE FROM {tablo} WHERE {sutun} LIKE %s", [ONEK + '%'])
+
+
+def hazirla(db, malzeme_sayisi):
+    """malzeme_sayisi malzemeli reçete, malzeme başına ALIS_SAYISI alış ve geçmiş satışlar"""
+    urun = f"{ONEK}URUN_{malzeme_sayisi}"
+    yuzde = (Decimal('100') / malzeme_sayisi).quantize(Decimal('0.01'))
+    malzemeler = [f"{ONEK}M{malzeme_sayisi}_{i:02d}" for i in range(malzeme_sayisi)]
+    db.insert_many('urunler', [{'urun': urun, 'malzeme': m, 'yuzde': yuzde} for m in malzemeler])
+    for i in range(ALIS_SAYISI):
+        for m in malzemeler:
+            fiyat = Decimal(10 + i % 7)
+            db.stoklu_kaydet('alislar', {'malzeme': m, 'miktar_kg': 100, 'birim_fiyat': fiyat,
+                                         'toplam_tutar': 100 * fiyat, 'tarih': '2024-01-01'}, m, 100)
+    db.execute_query("""
+        INSERT INTO satislar (urun, musteri, miktar_kg, satis_fiyat, toplam_satis, net_kar, tarih)
+        SELECT %s, 'BENCH', 10, 30, 300, 0, CURRENT_DATE - (g %% 365)
+        FROM generate_series(1, %s) g
+    """, [urun, SATIS_SAYISI])
+    db.receteler.gecersiz_kil()
+    return urun
+
+
+def olc(fonksiyon, tekrar):
+    """fonksiyon() çağrılarının milisaniye cinsinden sürelerini ölç"""
+    sureler = []
+    for _ in range(tekrar):
+        baslangic = time.perf_counter()
+        fonksiyon()
+        sureler.append((time.perf_counter() - baslangic) * 1000)
+    return sureler
+
+
+def ozet(sureler):
+    sirali = sorted(sureler)
+    p95 = sirali[min(len(sirali) - 1, int(len(sirali) * 0.95))]
+    return f"ort {statistics.mean(sureler):7.2f} ms | medyan {statistics.median(sureler):7.2f} ms | p95 {p95:7.2f} ms"
+
+
+def main():
+    tekrar = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    db = DatabaseManager()
+    miktar = Decimal('10')
+
+    try:
+        temizle(db)
+        db.execute_query(f"CREATE INDEX IF NOT EXISTS {ESKI_INDEKS} ON alislar (malzeme, tarih DESC, id DESC)")
+        for malzeme_sayisi in (5, 20):
+            urun = hazirla(db, malzeme_sayisi)
+            params = {'miktar': miktar}
+            params.update(db.receteler.getir(urun))
+
+            # Isınma
+            db.fetch_all(ESKI_RECETE_MALIYETI_SORGUSU, params)
+            db.recete_maliyeti(urun, miktar)
+
+            eski = olc(lambda: db.fetch_all(ESKI_RECETE_MALIYETI_SORGUSU, params), tekrar)
+            yeni = olc(lambda: db.recete_maliyeti(urun, miktar), tekrar)
+
+            print(f"{malzeme_sayisi} malzemeli reçete, malzeme başına {ALIS_SAYISI} alış, {tekrar} tekrar")
+            print(f"  son alış fiyatı : {ozet(eski)}")
+            print(f"  recete_maliyeti : {ozet(yeni)}")
+            print(f"  hızlanma        : {statistics.median(eski) / statistics.median(yeni):.1f}x")
+
+        for yontem in ('fifo', 'ortalama'):
+            baslangic = time.perf_counter()
+            degisen = db.net_kar_yeniden_hesapla(yontem)
+            sure = time.perf_counter() - baslangic
+            print(f"net_kar_yeniden_hesapla({yontem}): {degisen} satış, {sure:.2f} sn")
+    finally:
+        db.execute_query(f"DROP INDEX IF EXISTS {ESKI_INDEKS}")
+        temizle(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
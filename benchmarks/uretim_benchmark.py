@@ -0,0 +1,112 @@
+# uretim_benchmark.py
+# Üretim kaydı gecikmesi: eski malzeme başına SELECT/UPDATE döngüsü ile
+# DatabaseManager.uretim_kaydet tek sorgu yolunun karşılaştırması.
+#
+# Kullanım (db_config.ini'nin bulunduğu klasörden):
+#     python benchmarks/uretim_benchmark.py [tekrar_sayisi]
+#
+# Test verisi BENCH_ önekli ürün ve malzemelerle oluşturulur ve sonunda silinir.
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from veritabani import DatabaseManager
+
+ONEK = "BENCH_"
+
+
+def eski_uretim(db, urun, gramaj, tarih):
+    """Eski uretim_yap akışı: reçete + malzeme başına SELECT ve UPDATE + INSERT"""
+    recete = db.fetch_all("SELECT * FROM urunler WHERE urun = %s", [urun])
+    if not recete:
+        raise ValueError("Bu ürün için reçete tanımı yok.")
+
+    for row in recete:
+        malzeme = row['malzeme']
+        oran = Decimal(str(row['yuzde'])) / Decimal('100')
+        gereken = gramaj * oran
+
+        stok_row = db.fetch_one("SELECT * FROM stok WHERE malzeme = %s", [malzeme])
+        if not stok_row:
+            raise ValueError(f"{malzeme} stokta yok.")
+
+        mevcut = Decimal(str(stok_row['miktar_kg']))
+        if mevcut < gereken:
+            raise ValueError(f"{malzeme} için yeterli stok yok.")
+
+        db.update('stok',
+                  {'miktar_kg': mevcut - gereken, 'updated_at': datetime.now()},
+                  'malzeme = %s', [malzeme])
+
+    db.insert('uretimler', {'urun': urun, 'gramaj_kg': gramaj, 'tarih': tarih})
+
+
+def temizle(db):
+    """Benchmark verilerini sil"""
+    db.execute_query("DELETE FROM uretimler WHERE urun LIKE %s", [ONEK + '%'])
+    db.execute_query("DELETE FROM urunler WHERE urun LIKE %s", [ONEK + '%'])
+    db.execute_query("DELETE FROM stok WHERE malzeme LIKE %s", [ONEK + '%'])
+    for tablo in ('stok_hareketleri', 'maliyet_gecmisi', 'maliyet_lotlari', 'malzeme_maliyetleri'):
+        db.execute_query(f"DELETE FROM {tablo} WHERE malzeme LIKE %s", [ONEK + '%'])
+
+
+def hazirla(db, malzeme_sayisi):
+    """malzeme_sayisi malzemeli bir reçete ve bol stok oluştur"""
+    urun = f"{ONEK}URUN_{malzeme_sayisi}"
+    yuzde = (Decimal('100') / malzeme_sayisi).quantize(Decimal('0.01'))
+    malzemeler = [f"{ONEK}M{malzeme_sayisi}_{i:02d}" for i in range(malzeme_sayisi)]
+    db.insert_many('stok', [{'malzeme': m, 'miktar_kg': Decimal('99999999')} for m in malzemeler])
+    db.insert_many('urunler', [{'urun': urun, 'malzeme': m, 'yuzde': yuzde} for m in malzemeler])
+    return urun
+
+
+def olc(fonksiyon, tekrar):
+    """fonksiyon() çağrılarının milisaniye cinsinden sürelerini ölç"""
+    sureler = []
+    for _ in range(tekrar):
+        baslangic = time.perf_counter()
+        fonksiyon()
+        sureler.append((time.perf_counter() - baslangic) * 1000)
+    return sureler
+
+
+def ozet(sureler):
+    sirali = sorted(sureler)
+    p95 = sirali[min(len(sirali) - 1, int(len(sirali) * 0.95))]
+    return f"ort {statistics.mean(sureler):7.2f} ms | medyan {statistics.median(sureler):7.2f} ms | p95 {p95:7.2f} ms"
+
+
+def main():
+    tekrar = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    db = DatabaseManager()
+    tarih = datetime.now().date()
+    gramaj = Decimal('10')
+
+    try:
+        temizle(db)
+        for malzeme_sayisi in (5, 20):
+            urun = hazirla(db, malzeme_sayisi)
+
+            # Isınma
+            eski_uretim(db, urun, gramaj, tarih)
+            db.uretim_kaydet(urun, gramaj, tarih)
+
+            eski = olc(lambda: eski_uretim(db, urun, gramaj, tarih), tekrar)
+            yeni = olc(lambda: db.uretim_kaydet(urun, gramaj, tarih), tekrar)
+
+            print(f"{malzeme_sayisi} malzemeli reçete, {tekrar} tekrar")
+            print(f"  eski döngü    : {ozet(eski)}")
+            print(f"  uretim_kaydet : {ozet(yeni)}")
+            print(f"  hızlanma      : {statistics.median(eski) / statistics.median(yeni):.1f}x")
+    finally:
+        temizle(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
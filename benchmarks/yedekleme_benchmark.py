@@ -0,0 +1,99 @@
+# yedekleme_benchmark.py
+# Veritabanı yedeklemesi: eski SELECT * -> DataFrame -> to_csv yolu ile
+# yedekleme.yedek_al COPY yolunun süre, Python bellek tepe noktası ve dosya boyutu karşılaştırması.
+#
+# Kullanım (db_config.ini'nin bulunduğu klasörden):
+#     python benchmarks/yedekleme_benchmark.py [satir_sayisi]
+#
+# Test verisi BENCH_ önekli alış satırlarıyla oluşturulur ve sonunda silinir. Yedekler geçici
+# klasörlere yazılır; geri yükleme veritabanını değiştireceği için burada ölçülmez.
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+from psycopg2.extras import RealDictCursor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yedekleme
+from veritabani import DatabaseManager
+
+ONEK = "BENCH_"
+
+
+def eski_yedek(db, klasor):
+    """Eski veritabani_yedekle akışı: tablo başına SELECT *, DataFrame ve to_csv"""
+    for table in yedekleme.YEDEK_TABLOLARI:
+        with db.baglanti() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(f"SELECT * FROM {table}")
+                data = cursor.fetchall()
+        if data:
+            df = pd.DataFrame(data)
+            df.to_csv(f"{klasor}/{table}.csv", index=False, encoding='utf-8')
+
+
+def yeni_yedek(db, klasor):
+    yedekleme.yedek_al(db, klasor)
+
+
+def temizle(db):
+    """Benchmark verilerini sil"""
+    db.execute_query("DELETE FROM alislar WHERE malzeme LIKE %s", [ONEK + '%'])
+
+
+def hazirla(db, satir_sayisi):
+    db.execute_query("""
+        INSERT INTO alislar (malzeme, miktar_kg, birim_fiyat, toplam_tutar, tarih)
+        SELECT %s || (g %% 50), g %% 1000 + 1, 12.5, (g %% 1000 + 1) * 12.5, CURRENT_DATE - (g %% 3650)
+        FROM generate_series(1, %s) g
+    """, [ONEK, satir_sayisi])
+
+
+def olc(fonksiyon, db):
+    """fonksiyon(db, klasor) için süre (sn), Python bellek tepe noktası (MB) ve yazılan bayt"""
+    klasor = tempfile.mkdtemp(prefix="yedek_bench_")
+    try:
+        tracemalloc.start()
+        baslangic = time.perf_counter()
+        fonksiyon(db, klasor)
+        sure = time.perf_counter() - baslangic
+        _, tepe = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        boyut = sum(os.path.getsize(os.path.join(kok, ad))
+                    for kok, _, adlar in os.walk(klasor) for ad in adlar)
+        return sure, tepe / (1024 * 1024), boyut / (1024 * 1024)
+    finally:
+        shutil.rmtree(klasor, ignore_errors=True)
+
+
+def main():
+    satir_sayisi = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    db = DatabaseManager()
+
+    try:
+        temizle(db)
+        hazirla(db, satir_sayisi)
+
+        # Isınma
+        olc(yeni_yedek, db)
+
+        eski = olc(eski_yedek, db)
+        yeni = olc(yeni_yedek, db)
+
+        print(f"alislar tablosuna {satir_sayisi} satır eklendi")
+        for ad, (sure, tepe, boyut) in (("pandas to_csv", eski), ("COPY + gzip", yeni)):
+            print(f"  {ad:14}: {sure:7.2f} sn | bellek tepe {tepe:8.1f} MB | dosya {boyut:7.1f} MB")
+        print(f"  hızlanma      : {eski[0] / yeni[0]:.1f}x")
+    finally:
+        temizle(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,323 +1,81 @@
-import psycopg2
-import pandas as pd
-from datetime import datetime
+# === AÇILIŞ PROFİLİ ===
+# --profile-startup ile başlatılırsa açılış aşamalarının süreleri konsola yazdırılır.
+# pandas ve openpyxl yalnızca içe aktarım/rapor/Excel yazımı sırasında yüklenir.
+import sys
+import time
+
+ACILIS_PROFILI = "--profile-startup" in sys.argv
+_acilis_baslangici = time.perf_counter()
+_son_asama = _acilis_baslangici
+acilis_asamalari = []
+
+def acilis_asamasi(ad, alt=None):
+    """Önceki aşamadan bu yana geçen süreyi kaydet; alt: {alt aşama: saniye}"""
+    global _son_asama
+    simdi = time.perf_counter()
+    acilis_asamalari.append((ad, simdi - _son_asama, alt or {}))
+    _son_asama = simdi
+
 import tkinter as tk
-from tkinter import ttk, messagebox
-from psycopg2.extras import RealDictCursor
-import configparser
+from tkinter import ttk, messagebox, filedialog
+acilis_asamasi("tkinter")
+
+from datetime import datetime
 import os
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+import excel_gunluk
+import islemler
+import yedekleme
+import ice_aktarim
+from veritabani import DatabaseConfig, DatabaseManager, RECETE_MALIYETI_SORGUSU, FIFO_RECETE_MALIYETI_SORGUSU
+acilis_asamasi("uygulama modülleri")
 
 # === EXCEL KAYIT FONKSİYONLARI ===
+# Kayıtlar arka planda günlüklere yazılır; Excel dosyaları bu aralıkla, klasör açılırken
+# ve kapanışta günlüklerden üretilir. Yazma hataları arayüze bildirilir (milisaniye)
+EXCEL_YENILEME_ARALIGI_MS = 10 * 60 * 1000
+EXCEL_HATA_KONTROL_MS = 1000
+
+excel_yazici = excel_gunluk.ExcelYazici(toplu_boyut=50, bosta_bekleme=2.0)
+excel_yazici.start()
+acilis_asamasi("Excel yazıcısı")
+
 def excel_kayit_olustur(islem_tipi, veri_dict):
-    """Her işlem için otomatik Excel kaydı oluşturur"""
+    """Her işlem için otomatik Excel kaydı oluşturur (arka plan yazıcısına iletir)"""
     try:
-        # Kayıt klasörünü oluştur
-        kayit_klasoru = "excel_kayitlari"
-        os.makedirs(kayit_klasoru, exist_ok=True)
-        
-        # Dosya adını belirle
-        dosya_adi = f"{kayit_klasoru}/{islem_tipi}.xlsx"
-        
-        # Stil tanımlamaları
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # Dosya var mı kontrol et
-        if os.path.exists(dosya_adi):
-            # Mevcut dosyayı aç
-            wb = openpyxl.load_workbook(dosya_adi)
-            ws = wb.active
-        else:
-            # Yeni dosya oluştur
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = islem_tipi
-            
-            # Header'ları ekle
-            headers = list(veri_dict.keys())
-            ws.append(headers)
-            
-            # Header'ları formatla
-            for cell in ws[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                cell.border = border
-        
-        # Yeni veriyi ekle
-        ws.append(list(veri_dict.values()))
-        
-        # Son satırı formatla
-        son_satir = ws.max_row
-        for cell in ws[son_satir]:
-            cell.border = border
-        
-        # Sütun genişliklerini ayarla
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Dosyayı kaydet
-        wb.save(dosya_adi)
-        print(f"Excel kaydı oluşturuldu: {dosya_adi}")
-        
+        # Yalnızca kuyruğa ekler; asıl Excel G/Ç süresi yazıcı iş parçacığında "Excel yazıcısı" olarak ölçülür
+        excel_yazici.ekle(islem_tipi, veri_dict)
     except Exception as e:
         print(f"Excel kayıt hatası: {str(e)}")
 
-# === VERİTABANI BAĞLANTI AYARLARI ===
-class DatabaseConfig:
-    def __init__(self):
-        self.config_file = "db_config.ini"
-        self.load_config()
-    
-    def load_config(self):
-        """Konfigürasyon dosyasından veritabanı ayarlarını yükle"""
-        config = configparser.ConfigParser()
-        
-        if not os.path.exists(self.config_file):
-            self.create_default_config()
-        
-        config.read(self.config_file)
-        
-        self.host = config.get('database', 'host', fallback='localhost')
-        self.port = config.get('database', 'port', fallback='5432')
-        self.database = config.get('database', 'database', fallback='beton_takip')
-        self.username = config.get('database', 'username', fallback='postgres')
-        self.password = config.get('database', 'password', fallback='password')
-    
-    def create_default_config(self):
-        """Varsayılan konfigürasyon dosyası oluştur"""
-        config = configparser.ConfigParser()
-        config['database'] = {
-            'host': 'localhost',
-            'port': '5432',
-            'database': 'beton_takip',
-            'username': 'postgres',
-            'password': 'password'
-        }
-        
-        with open(self.config_file, 'w') as configfile:
-            config.write(configfile)
-        
-        messagebox.showinfo("Konfigürasyon", 
-            f"{self.config_file} dosyası oluşturuldu. Veritabanı bağlantı ayarlarınızı düzenleyin.")
-
-# === VERİTABANI YÖNETİCİSİ ===
-class DatabaseManager:
-    def __init__(self):
-        self.config = DatabaseConfig()
-        self.connection = None
-        self.connect()
-        self.create_tables()
-    
-    def connect(self):
-        """Veritabanına bağlan"""
-        try:
-            self.connection = psycopg2.connect(
-                host=self.config.host,
-                port=self.config.port,
-                database=self.config.database,
-                user=self.config.username,
-                password=self.config.password
-            )
-            self.connection.autocommit = True
-            print("Veritabanı bağlantısı başarılı!")
-        except Exception as e:
-            messagebox.showerror("Veritabanı Hatası", 
-                f"Veritabanına bağlanılamadı: {str(e)}\n\ndb_config.ini dosyasını kontrol edin.")
-            raise
-    
-    def create_tables(self):
-        """Gerekli tabloları oluştur"""
-        cursor = self.connection.cursor()
-        
-        # Stok tablosu
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS stok (
-                id SERIAL PRIMARY KEY,
-                malzeme VARCHAR(255) UNIQUE NOT NULL,
-                miktar_kg DECIMAL(10,2) DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Alışlar tablosu
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS alislar (
-                id SERIAL PRIMARY KEY,
-                malzeme VARCHAR(255) NOT NULL,
-                miktar_kg DECIMAL(10,2) NOT NULL,
-                birim_fiyat DECIMAL(10,2) NOT NULL,
-                toplam_tutar DECIMAL(10,2) NOT NULL,
-                tarih DATE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Ürünler tablosu (reçeteler)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS urunler (
-                id SERIAL PRIMARY KEY,
-                urun VARCHAR(255) NOT NULL,
-                malzeme VARCHAR(255) NOT NULL,
-                yuzde DECIMAL(5,2) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Üretimler tablosu
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS uretimler (
-                id SERIAL PRIMARY KEY,
-                urun VARCHAR(255) NOT NULL,
-                gramaj_kg DECIMAL(10,2) NOT NULL,
-                tarih DATE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Satışlar tablosu
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS satislar (
-                id SERIAL PRIMARY KEY,
-                urun VARCHAR(255) NOT NULL,
-                musteri VARCHAR(255) NOT NULL,
-                miktar_kg DECIMAL(10,2) NOT NULL,
-                satis_fiyat DECIMAL(10,2) NOT NULL,
-                toplam_satis DECIMAL(10,2) NOT NULL,
-                net_kar DECIMAL(10,2),
-                tarih DATE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # İade/Hurda tablosu
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS iadeler (
-                id SERIAL PRIMARY KEY,
-                tarih DATE NOT NULL,
-                tip VARCHAR(50) NOT NULL,
-                urun VARCHAR(255) NOT NULL,
-                miktar DECIMAL(10,2) NOT NULL,
-                sebep TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Taş gelir-gider tablosu
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tas_gelir_gider (
-                id SERIAL PRIMARY KEY,
-                tarih DATE NOT NULL,
-                tip VARCHAR(50) NOT NULL,
-                aciklama VARCHAR(255) NOT NULL,
-                birim VARCHAR(50),
-                birim_fiyat DECIMAL(10,2) NOT NULL,
-                miktar DECIMAL(10,2) NOT NULL,
-                toplam_tutar DECIMAL(10,2) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Beton gelir-gider tablosu
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS beton_gelir_gider (
-                id SERIAL PRIMARY KEY,
-                tarih DATE NOT NULL,
-                tip VARCHAR(50) NOT NULL,
-                aciklama VARCHAR(255) NOT NULL,
-                birim VARCHAR(50),
-                birim_fiyat DECIMAL(10,2) NOT NULL,
-                miktar DECIMAL(10,2) NOT NULL,
-                toplam_tutar DECIMAL(10,2) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        cursor.close()
-    
-    def execute_query(self, query, params=None):
-        """SQL sorgusu çalıştır"""
-        cursor = self.connection.cursor(cursor_factory=RealDictCursor)
-        cursor.execute(query, params)
-        return cursor
-    
-    def fetch_all(self, query, params=None):
-        """Tüm sonuçları getir"""
-        cursor = self.execute_query(query, params)
-        result = cursor.fetchall()
-        cursor.close()
-        return result
-    
-    def fetch_one(self, query, params=None):
-        """Tek sonuç getir"""
-        cursor = self.execute_query(query, params)
-        result = cursor.fetchone()
-        cursor.close()
-        return result
-    
-    def insert(self, table, data):
-        """Veri ekle"""
-        columns = ', '.join(data.keys())
-        placeholders = ', '.join(['%s'] * len(data))
-        query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
-        
-        cursor = self.connection.cursor()
-        cursor.execute(query, list(data.values()))
-        cursor.close()
-    
-    def update(self, table, data, where_clause, where_params):
-        """Veri güncelle"""
-        set_clause = ', '.join([f"{k} = %s" for k in data.keys()])
-        query = f"UPDATE {table} SET {set_clause} WHERE {where_clause}"
-        
-        cursor = self.connection.cursor()
-        cursor.execute(query, list(data.values()) + where_params)
-        cursor.close()
-
 # Global veritabanı yöneticisi
 db = None
 
 try:
-    db = DatabaseManager()
-except:
+    db_ayarlari = DatabaseConfig()
+    if db_ayarlari.yeni_olusturuldu:
+        messagebox.showinfo("Konfigürasyon", 
+            f"{db_ayarlari.config_file} dosyası oluşturuldu. Veritabanı bağlantı ayarlarınızı düzenleyin.")
+    db = DatabaseManager(db_ayarlari)
+except Exception as e:
+    messagebox.showerror("Veritabanı Hatası", 
+        f"Veritabanına bağlanılamadı: {str(e)}\n\ndb_config.ini dosyasını kontrol edin.")
     exit()
+excel_yazici.olcum = db.olcum
+acilis_asamasi("veritabanı", {"bağlantı havuzu": db.acilis_sureleri['baglanti'],
+                              "şema kontrolü": db.acilis_sureleri['sema']})
 
 # === YARDIMCI FONKSİYONLAR ===
 def get_malzemeler():
     """Stokta bulunan malzemeleri getir"""
-    result = db.fetch_all("SELECT DISTINCT malzeme FROM stok ORDER BY malzeme")
-    return [row['malzeme'] for row in result]
+    return islemler.malzemeler(db)
 
 def get_urunler():
     """Tanımlı ürünleri getir"""
-    result = db.fetch_all("SELECT DISTINCT urun FROM urunler ORDER BY urun")
-    return [row['urun'] for row in result]
-
-def get_malzeme_ve_urunler():
-    """Malzeme ve ürünlerin birleşik listesi"""
-    malzemeler = get_malzemeler()
-    urunler = get_urunler()
-    return sorted(set(malzemeler + urunler))
+    return islemler.urunler(db)
 
 # === ARAYÜZ BAŞLAT ===
 root = tk.Tk()
@@ -326,45 +84,175 @@ root.geometry("800x600")
 notebook = ttk.Notebook(root)
 notebook.pack(expand=True, fill="both")
 
-# === STOK GİRİŞİ SEKMESİ ===
-def stok_girisi():
+# === GÖREV ÇALIŞTIRICI ===
+# Düğme işleyicilerinin veritabanı ve dosya işleri Tk iş parçacığını bekletmemesi için
+# görev havuzunda çalışır. Sonuçlar, hatalar ve ilerleme bir kuyrukla Tk iş parçacığına
+# taşınır ve root.after ile işlenir; arayüz bileşenlerine yalnızca Tk iş parçacığında dokunulur.
+GOREV_ISCI_SAYISI = 4
+GOREV_KONTROL_MS = 50
+
+class GorevIptalEdildi(Exception):
+    """Kullanıcı uzun süren işi iptal etti (ilerleme geri çağrısından yükseltilir)"""
+
+gorev_havuzu = ThreadPoolExecutor(max_workers=GOREV_ISCI_SAYISI, thread_name_prefix="gorev")
+_tk_isleri = queue.Queue()
+# Açık ilerleme pencerelerinin iptal bayrakları; program kapanırken hepsi kaldırılır
+_iptal_bayraklari = set()
+
+def tk_icinde(fonksiyon, *args):
+    """fonksiyon(*args) çağrısını Tk iş parçacığında çalıştırılmak üzere sıraya koy"""
+    _tk_isleri.put((fonksiyon, args))
+
+def tk_islerini_calistir():
+    """Görevlerden gelen sonuç ve ilerleme işlerini Tk iş parçacığında çalıştır"""
     try:
-        malzeme = entry_malzeme.get()
-        miktar = Decimal(str(entry_miktar.get()))
-        fiyat = Decimal(str(entry_fiyat.get()))
-        tarih = datetime.now().date()
-        toplam_tutar = miktar * fiyat
-
-        # Alış kaydı ekle
-        alis_data = {
-            'malzeme': malzeme,
-            'miktar_kg': miktar,
-            'birim_fiyat': fiyat,
-            'toplam_tutar': toplam_tutar,
-            'tarih': tarih
-        }
-        db.insert('alislar', alis_data)
-
-        # Excel kaydı oluştur
-        excel_data = {
-            'Tarih': tarih.strftime("%Y-%m-%d"),
-            'Malzeme': malzeme,
-            'Miktar (kg)': float(miktar),
-            'Birim Fiyat': float(fiyat),
-            'Toplam Tutar': float(toplam_tutar),
-            'Kayit Zamani': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        excel_kayit_olustur("Alislar", excel_data)
-
-        # Stok güncelle
-        existing = db.fetch_one("SELECT * FROM stok WHERE malzeme = %s", [malzeme])
-        if existing:
-            new_miktar = existing['miktar_kg'] + miktar
-            db.update('stok', {'miktar_kg': new_miktar, 'updated_at': datetime.now()}, 
-                     'malzeme = %s', [malzeme])
+        while True:
+            fonksiyon, args = _tk_isleri.get_nowait()
+            try:
+                fonksiyon(*args)
+            except Exception as e:
+                messagebox.showerror("Hata", str(e))
+    except queue.Empty:
+        pass
+    root.after(GOREV_KONTROL_MS, tk_islerini_calistir)
+
+class _IletisimKutulari:
+    """messagebox sarmalayıcısı: kullanıcının iletişim kutularında geçirdiği süreyi toplar.
+    
+    Bu süre işleyicilerin arayüz ve toplam gecikme ölçümlerinden düşülür.
+    """
+    
+    def __init__(self, modul):
+        self._modul = modul
+        self.sure = 0.0
+    
+    def __getattr__(self, ad):
+        fonksiyon = getattr(self._modul, ad)
+        
+        def sarici(*args, **kwargs):
+            baslangic = time.perf_counter()
+            try:
+                return fonksiyon(*args, **kwargs)
+            finally:
+                self.sure += time.perf_counter() - baslangic
+        return sarici
+
+messagebox = _IletisimKutulari(messagebox)
+
+def gorev_calistir(is_fonksiyonu, bitince=None, dugme=None, hata_mesaji=None, hata=None, ad=None):
+    """is_fonksiyonu() çağrısını görev havuzunda çalıştır, sonucu Tk iş parçacığında işle.
+    
+    dugme verilirse görev bitene kadar devre dışı kalır. Başarılıysa bitince(sonuc),
+    hata olursa hata(e) çağrılır; hata verilmemişse hata penceresi gösterilir.
+    Süreler ad (verilmezse is_fonksiyonu'nu tanımlayan işleyicinin adı) altında
+    db.olcum'a veritabanı / Excel / diğer / arayüz / toplam olarak kaydedilir.
+    """
+    ad = ad or is_fonksiyonu.__qualname__.split(".")[0]
+    baslangic = time.perf_counter()
+    if dugme is not None:
+        dugme.config(state="disabled")
+    
+    def olculu():
+        with db.olcum.isleyici(ad):
+            return is_fonksiyonu()
+    
+    def sonuclandir(gorev):
+        arayuz_baslangici = time.perf_counter()
+        iletisim_oncesi = messagebox.sure
+        try:
+            sonucu_isle(gorev)
+        finally:
+            simdi = time.perf_counter()
+            iletisim = messagebox.sure - iletisim_oncesi
+            db.olcum.isleyici_kaydet(ad, "arayuz", simdi - arayuz_baslangici - iletisim)
+            db.olcum.isleyici_kaydet(ad, "toplam", simdi - baslangic - iletisim)
+    
+    def sonucu_isle(gorev):
+        if dugme is not None:
+            dugme.config(state="normal")
+        try:
+            sonuc = gorev.result()
+        except Exception as e:
+            if hata:
+                hata(e)
+            elif isinstance(e, GorevIptalEdildi):
+                messagebox.showinfo("İptal", "İşlem iptal edildi.")
+            else:
+                messagebox.showerror("Hata", f"{hata_mesaji}: {str(e)}" if hata_mesaji else str(e))
+            return
+        if bitince:
+            bitince(sonuc)
+    
+    gorev = gorev_havuzu.submit(olculu)
+    gorev.add_done_callback(lambda tamamlanan: tk_icinde(sonuclandir, tamamlanan))
+    return gorev
+
+def ilerlemeli_calistir(baslik, is_fonksiyonu, bitince, hata_mesaji="Hata", dugme=None,
+                        iptal_edilebilir=True):
+    """is_fonksiyonu(ilerleme) çağrısını görev havuzunda çalıştır, ilerlemeyi bir pencerede göster.
+    
+    ilerleme(tamamlanan, toplam, mesaj) herhangi bir iş parçacığından çağrılabilir. İptal'e
+    basıldıysa sonraki ilerleme çağrısı GorevIptalEdildi yükseltir; işlemler bu hatayla
+    geri alınır, yarım yedek klasörleri silinir. Bitince bitince(sonuc) çağrılır.
+    """
+    pencere = tk.Toplevel(root)
+    pencere.title(baslik)
+    pencere.transient(root)
+    etiket = tk.Label(pencere, text="Başlatılıyor...", width=40)
+    etiket.pack(padx=20, pady=10)
+    cubuk = ttk.Progressbar(pencere, length=300, mode="determinate")
+    cubuk.pack(padx=20, pady=10)
+    
+    iptal = threading.Event()
+    _iptal_bayraklari.add(iptal)
+    
+    def iptal_et():
+        iptal.set()
+        iptal_dugmesi.config(state="disabled", text="İptal ediliyor...")
+    
+    iptal_dugmesi = tk.Button(pencere, text="İptal", command=iptal_et,
+                              state="normal" if iptal_edilebilir else "disabled")
+    iptal_dugmesi.pack(pady=(0, 10))
+    pencere.protocol("WM_DELETE_WINDOW", iptal_et if iptal_edilebilir else lambda: None)
+    
+    def goster(tamamlanan, toplam, mesaj):
+        if not pencere.winfo_exists():
+            return
+        cubuk['maximum'] = toplam
+        cubuk['value'] = tamamlanan
+        etiket.config(text=f"{mesaj} ({tamamlanan}/{toplam})")
+    
+    def ilerleme(tamamlanan, toplam, mesaj):
+        if iptal.is_set():
+            raise GorevIptalEdildi()
+        tk_icinde(goster, tamamlanan, toplam, mesaj)
+    
+    def kapat():
+        _iptal_bayraklari.discard(iptal)
+        pencere.destroy()
+    
+    def tamam(sonuc):
+        kapat()
+        bitince(sonuc)
+    
+    def basarisiz(e):
+        kapat()
+        if isinstance(e, GorevIptalEdildi):
+            messagebox.showinfo("İptal", f"{baslik} iptal edildi.")
         else:
-            db.insert('stok', {'malzeme': malzeme, 'miktar_kg': miktar})
+            messagebox.showerror("Hata", f"{hata_mesaji}: {str(e)}")
+    
+    return gorev_calistir(lambda: is_fonksiyonu(ilerleme), tamam, dugme=dugme, hata=basarisiz,
+                          ad=is_fonksiyonu.__qualname__.split(".")[0])
 
+# === STOK GİRİŞİ SEKMESİ ===
+def stok_girisi():
+    malzeme, miktar, fiyat = entry_malzeme.get(), entry_miktar.get(), entry_fiyat.get()
+    
+    def kaydet():
+        islemler.alis_kaydet(db, malzeme, miktar, fiyat, kayit=excel_kayit_olustur)
+    
+    def bitince(_):
         messagebox.showinfo("Başarılı", "Stok girişi kaydedildi ve Excel'e aktarıldı.")
         entry_malzeme.delete(0, tk.END)
         entry_miktar.delete(0, tk.END)
@@ -372,8 +260,8 @@ def stok_girisi():
         
         # Combobox'ları güncelle
         guncelle_comboboxlar()
-    except Exception as e:
-        messagebox.showerror("Hata", str(e))
+    
+    gorev_calistir(kaydet, bitince, dugme=buton_stok_kaydet)
 
 f1 = ttk.Frame(notebook)
 notebook.add(f1, text="Stok Girişi")
@@ -386,7 +274,8 @@ entry_miktar.grid(row=1, column=1, padx=5, pady=5)
 tk.Label(f1, text="Birim Fiyat: ").grid(row=2, column=0, padx=5, pady=5)
 entry_fiyat = tk.Entry(f1)
 entry_fiyat.grid(row=2, column=1, padx=5, pady=5)
-tk.Button(f1, text="Kaydet", command=stok_girisi).grid(row=3, columnspan=2, pady=10)
+buton_stok_kaydet = tk.Button(f1, text="Kaydet", command=stok_girisi)
+buton_stok_kaydet.grid(row=3, columnspan=2, pady=10)
 tk.Label(f1, text="TURKCE KARAKTER KULLANMAYIN!", fg="red").grid(row=4, columnspan=2, pady=5)
 
 # === ÜRÜN REÇETESİ TANIMI SEKMESİ ===
@@ -412,31 +301,20 @@ def recete_kaydet():
         messagebox.showwarning("Uyarı", "Hiç malzeme eklenmedi.")
         return
     
-    try:
-        for urun, malzeme, yuzde in recete_gecici:
-            db.insert('urunler', {
-                'urun': urun,
-                'malzeme': malzeme,
-                'yuzde': yuzde
-            })
-
-            # Excel kaydı oluştur
-            excel_data = {
-                'Tarih': datetime.now().strftime("%Y-%m-%d"),
-                'Urun': urun,
-                'Malzeme': malzeme,
-                'Yuzde': float(yuzde),
-                'Kayit Zamani': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            excel_kayit_olustur("Urun_Receteleri", excel_data)
-        
+    # Kayıt sürerken eklenen satırlar listede kalır
+    satirlar = list(recete_gecici)
+    
+    def kaydet():
+        islemler.recete_kaydet(db, satirlar, kayit=excel_kayit_olustur)
+    
+    def bitince(_):
         messagebox.showinfo("Başarılı", "Ürün reçetesi kaydedildi ve Excel'e aktarıldı.")
         entry_urun.delete(0, tk.END)
-        liste_kutu.delete(0, tk.END)
-        recete_gecici.clear()
+        liste_kutu.delete(0, len(satirlar) - 1)
+        del recete_gecici[:len(satirlar)]
         guncelle_comboboxlar()
-    except Exception as e:
-        messagebox.showerror("Hata", str(e))
+    
+    gorev_calistir(kaydet, bitince, dugme=buton_recete_kaydet)
 
 f2 = ttk.Frame(notebook)
 notebook.add(f2, text="Ürün Tanımı")
@@ -444,7 +322,7 @@ tk.Label(f2, text="Ürün Adı: ").grid(row=0, column=0, padx=5, pady=5)
 entry_urun = tk.Entry(f2, width=30)
 entry_urun.grid(row=0, column=1, columnspan=2, padx=5, pady=5, sticky="ew")
 tk.Label(f2, text="Malzeme: ").grid(row=1, column=0, padx=5, pady=5)
-combo_urun_malzeme = ttk.Combobox(f2, values=get_malzemeler(), state="readonly")
+combo_urun_malzeme = ttk.Combobox(f2, state="readonly")
 combo_urun_malzeme.grid(row=1, column=1, padx=5, pady=5)
 tk.Label(f2, text="Yüzde: ").grid(row=1, column=2, padx=5, pady=5)
 entry_urun_yuzde = tk.Entry(f2)
@@ -452,153 +330,57 @@ entry_urun_yuzde.grid(row=1, column=3, padx=5, pady=5)
 tk.Button(f2, text="Malzeme Ekle", command=receteye_malzeme_ekle).grid(row=2, column=0, columnspan=4, pady=5)
 liste_kutu = tk.Listbox(f2, width=60)
 liste_kutu.grid(row=3, column=0, columnspan=4, padx=5, pady=5)
-tk.Button(f2, text="Reçeteyi Kaydet", command=recete_kaydet).grid(row=4, column=0, columnspan=4, pady=5)
+buton_recete_kaydet = tk.Button(f2, text="Reçeteyi Kaydet", command=recete_kaydet)
+buton_recete_kaydet.grid(row=4, column=0, columnspan=4, pady=5)
 tk.Label(f2, text="TURKCE KARAKTER KULLANMAYIN!", fg="red").grid(row=5, column=0, columnspan=4, pady=5)
 
 # === ÜRETİM SEKMESİ ===
 def uretim_yap():
-    try:
-        urun = combo_uretim_urun.get()
-        gramaj = Decimal(str(entry_uretim_gramaj.get()))
-        tarih = datetime.now().date()
-
-        # Ürün reçetesini kontrol et
-        recete = db.fetch_all("SELECT * FROM urunler WHERE urun = %s", [urun])
-        if not recete:
-            raise ValueError("Bu ürün için reçete tanımı yok.")
-
-        # Kullanılan malzemeler listesi
-        kullanilan_malzemeler = []
-
-        # Stok kontrolü ve düşürme
-        for row in recete:
-            malzeme = row['malzeme']
-            oran = Decimal(str(row['yuzde'])) / Decimal('100')
-            gereken = gramaj * oran
-            
-            stok_row = db.fetch_one("SELECT * FROM stok WHERE malzeme = %s", [malzeme])
-            if not stok_row:
-                raise ValueError(f"{malzeme} stokta yok.")
-            
-            mevcut = Decimal(str(stok_row['miktar_kg']))
-            if mevcut < gereken:
-                raise ValueError(f"{malzeme} için yeterli stok yok. Mevcut: {mevcut}, Gereken: {gereken}")
-            
-            # Stoktan düş
-            db.update('stok', 
-                     {'miktar_kg': mevcut - gereken, 'updated_at': datetime.now()},
-                     'malzeme = %s', [malzeme])
-            
-            kullanilan_malzemeler.append(f"{malzeme}: {float(gereken):.2f} kg")
-
-        # Üretim kaydı ekle
-        db.insert('uretimler', {
-            'urun': urun,
-            'gramaj_kg': gramaj,
-            'tarih': tarih
-        })
-
-        # Excel kaydı oluştur
-        excel_data = {
-            'Tarih': tarih.strftime("%Y-%m-%d"),
-            'Urun': urun,
-            'Gramaj (kg)': float(gramaj),
-            'Kullanilan Malzemeler': " | ".join(kullanilan_malzemeler),
-            'Kayit Zamani': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        excel_kayit_olustur("Uretimler", excel_data)
-
+    urun, gramaj = combo_uretim_urun.get(), entry_uretim_gramaj.get()
+    
+    def kaydet():
+        islemler.uretim_kaydet(db, urun, gramaj, kayit=excel_kayit_olustur)
+    
+    def bitince(_):
         messagebox.showinfo("Başarılı", "Üretim kaydedildi ve Excel'e aktarıldı.")
         combo_uretim_urun.set("")
         entry_uretim_gramaj.delete(0, tk.END)
-    except Exception as e:
-        messagebox.showerror("Hata", str(e))
+    
+    gorev_calistir(kaydet, bitince, dugme=buton_uretim_kaydet)
 
 f3 = ttk.Frame(notebook)
 notebook.add(f3, text="Üretim")
 tk.Label(f3, text="Ürün: ").grid(row=0, column=0, padx=5, pady=5)
-combo_uretim_urun = ttk.Combobox(f3, values=get_urunler(), state="readonly")
+combo_uretim_urun = ttk.Combobox(f3, state="readonly")
 combo_uretim_urun.grid(row=0, column=1, padx=5, pady=5)
 tk.Label(f3, text="Gramaj (kg): ").grid(row=1, column=0, padx=5, pady=5)
 entry_uretim_gramaj = tk.Entry(f3)
 entry_uretim_gramaj.grid(row=1, column=1, padx=5, pady=5)
-tk.Button(f3, text="Üretimi Kaydet", command=uretim_yap).grid(row=2, column=0, columnspan=2, pady=10)
+buton_uretim_kaydet = tk.Button(f3, text="Üretimi Kaydet", command=uretim_yap)
+buton_uretim_kaydet.grid(row=2, column=0, columnspan=2, pady=10)
 tk.Label(f3, text="TURKCE KARAKTER KULLANMAYIN!", fg="red").grid(row=3, columnspan=2, pady=5)
 
 # === SATIŞ SEKMESİ ===
 def satis_kaydet():
-    try:
-        urun = combo_satis_urun.get()
-        musteri = entry_satis_musteri.get()
-        miktar = Decimal(str(entry_satis_miktar.get()))
-        fiyat = Decimal(str(entry_satis_fiyat.get()))
-        tarih = datetime.now().date()
-        toplam_satis = miktar * fiyat
-
-        kdv_orani = Decimal('0.20')
-        
-        # Maliyet hesapla
-        recete = db.fetch_all("SELECT * FROM urunler WHERE urun = %s", [urun])
-        toplam_maliyet = Decimal('0')
-        maliyet_detay = []
-        
-        for row in recete:
-            malzeme = row['malzeme']
-            oran = Decimal(str(row['yuzde'])) / Decimal('100')
-            gereken_miktar = miktar * oran
-            
-            # Son alış fiyatını al
-            alis_row = db.fetch_one(
-                "SELECT birim_fiyat FROM alislar WHERE malzeme = %s ORDER BY tarih DESC LIMIT 1",
-                [malzeme]
-            )
-            if alis_row:
-                birim_fiyat = Decimal(str(alis_row['birim_fiyat']))
-                malzeme_maliyet = gereken_miktar * birim_fiyat
-                toplam_maliyet += malzeme_maliyet
-                maliyet_detay.append(f"{malzeme}: {float(malzeme_maliyet):.2f} TL")
-
-        net_kar = (fiyat * miktar / (Decimal('1') + kdv_orani)) - toplam_maliyet
-
-        # Satış kaydı ekle
-        satis_data = {
-            'urun': urun,
-            'musteri': musteri,
-            'miktar_kg': miktar,
-            'satis_fiyat': fiyat,
-            'toplam_satis': toplam_satis,
-            'net_kar': net_kar,
-            'tarih': tarih
-        }
-        db.insert('satislar', satis_data)
-
-        # Excel kaydı oluştur
-        excel_data = {
-            'Tarih': tarih.strftime("%Y-%m-%d"),
-            'Urun': urun,
-            'Musteri': musteri,
-            'Miktar (kg)': float(miktar),
-            'Birim Fiyat': float(fiyat),
-            'Toplam Satis': float(toplam_satis),
-            'Toplam Maliyet': float(toplam_maliyet),
-            'Net Kar': float(net_kar),
-            'Maliyet Detay': " | ".join(maliyet_detay),
-            'Kayit Zamani': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        excel_kayit_olustur("Satislar", excel_data)
-
+    urun, musteri = combo_satis_urun.get(), entry_satis_musteri.get()
+    miktar, fiyat = entry_satis_miktar.get(), entry_satis_fiyat.get()
+    
+    def kaydet():
+        islemler.satis_kaydet(db, urun, musteri, miktar, fiyat, kayit=excel_kayit_olustur)
+    
+    def bitince(_):
         messagebox.showinfo("Başarılı", "Satış kaydedildi ve Excel'e aktarıldı.")
         combo_satis_urun.set("")
         entry_satis_musteri.delete(0, tk.END)
         entry_satis_miktar.delete(0, tk.END)
         entry_satis_fiyat.delete(0, tk.END)
-    except Exception as e:
-        messagebox.showerror("Hata", str(e))
+    
+    gorev_calistir(kaydet, bitince, dugme=buton_satis_kaydet)
 
 f4 = ttk.Frame(notebook)
 notebook.add(f4, text="Satış")
 tk.Label(f4, text="Ürün: ").grid(row=0, column=0, padx=5, pady=5)
-combo_satis_urun = ttk.Combobox(f4, values=get_urunler(), state="readonly")
+combo_satis_urun = ttk.Combobox(f4, state="readonly")
 combo_satis_urun.grid(row=0, column=1, padx=5, pady=5)
 tk.Label(f4, text="Müşteri: ").grid(row=1, column=0, padx=5, pady=5)
 entry_satis_musteri = tk.Entry(f4)
@@ -609,73 +391,45 @@ entry_satis_miktar.grid(row=2, column=1, padx=5, pady=5)
 tk.Label(f4, text="Satış Fiyatı: ").grid(row=3, column=0, padx=5, pady=5)
 entry_satis_fiyat = tk.Entry(f4)
 entry_satis_fiyat.grid(row=3, column=1, padx=5, pady=5)
-tk.Button(f4, text="Satışı Kaydet", command=satis_kaydet).grid(row=4, column=0, columnspan=2, pady=10)
+buton_satis_kaydet = tk.Button(f4, text="Satışı Kaydet", command=satis_kaydet)
+buton_satis_kaydet.grid(row=4, column=0, columnspan=2, pady=10)
 tk.Label(f4, text="TURKCE KARAKTER KULLANMAYIN!", fg="red").grid(row=5, columnspan=2, pady=5)
 
 # === İADE/HURDA SEKMESİ ===
 def iade_kaydet():
-    try:
-        urun = combo_iade_urun.get()
-        miktar = Decimal(str(entry_iade_miktar.get()))
-        sebep = entry_iade_sebep.get()
-        tip = combo_iade_tip.get()
-        tarih = datetime.now().date()
-
-        # İade kaydı ekle
-        db.insert('iadeler', {
-            'tarih': tarih,
-            'tip': tip,
-            'urun': urun,
-            'miktar': miktar,
-            'sebep': sebep
-        })
-
-        # Excel kaydı oluştur
-        excel_data = {
-            'Tarih': tarih.strftime("%Y-%m-%d"),
-            'Tip': tip,
-            'Urun/Malzeme': urun,
-            'Miktar': float(miktar),
-            'Sebep': sebep,
-            'Kayit Zamani': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        excel_kayit_olustur("Iadeler_Hurda", excel_data)
-
-        # İade ise stoğa geri ekle
-        if tip == "İade":
-            existing = db.fetch_one("SELECT * FROM stok WHERE malzeme = %s", [urun])
-            if existing:
-                new_miktar = Decimal(str(existing['miktar_kg'])) + miktar
-                db.update('stok', {'miktar_kg': new_miktar, 'updated_at': datetime.now()}, 
-                         'malzeme = %s', [urun])
-            else:
-                db.insert('stok', {'malzeme': urun, 'miktar_kg': miktar})
-
+    urun, miktar = combo_iade_urun.get(), entry_iade_miktar.get()
+    tip, sebep = combo_iade_tip.get(), entry_iade_sebep.get()
+    
+    def kaydet():
+        islemler.iade_kaydet(db, urun, miktar, tip, sebep, kayit=excel_kayit_olustur)
+    
+    def bitince(_):
         messagebox.showinfo("Başarılı", "Kayıt eklendi ve Excel'e aktarıldı.")
         combo_iade_urun.set("")
         entry_iade_miktar.delete(0, tk.END)
         entry_iade_sebep.delete(0, tk.END)
         combo_iade_tip.set("")
         guncelle_comboboxlar()
-    except Exception as e:
-        messagebox.showerror("Hata", str(e))
+    
+    gorev_calistir(kaydet, bitince, dugme=buton_iade_kaydet)
 
 f5 = ttk.Frame(notebook)
 notebook.add(f5, text="İade / Hurda")
 tk.Label(f5, text="TURKCE KARAKTER KULLANMAYIN!", fg="red").grid(row=0, columnspan=2, pady=5)
 tk.Label(f5, text="Ürün/Malzeme: ").grid(row=1, column=0, padx=5, pady=5)
-combo_iade_urun = ttk.Combobox(f5, values=get_malzeme_ve_urunler(), state="readonly")
+combo_iade_urun = ttk.Combobox(f5, state="readonly")
 combo_iade_urun.grid(row=1, column=1, padx=5, pady=5)
 tk.Label(f5, text="Miktar (kg): ").grid(row=2, column=0, padx=5, pady=5)
 entry_iade_miktar = tk.Entry(f5)
 entry_iade_miktar.grid(row=2, column=1, padx=5, pady=5)
 tk.Label(f5, text="Tür: ").grid(row=3, column=0, padx=5, pady=5)
-combo_iade_tip = ttk.Combobox(f5, values=["İade", "Hurda"], state="readonly")
+combo_iade_tip = ttk.Combobox(f5, values=list(islemler.IADE_TIPLERI), state="readonly")
 combo_iade_tip.grid(row=3, column=1, padx=5, pady=5)
 tk.Label(f5, text="Sebep: ").grid(row=4, column=0, padx=5, pady=5)
 entry_iade_sebep = tk.Entry(f5)
 entry_iade_sebep.grid(row=4, column=1, padx=5, pady=5)
-tk.Button(f5, text="Kaydet", command=iade_kaydet).grid(row=5, columnspan=2, pady=10)
+buton_iade_kaydet = tk.Button(f5, text="Kaydet", command=iade_kaydet)
+buton_iade_kaydet.grid(row=5, columnspan=2, pady=10)
 
 # === TAŞ GİDER SEKMESİ ===
 tas_gider_turleri = [
@@ -686,46 +440,23 @@ tas_gider_turleri = [
 ]
 
 def tas_gider_kaydet():
-    try:
-        tarih = datetime.strptime(entry_tas_tarih.get(), "%Y-%m-%d").date()
-        tip = "Gider"
-        aciklama = combo_tas_kategori.get()
-        birim = entry_tas_birim.get()
-        birim_fiyat = Decimal(str(entry_tas_fiyat.get()))
-        miktar = Decimal(str(entry_tas_miktar.get()))
-        toplam = birim_fiyat * miktar
-
-        db.insert('tas_gelir_gider', {
-            'tarih': tarih,
-            'tip': tip,
-            'aciklama': aciklama,
-            'birim': birim,
-            'birim_fiyat': birim_fiyat,
-            'miktar': miktar,
-            'toplam_tutar': toplam
-        })
-
-        # Excel kaydı oluştur
-        excel_data = {
-            'Tarih': tarih.strftime("%Y-%m-%d"),
-            'Tip': tip,
-            'Aciklama': aciklama,
-            'Birim': birim,
-            'Birim Fiyat': float(birim_fiyat),
-            'Miktar': float(miktar),
-            'Toplam Tutar': float(toplam),
-            'Kayit Zamani': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        excel_kayit_olustur("Tas_Gelir_Gider", excel_data)
-
+    tarih_str, aciklama = entry_tas_tarih.get(), combo_tas_kategori.get()
+    birim, fiyat, miktar = entry_tas_birim.get(), entry_tas_fiyat.get(), entry_tas_miktar.get()
+    
+    def kaydet():
+        tarih = datetime.strptime(tarih_str, "%Y-%m-%d").date()
+        islemler.gider_kaydet(db, 'tas', tarih, aciklama, birim, fiyat, miktar,
+                              kayit=excel_kayit_olustur)
+    
+    def bitince(_):
         messagebox.showinfo("Başarılı", "Taş gideri kaydedildi ve Excel'e aktarıldı.")
         entry_tas_tarih.delete(0, tk.END)
         combo_tas_kategori.set("")
         entry_tas_birim.delete(0, tk.END)
         entry_tas_fiyat.delete(0, tk.END)
         entry_tas_miktar.delete(0, tk.END)
-    except Exception as e:
-        messagebox.showerror("Hata", str(e))
+    
+    gorev_calistir(kaydet, bitince, dugme=buton_tas_kaydet)
 
 f6 = ttk.Frame(notebook)
 notebook.add(f6, text="Taş Gider")
@@ -744,88 +475,31 @@ entry_tas_fiyat.grid(row=3, column=1, padx=5, pady=5)
 tk.Label(f6, text="Miktar:").grid(row=4, column=0, padx=5, pady=5)
 entry_tas_miktar = tk.Entry(f6)
 entry_tas_miktar.grid(row=4, column=1, padx=5, pady=5)
-tk.Button(f6, text="Kaydet", command=tas_gider_kaydet).grid(row=5, columnspan=2, pady=10)
+buton_tas_kaydet = tk.Button(f6, text="Kaydet", command=tas_gider_kaydet)
+buton_tas_kaydet.grid(row=5, columnspan=2, pady=10)
 tk.Label(f6, text="TURKCE KARAKTER KULLANMAYIN!", fg="red").grid(row=6, columnspan=2, pady=5)
 
 # === BETON GİDER SEKMESİ ===
 beton_gider_turleri = ["ÇİMENTO", "AGREGA", "KATKI"]
 
 def beton_gider_kaydet():
-    try:
-        tarih = datetime.strptime(entry_beton_tarih.get(), "%Y-%m-%d").date()
-        tip = "Gider"
-        aciklama = combo_beton_kategori.get()
-        birim = entry_beton_birim.get()
-        birim_fiyat = Decimal(str(entry_beton_fiyat.get()))
-        miktar = Decimal(str(entry_beton_miktar.get()))
-        toplam = birim_fiyat * miktar
-
-        db.insert('beton_gelir_gider', {
-            'tarih': tarih,
-            'tip': tip,
-            'aciklama': aciklama,
-            'birim': birim,
-            'birim_fiyat': birim_fiyat,
-            'miktar': miktar,
-            'toplam_tutar': toplam
-        })
-
-        # Excel kaydı oluştur
-        excel_data = {
-            'Tarih': tarih.strftime("%Y-%m-%d"),
-            'Tip': tip,
-            'Aciklama': aciklama,
-            'Birim': birim,
-            'Birim Fiyat': float(birim_fiyat),
-            'Miktar': float(miktar),
-            'Toplam Tutar': float(toplam),
-            'Kayit Zamani': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        excel_kayit_olustur("Beton_Gelir_Gider", excel_data)
-
-        messagebox.showinfo("Başarılı", "Beton gideri kaydedildi ve Excel'e aktarıldı.")
-        entry_beton_tarih.delete(0, tk.END)
-        combo_beton_kategori.set("")
-        entry_beton_birim.delete(0, tk.END)
-        entry_beton_fiyat.delete(0, tk.END)
-        entry_beton_miktar.delete(0, tk.END)
-    except Exception as e:
-        messagebox.showerror("Hata", str(e))
-        birim_fiyat = float(entry_beton_fiyat.get())
-        miktar = float(entry_beton_miktar.get())
-        toplam = birim_fiyat * miktar
-
-        db.insert('beton_gelir_gider', {
-            'tarih': tarih,
-            'tip': tip,
-            'aciklama': aciklama,
-            'birim': birim,
-            'birim_fiyat': birim_fiyat,
-            'miktar': miktar,
-            'toplam_tutar': toplam
-        })
-
-        # Excel kaydı oluştur
-        excel_data = {
-            'Tarih': tarih.strftime("%Y-%m-%d"),
-            'Tip': tip,
-            'Aciklama': aciklama,
-            'Birim': birim,
-            'Birim Fiyat': birim_fiyat,
-            'Miktar': miktar,
-            'Toplam Tutar': toplam,
-            'Kayit Zamani': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        excel_kayit_olustur("Beton_Gelir_Gider", excel_data)
-
+    tarih_str, aciklama = entry_beton_tarih.get(), combo_beton_kategori.get()
+    birim, fiyat, miktar = entry_beton_birim.get(), entry_beton_fiyat.get(), entry_beton_miktar.get()
+    
+    def kaydet():
+        tarih = datetime.strptime(tarih_str, "%Y-%m-%d").date()
+        islemler.gider_kaydet(db, 'beton', tarih, aciklama, birim, fiyat, miktar,
+                              kayit=excel_kayit_olustur)
+    
+    def bitince(_):
         messagebox.showinfo("Başarılı", "Beton gideri kaydedildi ve Excel'e aktarıldı.")
         entry_beton_tarih.delete(0, tk.END)
         combo_beton_kategori.set("")
         entry_beton_birim.delete(0, tk.END)
         entry_beton_fiyat.delete(0, tk.END)
         entry_beton_miktar.delete(0, tk.END)
-    except Exception as e:
-        messagebox.showerror("Hata", str(e))
+    
+    gorev_calistir(kaydet, bitince, dugme=buton_beton_kaydet)
 
 f7 = ttk.Frame(notebook)
 notebook.add(f7, text="Beton Gider")
@@ -844,128 +518,74 @@ entry_beton_fiyat.grid(row=3, column=1, padx=5, pady=5)
 tk.Label(f7, text="Miktar:").grid(row=4, column=0, padx=5, pady=5)
 entry_beton_miktar = tk.Entry(f7)
 entry_beton_miktar.grid(row=4, column=1, padx=5, pady=5)
-tk.Button(f7, text="Kaydet", command=beton_gider_kaydet).grid(row=5, columnspan=2, pady=10)
+buton_beton_kaydet = tk.Button(f7, text="Kaydet", command=beton_gider_kaydet)
+buton_beton_kaydet.grid(row=5, columnspan=2, pady=10)
 tk.Label(f7, text="TURKCE KARAKTER KULLANMAYIN!", fg="red").grid(row=6, columnspan=2, pady=5)
 
 # === RAPORLAMA SEKMESİ ===
+# Stok defteri anlıkları: bu aralıkla (milisaniye) kontrol edilir, son anlıktan bu yana
+# en az bu kadar hareket varsa yeni anlık alınır
+STOK_ANLIK_KONTROL_MS = 10 * 60 * 1000
+STOK_ANLIK_ESIGI = 1000
+
 def raporla():
-    try:
-        secim = combo_rapor_tipi.get()
-        
-        if secim == "Günlük":
-            # Günlük rapor
-            satis_query = """
-                SELECT tarih, SUM(net_kar) as toplam_kar
-                FROM satislar 
-                GROUP BY tarih 
-                ORDER BY tarih DESC
-                LIMIT 30
-            """
-            
-            tas_query = """
-                SELECT tarih, 
-                       SUM(CASE WHEN tip = 'Gelir' THEN toplam_tutar ELSE -toplam_tutar END) as net_tutar
-                FROM tas_gelir_gider 
-                GROUP BY tarih 
-                ORDER BY tarih DESC
-                LIMIT 30
-            """
-            
-            beton_query = """
-                SELECT tarih, 
-                       SUM(CASE WHEN tip = 'Gelir' THEN toplam_tutar ELSE -toplam_tutar END) as net_tutar
-                FROM beton_gelir_gider 
-                GROUP BY tarih 
-                ORDER BY tarih DESC
-                LIMIT 30
-            """
-        else:
-            # Aylık rapor
-            satis_query = """
-                SELECT DATE_TRUNC('month', tarih) as ay, SUM(net_kar) as toplam_kar
-                FROM satislar 
-                GROUP BY DATE_TRUNC('month', tarih)
-                ORDER BY ay DESC
-                LIMIT 12
-            """
-            
-            tas_query = """
-                SELECT DATE_TRUNC('month', tarih) as ay, 
-                       SUM(CASE WHEN tip = 'Gelir' THEN toplam_tutar ELSE -toplam_tutar END) as net_tutar
-                FROM tas_gelir_gider 
-                GROUP BY DATE_TRUNC('month', tarih)
-                ORDER BY ay DESC
-                LIMIT 12
-            """
-            
-            beton_query = """
-                SELECT DATE_TRUNC('month', tarih) as ay, 
-                       SUM(CASE WHEN tip = 'Gelir' THEN toplam_tutar ELSE -toplam_tutar END) as net_tutar
-                FROM beton_gelir_gider 
-                GROUP BY DATE_TRUNC('month', tarih)
-                ORDER BY ay DESC
-                LIMIT 12
-            """
-
-        satis_data = db.fetch_all(satis_query)
-        tas_data = db.fetch_all(tas_query)
-        beton_data = db.fetch_all(beton_query)
-
-        # Raporu birleştir ve göster
+    secim = combo_rapor_tipi.get()
+    if secim not in islemler.RAPOR_BIRIMLERI:
+        secim = "Aylık"
+    baslangic_str = entry_rapor_baslangic.get().strip()
+    bitis_str = entry_rapor_bitis.get().strip()
+    
+    def oku():
+        baslangic = datetime.strptime(baslangic_str, "%Y-%m-%d").date() if baslangic_str else None
+        bitis = datetime.strptime(bitis_str, "%Y-%m-%d").date() if bitis_str else None
+        # Sonuçlar sunucu taraflı imleçle parça parça okunur
+        return [
+            f"{islemler.donem_metni(secim, row['donem'])} ➤ Satış: {row['satis_kar']:.2f} | Taş: {row['tas_net']:.2f} "
+            f"| Beton: {row['beton_net']:.2f} | NET: {row['net']:.2f} ₺"
+            for row in islemler.donem_raporu(db, secim, baslangic, bitis)
+        ]
+    
+    def goster(satirlar):
         liste_rapor.delete(0, tk.END)
-        
-        # Tüm tarihleri/ayları topla
-        all_periods = set()
-        for row in satis_data:
-            all_periods.add(row[list(row.keys())[0]])
-        for row in tas_data:
-            all_periods.add(row[list(row.keys())[0]])
-        for row in beton_data:
-            all_periods.add(row[list(row.keys())[0]])
-        
-        # Sözlük haline getir
-        satis_dict = {row[list(row.keys())[0]]: row[list(row.keys())[1]] or 0 for row in satis_data}
-        tas_dict = {row[list(row.keys())[0]]: row[list(row.keys())[1]] or 0 for row in tas_data}
-        beton_dict = {row[list(row.keys())[0]]: row[list(row.keys())[1]] or 0 for row in beton_data}
-        
-        # Sonuçları göster
-        for period in sorted(all_periods, reverse=True):
-            satis_kar = satis_dict.get(period, 0)
-            tas_net = tas_dict.get(period, 0)
-            beton_net = beton_dict.get(period, 0)
-            toplam_net = satis_kar + tas_net + beton_net
-            
-            period_str = period.strftime("%Y-%m-%d") if secim == "Günlük" else period.strftime("%Y-%m")
-            liste_rapor.insert(tk.END, 
-                f"{period_str} ➤ Satış: {satis_kar:.2f} | Taş: {tas_net:.2f} | Beton: {beton_net:.2f} | NET: {toplam_net:.2f} ₺")
-
-    except Exception as e:
-        messagebox.showerror("Hata", str(e))
+        liste_rapor.insert(tk.END, *satirlar)
+    
+    gorev_calistir(oku, goster, dugme=buton_gelir_gider_raporu)
 
 def stok_raporu():
-    """Mevcut stok durumunu göster"""
-    try:
-        stok_data = db.fetch_all("SELECT malzeme, miktar_kg FROM stok WHERE miktar_kg > 0 ORDER BY malzeme")
-        
+    """Stok durumunu göster; bitiş tarihi girilmişse o günün sonundaki stok defterden hesaplanır"""
+    bitis_str = entry_rapor_bitis.get().strip()
+    
+    def oku():
+        if bitis_str:
+            bitis = datetime.strptime(bitis_str, "%Y-%m-%d").date()
+            return f"=== {bitis_str} GÜN SONU STOK DURUMU ===", islemler.stok_raporu(db, bitis)
+        return "=== MEVCUT STOK DURUMU ===", islemler.stok_raporu(db)
+    
+    def goster(sonuc):
+        baslik, stok_data = sonuc
         liste_rapor.delete(0, tk.END)
-        liste_rapor.insert(tk.END, "=== MEVCUT STOK DURUMU ===")
+        liste_rapor.insert(tk.END, baslik)
         liste_rapor.insert(tk.END, "")
         
         for row in stok_data:
             liste_rapor.insert(tk.END, f"{row['malzeme']}: {row['miktar_kg']:.2f} kg")
-            
-    except Exception as e:
-        messagebox.showerror("Hata", str(e))
+    
+    gorev_calistir(oku, goster, dugme=buton_stok_raporu)
+
+def stok_anlik_kontrol():
+    """Yeterince yeni stok hareketi varsa arka planda defter bakiye anlığı al"""
+    def al():
+        try:
+            db.stok_anligi_al(STOK_ANLIK_ESIGI)
+        except Exception as e:
+            print(f"Stok anlığı alınamadı: {str(e)}")
+    
+    gorev_havuzu.submit(al)
+    root.after(STOK_ANLIK_KONTROL_MS, stok_anlik_kontrol)
 
 def urun_raporu():
     """Tanımlı ürünleri ve reçetelerini göster"""
-    try:
-        urun_data = db.fetch_all("""
-            SELECT urun, malzeme, yuzde 
-            FROM urunler 
-            ORDER BY urun, malzeme
-        """)
-        
+    def goster(urun_data):
         liste_rapor.delete(0, tk.END)
         liste_rapor.insert(tk.END, "=== ÜRÜN REÇETELERİ ===")
         liste_rapor.insert(tk.END, "")
@@ -977,21 +597,71 @@ def urun_raporu():
                 liste_rapor.insert(tk.END, f"📦 {current_urun}:")
             
             liste_rapor.insert(tk.END, f"   • {row['malzeme']}: %{row['yuzde']}")
-            
-    except Exception as e:
-        messagebox.showerror("Hata", str(e))
+    
+    gorev_calistir(lambda: islemler.urun_receteleri(db), goster, dugme=buton_urun_raporu)
+
+def indeks_raporu():
+    """Raporlama ve satış sorgularının kullandığı indeksleri göster (EXPLAIN)"""
+    def oku():
+        ornek_urun = db.fetch_one("SELECT urun FROM urunler LIMIT 1")
+        recete_params = {'miktar': 1, 'malzemeler': [], 'oranlar': []}
+        if ornek_urun:
+            recete_params.update(db.receteler.getir(ornek_urun['urun']))
+        
+        sorgular = []
+        for tip in islemler.RAPOR_BIRIMLERI:
+            sorgular.append((f"raporla ({tip})", islemler.DONEM_RAPORU_SORGUSU,
+                             islemler.donem_raporu_parametreleri(tip)))
+        sorgular.append(("stok_raporu", islemler.STOK_RAPORU_SORGUSU, None))
+        sorgular.append(("satis_kaydet - reçete maliyeti (ortalama)", RECETE_MALIYETI_SORGUSU, recete_params))
+        sorgular.append(("satis_kaydet - reçete maliyeti (FIFO)", FIFO_RECETE_MALIYETI_SORGUSU, recete_params))
+        
+        satirlar = [f"=== SORGU İNDEKS KULLANIMI (şema sürümü {db.schema_version()}) ===", ""]
+        for ad, query, params in sorgular:
+            plan = db.sorgu_indeksleri(query, params)
+            indeksler = ", ".join(plan['indeksler']) or "-"
+            taramalar = ", ".join(plan['sirali_taramalar']) or "-"
+            satirlar.append(f"{ad}")
+            satirlar.append(f"   • İndeksler: {indeksler}")
+            satirlar.append(f"   • Sıralı tarama: {taramalar}")
+        return satirlar
+    
+    def goster(satirlar):
+        liste_rapor.delete(0, tk.END)
+        liste_rapor.insert(tk.END, *satirlar)
+    
+    gorev_calistir(oku, goster, dugme=buton_indeks_raporu)
+
+def excel_kayitlarini_yenile():
+    """Bekleyen Excel kayıtlarının dosyalara yazılmasını bekle"""
+    excel_yazici.bosalt()
+
+def excel_zamanli_yenile():
+    """Excel kayıtlarını belirli aralıklarla yenile (arka planda, beklemeden)"""
+    excel_yazici.yenile()
+    root.after(EXCEL_YENILEME_ARALIGI_MS, excel_zamanli_yenile)
+
+def excel_hata_kontrol():
+    """Arka plan yazıcısındaki hataları arayüzde göster"""
+    hatalar = excel_yazici.hatalari_al()
+    if hatalar:
+        mesaj = "\n".join(f"{islem_tipi}: {str(e)}" for islem_tipi, e in hatalar)
+        messagebox.showerror("Excel Kayıt Hatası", mesaj)
+    root.after(EXCEL_HATA_KONTROL_MS, excel_hata_kontrol)
 
 def excel_dosyalarini_ac():
     """Excel kayıt klasörünü aç"""
-    try:
-        import os
-        import subprocess
-        import platform
-        
-        klasor = "excel_kayitlari"
-        if not os.path.exists(klasor):
-            messagebox.showwarning("Uyarı", "Excel kayıtları klasörü bulunamadı.")
-            return
+    import subprocess
+    import platform
+    
+    klasor = "excel_kayitlari"
+    if not os.path.exists(klasor):
+        messagebox.showwarning("Uyarı", "Excel kayıtları klasörü bulunamadı.")
+        return
+    
+    def ac():
+        # Açmadan önce Excel dosyalarını günlüklerden güncelle
+        excel_kayitlarini_yenile()
         
         # İşletim sistemine göre klasörü aç
         if platform.system() == "Windows":
@@ -1000,9 +670,8 @@ def excel_dosyalarini_ac():
             subprocess.call(["open", klasor])
         else:  # Linux
             subprocess.call(["xdg-open", klasor])
-            
-    except Exception as e:
-        messagebox.showerror("Hata", f"Klasör açılamadı: {str(e)}")
+    
+    gorev_calistir(ac, hata_mesaji="Klasör açılamadı")
 
 f8 = ttk.Frame(notebook)
 notebook.add(f8, text="Raporlama")
@@ -1012,18 +681,29 @@ rapor_frame = tk.Frame(f8)
 rapor_frame.pack(pady=10)
 
 tk.Label(rapor_frame, text="Rapor Tipi:").grid(row=0, column=0, padx=5)
-combo_rapor_tipi = ttk.Combobox(rapor_frame, values=["Günlük", "Aylık"], state="readonly")
+combo_rapor_tipi = ttk.Combobox(rapor_frame, values=list(islemler.RAPOR_BIRIMLERI), state="readonly")
 combo_rapor_tipi.set("Günlük")
 combo_rapor_tipi.grid(row=0, column=1, padx=5)
+tk.Label(rapor_frame, text="Başlangıç (YYYY-MM-DD):").grid(row=0, column=2, padx=5)
+entry_rapor_baslangic = tk.Entry(rapor_frame, width=12)
+entry_rapor_baslangic.grid(row=0, column=3, padx=5)
+tk.Label(rapor_frame, text="Bitiş:").grid(row=0, column=4, padx=5)
+entry_rapor_bitis = tk.Entry(rapor_frame, width=12)
+entry_rapor_bitis.grid(row=0, column=5, padx=5)
 
 # Butonlar
 buton_frame = tk.Frame(f8)
 buton_frame.pack(pady=5)
 
-tk.Button(buton_frame, text="Gelir-Gider Raporu", command=raporla).grid(row=0, column=0, padx=5)
-tk.Button(buton_frame, text="Stok Raporu", command=stok_raporu).grid(row=0, column=1, padx=5)
-tk.Button(buton_frame, text="Ürün Raporu", command=urun_raporu).grid(row=0, column=2, padx=5)
+buton_gelir_gider_raporu = tk.Button(buton_frame, text="Gelir-Gider Raporu", command=raporla)
+buton_gelir_gider_raporu.grid(row=0, column=0, padx=5)
+buton_stok_raporu = tk.Button(buton_frame, text="Stok Raporu", command=stok_raporu)
+buton_stok_raporu.grid(row=0, column=1, padx=5)
+buton_urun_raporu = tk.Button(buton_frame, text="Ürün Raporu", command=urun_raporu)
+buton_urun_raporu.grid(row=0, column=2, padx=5)
 tk.Button(buton_frame, text="Excel Kayıtlarını Aç", command=excel_dosyalarini_ac, bg="lightblue").grid(row=0, column=3, padx=5)
+buton_indeks_raporu = tk.Button(buton_frame, text="İndeks Raporu", command=indeks_raporu)
+buton_indeks_raporu.grid(row=0, column=4, padx=5)
 
 # Rapor listesi
 liste_rapor = tk.Listbox(f8, width=100, height=20, font=("Consolas", 9))
@@ -1039,294 +719,119 @@ tk.Label(f8, text="TURKCE KARAKTER KULLANMAYIN!", fg="red").pack(pady=5)
 
 # === GENEL EXCEL RAPORU FONKSİYONU ===
 def excel_raporu_olustur():
-    """Tüm verileri Excel dosyasına kaydet"""
-    try:
-        # Dosya adı oluştur
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"beton_takip_genel_raporu_{timestamp}.xlsx"
-        
-        # Excel workbook oluştur
-        wb = openpyxl.Workbook()
-        
-        # Varsayılan sheet'i sil
-        wb.remove(wb.active)
-        
-        # Stil tanımlamaları
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        def format_sheet(ws, df):
-            """Sheet'i formatla"""
-            # Header'ları formatla
-            for cell in ws[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                cell.border = border
-            
-            # Tüm hücrelere border ekle
-            for row in ws.iter_rows():
-                for cell in row:
-                    cell.border = border
-            
-            # Sütun genişliklerini ayarla
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # 1. STOK RAPORU
-        stok_data = db.fetch_all("SELECT malzeme, miktar_kg, created_at, updated_at FROM stok ORDER BY malzeme")
-        if stok_data:
-            df_stok = pd.DataFrame(stok_data)
-            ws_stok = wb.create_sheet("Stok Durumu")
-            
-            for row in dataframe_to_rows(df_stok, index=False, header=True):
-                ws_stok.append(row)
-            
-            format_sheet(ws_stok, df_stok)
-        
-        # 2. ALIŞLAR RAPORU
-        alis_data = db.fetch_all("""
-            SELECT malzeme, miktar_kg, birim_fiyat, toplam_tutar, tarih, created_at 
-            FROM alislar 
-            ORDER BY tarih DESC, created_at DESC
-        """)
-        if alis_data:
-            df_alis = pd.DataFrame(alis_data)
-            ws_alis = wb.create_sheet("Alışlar")
-            
-            for row in dataframe_to_rows(df_alis, index=False, header=True):
-                ws_alis.append(row)
-            
-            format_sheet(ws_alis, df_alis)
-            
-            # Toplam satırı ekle
-            total_row = ws_alis.max_row + 2
-            ws_alis[f'C{total_row}'] = "TOPLAM:"
-            ws_alis[f'D{total_row}'] = f"=SUM(D2:D{ws_alis.max_row-1})"
-            ws_alis[f'C{total_row}'].font = Font(bold=True)
-            ws_alis[f'D{total_row}'].font = Font(bold=True)
-        
-        # 3. ÜRÜNLER VE REÇETELER
-        urun_data = db.fetch_all("SELECT urun, malzeme, yuzde, created_at FROM urunler ORDER BY urun, malzeme")
-        if urun_data:
-            df_urun = pd.DataFrame(urun_data)
-            ws_urun = wb.create_sheet("Ürün Reçeteleri")
-            
-            for row in dataframe_to_rows(df_urun, index=False, header=True):
-                ws_urun.append(row)
-            
-            format_sheet(ws_urun, df_urun)
-        
-        # 4. ÜRETİMLER RAPORU
-        uretim_data = db.fetch_all("SELECT urun, gramaj_kg, tarih, created_at FROM uretimler ORDER BY tarih DESC")
-        if uretim_data:
-            df_uretim = pd.DataFrame(uretim_data)
-            ws_uretim = wb.create_sheet("Üretimler")
-            
-            for row in dataframe_to_rows(df_uretim, index=False, header=True):
-                ws_uretim.append(row)
-            
-            format_sheet(ws_uretim, df_uretim)
-            
-            # Toplam üretim
-            total_row = ws_uretim.max_row + 2
-            ws_uretim[f'A{total_row}'] = "TOPLAM ÜRETİM:"
-            ws_uretim[f'B{total_row}'] = f"=SUM(B2:B{ws_uretim.max_row-1})"
-            ws_uretim[f'A{total_row}'].font = Font(bold=True)
-            ws_uretim[f'B{total_row}'].font = Font(bold=True)
-        
-        # 5. SATIŞLAR RAPORU
-        satis_data = db.fetch_all("""
-            SELECT urun, musteri, miktar_kg, satis_fiyat, toplam_satis, net_kar, tarih, created_at 
-            FROM satislar 
-            ORDER BY tarih DESC, created_at DESC
-        """)
-        if satis_data:
-            df_satis = pd.DataFrame(satis_data)
-            ws_satis = wb.create_sheet("Satışlar")
-            
-            for row in dataframe_to_rows(df_satis, index=False, header=True):
-                ws_satis.append(row)
-            
-            format_sheet(ws_satis, df_satis)
-            
-            # Toplam satırları
-            total_row = ws_satis.max_row + 2
-            ws_satis[f'D{total_row}'] = "TOPLAM:"
-            ws_satis[f'E{total_row}'] = f"=SUM(E2:E{ws_satis.max_row-1})"  # Toplam satış
-            ws_satis[f'F{total_row}'] = f"=SUM(F2:F{ws_satis.max_row-1})"  # Toplam kar
-            ws_satis[f'D{total_row}'].font = Font(bold=True)
-            ws_satis[f'E{total_row}'].font = Font(bold=True)
-            ws_satis[f'F{total_row}'].font = Font(bold=True)
-        
-        # 6. İADELER/HURDA RAPORU
-        iade_data = db.fetch_all("SELECT tarih, tip, urun, miktar, sebep, created_at FROM iadeler ORDER BY tarih DESC")
-        if iade_data:
-            df_iade = pd.DataFrame(iade_data)
-            ws_iade = wb.create_sheet("İadeler-Hurda")
-            
-            for row in dataframe_to_rows(df_iade, index=False, header=True):
-                ws_iade.append(row)
-            
-            format_sheet(ws_iade, df_iade)
-        
-        # 7. TAŞ GELİR-GİDER RAPORU
-        tas_data = db.fetch_all("""
-            SELECT tarih, tip, aciklama, birim, birim_fiyat, miktar, toplam_tutar, created_at 
-            FROM tas_gelir_gider 
-            ORDER BY tarih DESC, created_at DESC
-        """)
-        if tas_data:
-            df_tas = pd.DataFrame(tas_data)
-            ws_tas = wb.create_sheet("Taş Gelir-Gider")
-            
-            for row in dataframe_to_rows(df_tas, index=False, header=True):
-                ws_tas.append(row)
-            
-            format_sheet(ws_tas, df_tas)
-        
-        # 8. BETON GELİR-GİDER RAPORU
-        beton_data = db.fetch_all("""
-            SELECT tarih, tip, aciklama, birim, birim_fiyat, miktar, toplam_tutar, created_at 
-            FROM beton_gelir_gider 
-            ORDER BY tarih DESC, created_at DESC
-        """)
-        if beton_data:
-            df_beton = pd.DataFrame(beton_data)
-            ws_beton = wb.create_sheet("Beton Gelir-Gider")
-            
-            for row in dataframe_to_rows(df_beton, index=False, header=True):
-                ws_beton.append(row)
-            
-            format_sheet(ws_beton, df_beton)
-        
-        # 9. ÖZET RAPORU
-        ws_ozet = wb.create_sheet("Özet Rapor")
-        wb.active = ws_ozet  # Özet raporu aktif sheet yap
-        
-        # Özet verilerini hesapla
-        ozet_data = []
-        
-        # Toplam stok
-        toplam_stok = db.fetch_one("SELECT SUM(miktar_kg) as toplam FROM stok")
-        ozet_data.append(["Toplam Stok (kg)", toplam_stok['toplam'] if toplam_stok['toplam'] else 0])
-        
-        # Toplam alış tutarı
-        toplam_alis = db.fetch_one("SELECT SUM(toplam_tutar) as toplam FROM alislar")
-        ozet_data.append(["Toplam Alış Tutarı (TL)", toplam_alis['toplam'] if toplam_alis['toplam'] else 0])
-        
-        # Toplam üretim
-        toplam_uretim = db.fetch_one("SELECT SUM(gramaj_kg) as toplam FROM uretimler")
-        ozet_data.append(["Toplam Üretim (kg)", toplam_uretim['toplam'] if toplam_uretim['toplam'] else 0])
-        
-        # Toplam satış tutarı
-        toplam_satis_tutar = db.fetch_one("SELECT SUM(toplam_satis) as toplam FROM satislar")
-        ozet_data.append(["Toplam Satış Tutarı (TL)", toplam_satis_tutar['toplam'] if toplam_satis_tutar['toplam'] else 0])
-        
-        # Toplam net kar
-        toplam_kar = db.fetch_one("SELECT SUM(net_kar) as toplam FROM satislar")
-        ozet_data.append(["Toplam Net Kar (TL)", toplam_kar['toplam'] if toplam_kar['toplam'] else 0])
-        
-        # Taş gelir-gider net
-        tas_net = db.fetch_one("""
-            SELECT SUM(CASE WHEN tip = 'Gelir' THEN toplam_tutar ELSE -toplam_tutar END) as net 
-            FROM tas_gelir_gider
-        """)
-        ozet_data.append(["Taş İşleri Net (TL)", tas_net['net'] if tas_net['net'] else 0])
-        
-        # Beton gelir-gider net
-        beton_net = db.fetch_one("""
-            SELECT SUM(CASE WHEN tip = 'Gelir' THEN toplam_tutar ELSE -toplam_tutar END) as net 
-            FROM beton_gelir_gider
-        """)
-        ozet_data.append(["Beton İşleri Net (TL)", beton_net['net'] if beton_net['net'] else 0])
-        
-        # Özet tablosunu oluştur
-        headers = ["Kategori", "Değer"]
-        ws_ozet.append(headers)
-        
-        for row in ozet_data:
-            ws_ozet.append(row)
-        
-        # Özet raporu formatla
-        for cell in ws_ozet[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = border
-        
-        for row in ws_ozet.iter_rows(min_row=2):
-            row[0].font = Font(bold=True)
-            for cell in row:
-                cell.border = border
-        
-        # Sütun genişliklerini ayarla
-        ws_ozet.column_dimensions['A'].width = 25
-        ws_ozet.column_dimensions['B'].width = 20
-        
-        # Rapor oluşturma tarihi ekle
-        ws_ozet[f'A{len(ozet_data) + 3}'] = "Rapor Tarihi:"
-        ws_ozet[f'B{len(ozet_data) + 3}'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        ws_ozet[f'A{len(ozet_data) + 3}'].font = Font(bold=True)
-        
-        # Excel dosyasını kaydet
-        wb.save(filename)
-        
+    """Tüm verileri Excel dosyasına kaydet (tablolar paralel okunur, akış halinde yazılır)"""
+    def rapor_yaz(ilerleme):
+        return islemler.genel_excel_raporu(db, ilerleme=ilerleme)
+    
+    def bitince(filename):
         messagebox.showinfo("Başarılı", f"Genel Excel raporu oluşturuldu: {filename}")
         
         # Dosyayı açmak isteyip istemediğini sor
         result = messagebox.askyesno("Dosyayı Aç", "Excel dosyasını şimdi açmak istiyor musunuz?")
         if result:
             os.startfile(filename)  # Windows için
-            
-    except Exception as e:
-        messagebox.showerror("Hata", f"Excel raporu oluşturulurken hata: {str(e)}")
+    
+    ilerlemeli_calistir("Genel Excel Raporu", rapor_yaz, bitince,
+                        hata_mesaji="Excel raporu oluşturulurken hata", dugme=buton_excel_raporu)
 
 # Genel Excel raporu butonu
-tk.Button(buton_frame, text="Genel Excel Raporu", command=excel_raporu_olustur, bg="lightgreen").grid(row=1, column=0, columnspan=4, pady=5)
+buton_excel_raporu = tk.Button(buton_frame, text="Genel Excel Raporu", command=excel_raporu_olustur, bg="lightgreen")
+buton_excel_raporu.grid(row=1, column=0, columnspan=5, pady=5)
 
 # === VERİTABANI YÖNETIM SEKMESİ ===
 def veritabani_yedekle():
-    """Veritabanını yedekle (CSV formatında)"""
+    """Veritabanını yedekle (COPY ile sıkıştırılmış CSV, tablolar paralel ve tutarlı bir anlık görüntüden)"""
+    def yedekle(ilerleme):
+        return yedekleme.yedek_al(
+            db, ilerleme=lambda tamamlanan, toplam, ad: ilerleme(tamamlanan, toplam, f"{ad} yedeklendi"))
+    
+    def bitince(yedek_dizini):
+        messagebox.showinfo("Başarılı", f"Veritabanı {yedek_dizini} klasörüne yedeklendi.")
+    
+    ilerlemeli_calistir("Veritabanı Yedekleme", yedekle, bitince, hata_mesaji="Yedekleme hatası",
+                        dugme=buton_yedekle)
+
+def veritabani_artimli_yedekle():
+    """Son yedekten bu yana eklenen/değişen satırları yedekle (uygun zincir yoksa tam yedek)"""
+    def yedekle(ilerleme):
+        return yedekleme.artimli_yedek_al(
+            db, ilerleme=lambda tamamlanan, toplam, ad: ilerleme(tamamlanan, toplam, f"{ad} yedeklendi"))
+    
+    def bitince(sonuc):
+        yedek_dizini, tur = sonuc
+        if tur == 'artimli':
+            messagebox.showinfo("Başarılı", f"Artımlı yedek {yedek_dizini} klasörüne alındı.")
+        else:
+            messagebox.showinfo("Başarılı",
+                f"Artımlı yedeğin bağlanacağı uygun bir yedek yoktu ya da arada kayıt silinmişti;\n"
+                f"tam yedek {yedek_dizini} klasörüne alındı.")
+    
+    ilerlemeli_calistir("Artımlı Yedekleme", yedekle, bitince, hata_mesaji="Yedekleme hatası",
+                        dugme=buton_artimli_yedekle)
+
+def veritabani_geri_yukle():
+    """Seçilen yedek klasörünü veritabanına geri yükle (mevcut veriler değiştirilir)"""
+    yedek_dizini = filedialog.askdirectory(title="Yedek Klasörünü Seçin",
+                                           initialdir=yedekleme.YEDEK_KLASORU)
+    if not yedek_dizini:
+        return
+    
     try:
-        import os
-        from datetime import datetime
-        
-        # Yedek klasörü oluştur
-        backup_dir = "veritabani_yedekleri"
-        os.makedirs(backup_dir, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Tüm tabloları yedekle
-        tables = ['stok', 'alislar', 'urunler', 'uretimler', 'satislar', 
-                 'iadeler', 'tas_gelir_gider', 'beton_gelir_gider']
-        
-        for table in tables:
-            data = db.fetch_all(f"SELECT * FROM {table}")
-            if data:
-                df = pd.DataFrame(data)
-                df.to_csv(f"{backup_dir}/{table}_{timestamp}.csv", index=False, encoding='utf-8')
-        
-        messagebox.showinfo("Başarılı", f"Veritabanı {backup_dir} klasörüne yedeklendi.")
-        
+        manifest = yedekleme.manifest_oku(yedek_dizini)
+        zincir = yedekleme.yedek_zinciri(yedek_dizini)
     except Exception as e:
-        messagebox.showerror("Hata", f"Yedekleme hatası: {str(e)}")
+        messagebox.showerror("Hata", str(e))
+        return
+    
+    zincir_metni = f" (tam yedek + {len(zincir) - 1} artımlı yedek)" if len(zincir) > 1 else ""
+    result = messagebox.askyesno("Uyarı",
+        f"{manifest['olusturma']} tarihli yedek{zincir_metni} geri yüklenecek.\n\n"
+        "Mevcut TÜM VERİLER bu yedektekilerle değiştirilecek. Devam etmek istiyor musunuz?")
+    if not result:
+        return
+    
+    def yukle(ilerleme):
+        return yedekleme.geri_yukle(
+            db, yedek_dizini, ilerleme=lambda tamamlanan, toplam, ad: ilerleme(tamamlanan, toplam, f"{ad} yüklendi"))
+    
+    def bitince(satir_sayilari):
+        messagebox.showinfo("Başarılı", f"Yedek geri yüklendi ({sum(satir_sayilari.values())} satır).")
+        guncelle_comboboxlar()
+    
+    ilerlemeli_calistir("Yedekten Geri Yükleme", yukle, bitince, hata_mesaji="Geri yükleme hatası",
+                        dugme=buton_geri_yukle)
+
+def toplu_ice_aktar():
+    """Excel kayıtları biçimindeki CSV/XLSX dosyalarından geçmiş kayıtları toplu içe aktar"""
+    dosyalar = filedialog.askopenfilenames(
+        title="İçe Aktarılacak Dosyaları Seçin",
+        filetypes=[("Kayıt dosyaları", " ".join(f"*{u}" for u in ice_aktarim.DESTEKLENEN_UZANTILAR)),
+                   ("Tüm dosyalar", "*.*")])
+    if not dosyalar:
+        return
+    
+    try:
+        turler = [ice_aktarim.dosya_turu(yol) for yol in dosyalar]
+    except Exception as e:
+        messagebox.showerror("Hata", str(e))
+        return
+    
+    result = messagebox.askyesno("Toplu İçe Aktarım",
+        f"{len(dosyalar)} dosya içe aktarılacak ({', '.join(sorted(set(turler)))}).\n"
+        "Stok bakiyeleri alış, iade ve üretimlere göre güncellenecek. Devam edilsin mi?")
+    if not result:
+        return
+    
+    def aktar(ilerleme):
+        return ice_aktarim.ice_aktar(db, dosyalar, ilerleme)
+    
+    def bitince(satir_sayilari):
+        ozet = "\n".join(f"{tip}: {sayi} kayıt" for tip, sayi in satir_sayilari.items())
+        messagebox.showinfo("Başarılı", f"İçe aktarım tamamlandı.\n\n{ozet}")
+        guncelle_comboboxlar()
+    
+    ilerlemeli_calistir("Toplu İçe Aktarım", aktar, bitince, hata_mesaji="İçe aktarım hatası",
+                        dugme=buton_ice_aktar)
 
 def veritabani_temizle():
     """Tüm tabloları temizle (dikkatli kullanın!)"""
@@ -1338,18 +843,42 @@ def veritabani_temizle():
             "SON UYARI: Tüm veriler kalıcı olarak silinecek!\n\nGerçekten devam etmek istiyor musunuz?")
         
         if result2:
-            try:
-                tables = ['satislar', 'uretimler', 'iadeler', 'tas_gelir_gider', 
-                         'beton_gelir_gider', 'urunler', 'alislar', 'stok']
-                
-                for table in tables:
-                    db.execute_query(f"DELETE FROM {table}")
-                
+            def temizle():
+                islemler.tum_verileri_sil(db)
+            
+            def bitince(_):
                 messagebox.showinfo("Tamamlandı", "Tüm veriler silindi.")
                 guncelle_comboboxlar()
-                
-            except Exception as e:
-                messagebox.showerror("Hata", f"Temizleme hatası: {str(e)}")
+            
+            gorev_calistir(temizle, bitince, dugme=buton_temizle, hata_mesaji="Temizleme hatası")
+
+# Arayüzde gösterilen ad -> veritabani.MALIYET_YONTEMLERI
+MALIYET_YONTEMI_ADLARI = {"Ağırlıklı Ortalama": 'ortalama', "FIFO": 'fifo'}
+
+def maliyet_yontemi_degistir():
+    """Seçilen maliyet yöntemini kaydet ve geçmiş satışların net kârını yeniden hesapla"""
+    yontem = MALIYET_YONTEMI_ADLARI.get(combo_maliyet_yontemi.get())
+    if not yontem:
+        messagebox.showerror("Hata", "Maliyet yöntemi seçin.")
+        return
+    
+    if not messagebox.askyesno("Onay",
+            f"Maliyet yöntemi '{combo_maliyet_yontemi.get()}' olacak ve geçmiş tüm satışların "
+            f"net kârı bu yöntemle yeniden hesaplanacak.\n\nDevam edilsin mi?"):
+        return
+    
+    def hesapla(ilerleme):
+        ilerleme(0, 1, "Net kârlar hesaplanıyor")
+        degisen = db.net_kar_yeniden_hesapla(yontem)
+        db.config.maliyet_yontemi_kaydet(yontem)
+        return degisen
+    
+    def bitince(degisen):
+        messagebox.showinfo("Tamamlandı", f"Maliyet yöntemi kaydedildi; {degisen} satışın net kârı güncellendi.")
+    
+    # Tek UPDATE ifadesi; ara adım olmadığından iptal edilemez
+    ilerlemeli_calistir("Maliyet Yöntemi", hesapla, bitince, hata_mesaji="Yeniden hesaplama hatası",
+                        dugme=buton_maliyet_yontemi, iptal_edilebilir=False)
 
 f9 = ttk.Frame(notebook)
 notebook.add(f9, text="Veritabanı Yönetimi")
@@ -1362,15 +891,57 @@ tk.Label(info_frame, text=f"Sunucu: {db.config.host}:{db.config.port}").pack(anc
 tk.Label(info_frame, text=f"Veritabanı: {db.config.database}").pack(anchor="w")
 tk.Label(info_frame, text=f"Kullanıcı: {db.config.username}").pack(anchor="w")
 
+def havuz_istatistiklerini_goster():
+    """Bağlantı havuzu istatistiklerini göster"""
+    ist = db.havuz_istatistikleri()
+    messagebox.showinfo("Bağlantı Havuzu",
+        f"Kullanımda: {ist['kullanimda']} / {ist['azami']}\n"
+        f"Bekleme sayısı: {ist['bekleme_sayisi']}\n"
+        f"Toplam bekleme: {ist['toplam_bekleme_sn']:.3f} sn\n"
+        f"Ortalama bekleme: {ist['ortalama_bekleme_ms']:.1f} ms\n"
+        f"Yeniden bağlanma: {ist['yeniden_baglanma']}")
+
+tk.Button(info_frame, text="Havuz İstatistikleri", command=havuz_istatistiklerini_goster).pack(anchor="w", pady=5)
+
 # Yönetim butonları
 yonetim_frame = tk.LabelFrame(f9, text="Veritabanı İşlemleri", padx=10, pady=10)
 yonetim_frame.pack(padx=10, pady=10, fill="x")
 
-tk.Button(yonetim_frame, text="Veritabanını Yedekle", command=veritabani_yedekle, 
-         bg="lightgreen").pack(pady=5, fill="x")
+buton_yedekle = tk.Button(yonetim_frame, text="Veritabanını Yedekle", command=veritabani_yedekle, 
+         bg="lightgreen")
+buton_yedekle.pack(pady=5, fill="x")
+
+buton_artimli_yedekle = tk.Button(yonetim_frame, text="Artımlı Yedek Al", command=veritabani_artimli_yedekle, 
+         bg="lightgreen")
+buton_artimli_yedekle.pack(pady=5, fill="x")
+
+buton_geri_yukle = tk.Button(yonetim_frame, text="Yedekten Geri Yükle", command=veritabani_geri_yukle, 
+         bg="lightyellow")
+buton_geri_yukle.pack(pady=5, fill="x")
+
+buton_ice_aktar = tk.Button(yonetim_frame, text="Toplu İçe Aktar (CSV/XLSX)", command=toplu_ice_aktar, 
+         bg="lightblue")
+buton_ice_aktar.pack(pady=5, fill="x")
+
+tk.Button(yonetim_frame, text="Malzeme/Ürün Listelerini Yenile", command=lambda: listeleri_yenile(), 
+         bg="lightblue").pack(pady=5, fill="x")
 
-tk.Button(yonetim_frame, text="Tüm Verileri Temizle", command=veritabani_temizle, 
-         bg="lightcoral", fg="white").pack(pady=5, fill="x")
+buton_temizle = tk.Button(yonetim_frame, text="Tüm Verileri Temizle", command=veritabani_temizle, 
+         bg="lightcoral", fg="white")
+buton_temizle.pack(pady=5, fill="x")
+
+# Maliyet yöntemi
+maliyet_frame = tk.LabelFrame(f9, text="Maliyet Yöntemi", padx=10, pady=10)
+maliyet_frame.pack(padx=10, pady=10, fill="x")
+
+combo_maliyet_yontemi = ttk.Combobox(maliyet_frame, values=list(MALIYET_YONTEMI_ADLARI), state="readonly")
+combo_maliyet_yontemi.set(next((ad for ad, yontem in MALIYET_YONTEMI_ADLARI.items()
+                                if yontem == db.config.maliyet_yontemi), "Ağırlıklı Ortalama"))
+combo_maliyet_yontemi.pack(pady=5, fill="x")
+
+buton_maliyet_yontemi = tk.Button(maliyet_frame, text="Uygula ve Geçmiş Kârları Yeniden Hesapla", command=maliyet_yontemi_degistir, 
+         bg="lightyellow")
+buton_maliyet_yontemi.pack(pady=5, fill="x")
 
 # Excel kayıtları yönetimi
 excel_frame = tk.LabelFrame(f9, text="Excel Kayıtları", padx=10, pady=10)
@@ -1391,28 +962,168 @@ tk.Button(excel_frame, text="Excel Kayıtları Klasörünü Aç", command=excel_
 tk.Label(f9, text="⚠️ Veritabanı işlemlerini dikkatli kullanın!", 
          fg="red", font=("Arial", 10, "bold")).pack(pady=10)
 
+# === TANILAMA SEKMESİ ===
+# İşleyici gecikmeleri (veritabanı / Excel G/Ç / arayüz), SQL ifadesi süreleri ve yavaş sorgular
+BILESEN_ADLARI = {
+    "toplam": "Toplam",
+    "veritabani": "Veritabanı",
+    "excel": "Excel G/Ç",
+    "diger": "Diğer (Python, bekleme)",
+    "arayuz": "Arayüz",
+}
+TANILAMA_IFADE_SAYISI = 30
+TANILAMA_YAVAS_SAYISI = 50
+
+def tanilama_goster():
+    """Ölçüm özetlerini tanılama listesine yaz (bellekten okunur, sorgu yapılmaz)"""
+    satirlar = ["=== İŞLEYİCİ GECİKMELERİ (ms) ===", ""]
+    for ad, bilesenler in db.olcum.isleyiciler().items():
+        toplam = bilesenler.get("toplam") or next(iter(bilesenler.values()))
+        satirlar.append(f"{ad} ({toplam['adet']} çalıştırma)")
+        for bilesen, bilesen_adi in BILESEN_ADLARI.items():
+            ozet = bilesenler.get(bilesen)
+            if ozet:
+                satirlar.append(f"   • {bilesen_adi:<24} ort {ozet['ort_ms']:9.1f} | p50 {ozet['p50_ms']:8.0f} | "
+                                f"p95 {ozet['p95_ms']:8.0f} | azami {ozet['azami_ms']:9.1f}")
+    
+    ifadeler = db.olcum.ifadeler()
+    satirlar += ["", f"=== EN ÇOK ZAMAN ALAN SQL İFADELERİ (ilk {TANILAMA_IFADE_SAYISI} / {len(ifadeler)}) ===", ""]
+    for ozet in ifadeler[:TANILAMA_IFADE_SAYISI]:
+        satirlar.append(f"toplam {ozet['toplam_ms']:10.1f} ms | {ozet['adet']:6} kez | ort {ozet['ort_ms']:8.2f} | "
+                        f"p95 {ozet['p95_ms']:6.0f} | {ozet['satir']} satır")
+        satirlar.append(f"   {ozet['sorgu'][:160]}")
+    
+    yavaslar = db.olcum.yavas_sorgular()[-TANILAMA_YAVAS_SAYISI:]
+    satirlar += ["", f"=== YAVAŞ SORGULAR (eşik {db.olcum.yavas_esik_ms} ms, son {len(yavaslar)}) ===", ""]
+    for kayit in reversed(yavaslar):
+        satirlar.append(f"{kayit['zaman']} | {kayit['sure_ms']:9.1f} ms | {kayit['satir']} satır | {kayit['is_parcacigi']}")
+        satirlar.append(f"   {kayit['sorgu'][:160]}")
+        if kayit['parametreler'] is not None:
+            satirlar.append(f"   parametreler: {kayit['parametreler']}")
+    
+    liste_tanilama.delete(0, tk.END)
+    liste_tanilama.insert(tk.END, *satirlar)
+
+def tanilama_disa_aktar(tur):
+    """Ölçümleri JSON ya da CSV dosyasına aktar"""
+    dosya_yolu = filedialog.asksaveasfilename(
+        title="Ölçümleri Dışa Aktar",
+        defaultextension=f".{tur}",
+        initialfile=f"olcumler_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{tur}",
+        filetypes=[(tur.upper(), f"*.{tur}")])
+    if not dosya_yolu:
+        return
+    
+    def aktar():
+        if tur == "json":
+            db.olcum.json_aktar(dosya_yolu)
+        else:
+            db.olcum.csv_aktar(dosya_yolu)
+    
+    gorev_calistir(aktar, lambda _: messagebox.showinfo("Başarılı", f"Ölçümler {dosya_yolu} dosyasına yazıldı."),
+                   hata_mesaji="Dışa aktarma hatası")
+
+def tanilama_sifirla():
+    """Bellekteki ölçümleri sil"""
+    db.olcum.sifirla()
+    tanilama_goster()
+
+f10 = ttk.Frame(notebook)
+notebook.add(f10, text="Tanılama")
+
+tanilama_ayar_frame = tk.LabelFrame(f10, text="Sorgu İzleme", padx=10, pady=10)
+tanilama_ayar_frame.pack(padx=10, pady=10, fill="x")
+tk.Label(tanilama_ayar_frame, text=f"Yavaş sorgu eşiği: {db.olcum.yavas_esik_ms} ms "
+         f"(db_config.ini [izleme] yavas_sorgu_ms)").pack(anchor="w")
+tk.Label(tanilama_ayar_frame, text=f"Yavaş sorgu günlüğü: {db.olcum.yavas_dosyasi or 'kapalı'} "
+         f"(parametre değerleri gizlenir)").pack(anchor="w")
+
+tanilama_buton_frame = tk.Frame(f10)
+tanilama_buton_frame.pack(pady=5)
+tk.Button(tanilama_buton_frame, text="Yenile", command=tanilama_goster).grid(row=0, column=0, padx=5)
+tk.Button(tanilama_buton_frame, text="JSON'a Aktar", command=lambda: tanilama_disa_aktar("json"),
+          bg="lightblue").grid(row=0, column=1, padx=5)
+tk.Button(tanilama_buton_frame, text="CSV'ye Aktar", command=lambda: tanilama_disa_aktar("csv"),
+          bg="lightblue").grid(row=0, column=2, padx=5)
+tk.Button(tanilama_buton_frame, text="Ölçümleri Sıfırla", command=tanilama_sifirla,
+          bg="lightyellow").grid(row=0, column=3, padx=5)
+
+liste_tanilama = tk.Listbox(f10, width=100, height=20, font=("Consolas", 9))
+liste_tanilama.pack(side="left", padx=10, pady=10, fill="both", expand=True)
+
+tanilama_scrollbar = tk.Scrollbar(f10)
+tanilama_scrollbar.pack(side="right", fill="y")
+liste_tanilama.config(yscrollcommand=tanilama_scrollbar.set)
+tanilama_scrollbar.config(command=liste_tanilama.yview)
+
+# Sekme açıldığında güncel ölçümler gösterilir
+notebook.bind("<<NotebookTabChanged>>",
+              lambda _: tanilama_goster() if notebook.select() == str(f10) else None)
+
 # === YARDIMCI FONKSİYONLAR ===
-def guncelle_comboboxlar():
-    """Tüm combobox'ları güncelle"""
-    try:
-        # Malzeme listelerini güncelle
-        malzemeler = get_malzemeler()
+# Üst üste gelen yenilemelerde yalnızca en son isteğin sonucu uygulanır
+_katalog_istegi = 0
+
+def guncelle_comboboxlar(bitince=None):
+    """Tüm combobox'ları katalog önbelleğinden güncelle.
+    
+    Önbellek doluysa (kayıtlardan sonra) sorgu yapılmaz; boşsa arka planda tek sorguyla yüklenir.
+    """
+    global _katalog_istegi
+    _katalog_istegi += 1
+    istek = _katalog_istegi
+    
+    def oku():
+        return get_malzemeler(), get_urunler()
+    
+    def doldur(sonuc):
+        if istek != _katalog_istegi:
+            return
+        malzemeler, urunler = sonuc
         combo_urun_malzeme['values'] = malzemeler
-        
-        # Ürün listelerini güncelle
-        urunler = get_urunler()
         combo_uretim_urun['values'] = urunler
         combo_satis_urun['values'] = urunler
-        
-        # Malzeme + ürün listesini güncelle
-        malzeme_ve_urunler = get_malzeme_ve_urunler()
-        combo_iade_urun['values'] = malzeme_ve_urunler
-        
-    except Exception as e:
-        print(f"Combobox güncelleme hatası: {e}")
-
-# Program başlatıldığında combobox'ları güncelle
-guncelle_comboboxlar()
+        combo_iade_urun['values'] = sorted(set(malzemeler + urunler))
+        if bitince:
+            bitince()
+    
+    if db.katalog.yuklu():
+        doldur(oku())
+    else:
+        gorev_calistir(oku, doldur, hata=lambda e: print(f"Combobox güncelleme hatası: {e}"))
+
+def listeleri_yenile():
+    """Malzeme/ürün listelerini veritabanından yeniden yükle (diğer istasyonların kayıtları için)"""
+    db.katalog.yenile()
+    guncelle_comboboxlar()
+
+def acilis_raporu():
+    """--profile-startup: açılış aşamalarının sürelerini konsola yazdır"""
+    toplam = sum(sure for _, sure, _ in acilis_asamalari)
+    print("=== AÇILIŞ PROFİLİ ===")
+    for ad, sure, alt in acilis_asamalari:
+        print(f"{ad:<30}{sure * 1000:9.1f} ms  %{sure / toplam * 100:5.1f}")
+        for alt_ad, alt_sure in alt.items():
+            print(f"  {alt_ad:<28}{alt_sure * 1000:9.1f} ms")
+    print(f"{'toplam':<30}{toplam * 1000:9.1f} ms")
+    yuklu = [ad for ad in ('pandas', 'openpyxl') if ad in sys.modules]
+    print(f"Açılışta yüklenen ağır modüller: {', '.join(yuklu) or 'yok'}")
+
+acilis_asamasi("arayüz")
+
+# Combobox listeleri pencere açıldıktan sonra arka planda yüklenir
+_acilis_bekleyenler = {"ilk çizim", "katalog (arka planda)"}
+
+def _acilis_bitti(ad):
+    """İlk çizim ve katalog yüklemesi bitince açılış raporunu yazdır"""
+    acilis_asamasi(ad)
+    _acilis_bekleyenler.discard(ad)
+    if ACILIS_PROFILI and not _acilis_bekleyenler:
+        acilis_raporu()
+
+root.after(GOREV_KONTROL_MS, tk_islerini_calistir)
+guncelle_comboboxlar(bitince=lambda: _acilis_bitti("katalog (arka planda)"))
+root.after_idle(lambda: _acilis_bitti("ilk çizim"))
 
 # === PROGRAM BAŞLAT ===
 if __name__ == "__main__":
@@ -1421,8 +1132,20 @@ if __name__ == "__main__":
         os.makedirs("excel_kayitlari", exist_ok=True)
         print("Excel kayıtları klasörü hazır: excel_kayitlari/")
         
+        root.after(EXCEL_YENILEME_ARALIGI_MS, excel_zamanli_yenile)
+        root.after(EXCEL_HATA_KONTROL_MS, excel_hata_kontrol)
+        root.after(STOK_ANLIK_KONTROL_MS, stok_anlik_kontrol)
+        db.receteler.dinle()
         root.mainloop()
     finally:
+        # Süren uzun işleri iptal et, kayıt görevlerinin bitmesini bekle
+        for iptal in list(_iptal_bayraklari):
+            iptal.set()
+        gorev_havuzu.shutdown(wait=True, cancel_futures=True)
+        
+        # Bekleyen Excel kayıtlarını kalıcı olarak yaz
+        excel_yazici.durdur()
+        
         # Veritabanı bağlantısını kapat
-        if db and db.connection:
-            db.connection.close()
\ No newline at end of file
+        if db:
+            db.close()
\ No newline at end of file
@@ -0,0 +1,423 @@
+# excel_gunluk.py
+# İşlem kayıtları için sadece-ekleme (append-only) günlükler.
+# Her işlem tipi için excel_kayitlari/<islem_tipi>.jsonl dosyasına tek satır eklenir,
+# .xlsx dosyaları istendiğinde bu günlüklerden tek geçişte yeniden üretilir.
+import json
+import os
+import queue
+import threading
+
+# openpyxl yalnızca .xlsx okunup yazılırken (arka plan yazıcısında) gerekir; açılışı
+# yavaşlatmaması için kullanan fonksiyonların içinde import edilir.
+
+KAYIT_KLASORU = "excel_kayitlari"
+GUNLUK_UZANTISI = ".jsonl"
+GENISLIK_UZANTISI = ".genislik.json"
+
+
+def gunluk_yolu(islem_tipi):
+    """İşlem tipine ait günlük dosyasının yolu"""
+    return os.path.join(KAYIT_KLASORU, f"{islem_tipi}{GUNLUK_UZANTISI}")
+
+
+def excel_yolu(islem_tipi):
+    """İşlem tipine ait Excel dosyasının yolu"""
+    return os.path.join(KAYIT_KLASORU, f"{islem_tipi}.xlsx")
+
+
+def genislik_yolu(islem_tipi):
+    """İşlem tipine ait sütun genişliği önbelleğinin yolu"""
+    return os.path.join(KAYIT_KLASORU, f"{islem_tipi}{GENISLIK_UZANTISI}")
+
+
+class SutunGenislikleri:
+    """Sütun başına en uzun değer uzunluğunu tutar.
+
+    Yalnızca yeni eklenen satırlarla güncellenir, böylece genişlik hesabı
+    satır başına O(sütun) olur; sayfadaki tüm hücreler yeniden taranmaz.
+    """
+
+    def __init__(self, basliklar=None, uzunluklar=None):
+        self.basliklar = []
+        self.uzunluklar = []
+        if basliklar:
+            self.basliklar_ekle(basliklar)
+        if uzunluklar:
+            for i, uzunluk in enumerate(uzunluklar):
+                self.uzunluklar[i] = max(self.uzunluklar[i], uzunluk)
+
+    def basliklar_ekle(self, basliklar):
+        """Yeni başlıkları sütun olarak ekle"""
+        for baslik in basliklar:
+            if baslik not in self.basliklar:
+                self.basliklar.append(baslik)
+                self.uzunluklar.append(len(str(baslik)))
+
+    def satir_ekle(self, degerler):
+        """Sıralı değer listesiyle genişlikleri güncelle"""
+        for i, deger in enumerate(degerler):
+            if i >= len(self.uzunluklar):
+                self.uzunluklar.append(0)
+            uzunluk = len(str(deger))
+            if uzunluk > self.uzunluklar[i]:
+                self.uzunluklar[i] = uzunluk
+
+    def kayit_ekle(self, veri_dict):
+        """Başlık-değer sözlüğüyle genişlikleri güncelle"""
+        self.basliklar_ekle(veri_dict.keys())
+        self.satir_ekle([veri_dict.get(baslik) for baslik in self.basliklar])
+
+    def uygula(self, ws):
+        """Genişlikleri çalışma sayfasına uygula"""
+        from openpyxl.utils import get_column_letter
+
+        for i, uzunluk in enumerate(self.uzunluklar, start=1):
+            ws.column_dimensions[get_column_letter(i)].width = min(uzunluk + 2, 50)
+
+    @classmethod
+    def yukle(cls, yol):
+        """Önbellek dosyasından oku, yoksa None döner"""
+        if not os.path.exists(yol):
+            return None
+        with open(yol, encoding="utf-8") as f:
+            veri = json.load(f)
+        return cls(veri["basliklar"], veri["uzunluklar"])
+
+    def kaydet(self, yol):
+        """Önbellek dosyasına yaz"""
+        gecici = yol + ".tmp"
+        with open(gecici, "w", encoding="utf-8") as f:
+            json.dump({"basliklar": self.basliklar, "uzunluklar": self.uzunluklar},
+                      f, ensure_ascii=False)
+        os.replace(gecici, yol)
+
+
+def _genislikleri_hesapla(islem_tipi):
+    """Önbellek yoksa günlüğün tamamından genişlikleri bir kez hesapla"""
+    genislik = SutunGenislikleri()
+    with open(gunluk_yolu(islem_tipi), encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                genislik.kayit_ekle(json.loads(line))
+    genislik.kaydet(genislik_yolu(islem_tipi))
+    return genislik
+
+
+def _genislikleri_al(islem_tipi):
+    """İşlem tipinin genişlik önbelleğini getir, gerekirse oluştur"""
+    genislik = SutunGenislikleri.yukle(genislik_yolu(islem_tipi))
+    if genislik is None:
+        genislik = _genislikleri_hesapla(islem_tipi)
+    return genislik
+
+
+def _gunlugu_excelden_baslat(islem_tipi):
+    """Günlük yoksa mevcut Excel dosyasındaki eski kayıtları günlüğe bir kez aktar"""
+    gunluk = gunluk_yolu(islem_tipi)
+    dosya = excel_yolu(islem_tipi)
+    if os.path.exists(gunluk) or not os.path.exists(dosya):
+        return
+
+    import openpyxl
+
+    wb = openpyxl.load_workbook(dosya, read_only=True)
+    ws = wb.active
+    satirlar = ws.iter_rows(values_only=True)
+    headers = next(satirlar, None)
+    genislik = SutunGenislikleri(headers)
+    with open(gunluk, "w", encoding="utf-8") as f:
+        if headers:
+            for satir in satirlar:
+                if all(deger is None for deger in satir):
+                    continue
+                genislik.satir_ekle(satir)
+                f.write(json.dumps(dict(zip(headers, satir)), ensure_ascii=False, default=str) + "\n")
+    wb.close()
+    genislik.kaydet(genislik_yolu(islem_tipi))
+
+
+def gunluge_ekle(islem_tipi, veri_dict):
+    """Kaydı işlem tipinin günlüğüne ekle (dosya boyutundan bağımsız, O(1))"""
+    gunluge_toplu_ekle(islem_tipi, [veri_dict])
+
+
+class GenislikHatasi(Exception):
+    """Kayıtlar günlüğe eklendi, yalnızca sütun genişliği önbelleği güncellenemedi"""
+
+
+def gunluge_toplu_ekle(islem_tipi, veri_listesi, kalici=False):
+    """Birden fazla kaydı tek dosya açılışında günlüğe ekle.
+
+    Günlüğe ekleme tamamlanma noktasıdır: ekleme yarıda kalırsa dosya eski boyuna
+    kırpılır ve hata yükseltilir (kayıtlar güvenle yeniden denenebilir). Ekleme başarılı
+    olup genişlik önbelleği yazılamazsa GenislikHatasi yükseltilir; kayıtlar günlüktedir.
+    """
+    os.makedirs(KAYIT_KLASORU, exist_ok=True)
+    _gunlugu_excelden_baslat(islem_tipi)
+    genislik = SutunGenislikleri.yukle(genislik_yolu(islem_tipi))
+
+    satirlar = "".join(
+        json.dumps(veri_dict, ensure_ascii=False, default=str) + "\n"
+        for veri_dict in veri_listesi
+    )
+    with open(gunluk_yolu(islem_tipi), "a", encoding="utf-8") as f:
+        baslangic = f.tell()
+        try:
+            f.write(satirlar)
+            f.flush()
+            if kalici:
+                os.fsync(f.fileno())
+        except BaseException:
+            # Yarım satır kalmasın; yeniden denemede kayıtlar çiftlenmesin
+            try:
+                f.truncate(baslangic)
+            except OSError:
+                pass
+            raise
+
+    # Önbellek yalnızca yeni satırlarla güncellenir; yoksa Excel üretilirken hesaplanır
+    if genislik is not None:
+        for veri_dict in veri_listesi:
+            genislik.kayit_ekle(veri_dict)
+        try:
+            genislik.kaydet(genislik_yolu(islem_tipi))
+        except OSError as e:
+            # Bayat önbellek kalmasın: silinebilirse Excel üretilirken günlükten yeniden hesaplanır
+            try:
+                os.remove(genislik_yolu(islem_tipi))
+            except OSError:
+                pass
+            raise GenislikHatasi(f"Sütun genişliği önbelleği yazılamadı: {e}") from e
+
+
+def gunlukleri_listele():
+    """Günlüğü bulunan işlem tiplerini getir"""
+    if not os.path.isdir(KAYIT_KLASORU):
+        return []
+    return sorted(
+        dosya[:-len(GUNLUK_UZANTISI)]
+        for dosya in os.listdir(KAYIT_KLASORU)
+        if dosya.endswith(GUNLUK_UZANTISI)
+    )
+
+
+def excel_olustur(islem_tipi):
+    """Günlükten .xlsx dosyasını tek geçişte yeniden üret"""
+    _gunlugu_excelden_baslat(islem_tipi)
+    gunluk = gunluk_yolu(islem_tipi)
+    if not os.path.exists(gunluk):
+        return None
+
+    genislik = _genislikleri_al(islem_tipi)
+    headers = genislik.basliklar
+    if not headers:
+        return None
+
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+
+    # Stil tanımlamaları
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(islem_tipi)
+
+    # write_only modunda sütun genişlikleri satırlardan önce verilmeli
+    genislik.uygula(ws)
+
+    header_cells = []
+    for h in headers:
+        cell = WriteOnlyCell(ws, value=h)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.border = border
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    with open(gunluk, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            kayit = json.loads(line)
+            row_cells = []
+            for h in headers:
+                cell = WriteOnlyCell(ws, value=kayit.get(h))
+                cell.border = border
+                row_cells.append(cell)
+            ws.append(row_cells)
+
+    # Yarım yazılmış dosya kalmasın diye önce geçici dosyaya kaydet
+    dosya = excel_yolu(islem_tipi)
+    gecici = dosya + ".tmp"
+    wb.save(gecici)
+    os.replace(gecici, dosya)
+    return dosya
+
+
+def tum_excelleri_olustur():
+    """Tüm günlüklerden Excel dosyalarını yeniden üret"""
+    olusanlar = []
+    for islem_tipi in gunlukleri_listele():
+        try:
+            dosya = excel_olustur(islem_tipi)
+            if dosya:
+                olusanlar.append(dosya)
+        except Exception as e:
+            print(f"Excel oluşturma hatası ({islem_tipi}): {str(e)}")
+    return olusanlar
+
+
+# === ARKA PLAN EXCEL YAZICISI ===
+class ExcelYazici(threading.Thread):
+    """Kayıtları kuyruktan alıp günlüklere ve Excel dosyalarına arka planda yazar.
+
+    Kayıtlar her toplu_boyut satırda bir ya da kuyruk bosta_bekleme saniye boş
+    kaldığında yalnızca günlüklere eklenir (genişlik önbelleğiyle birlikte).
+    Değişen .xlsx dosyaları yalnızca istendiğinde yeniden üretilir: yenile()
+    (zamanlayıcı), bosalt() ve durdur(). Yazılamayan kayıtlar ve üretilemeyen
+    dosyalar sonraki seferde yeniden denenir. Hatalar hatalari_al() ile alınır.
+    olcum (olcum.Olcum) atanırsa her toplu yazım "Excel yazıcısı" işleyicisi olarak ölçülür.
+    """
+
+    _BOSALT = object()
+    _YENILE = object()
+    _DUR = object()
+
+    def __init__(self, toplu_boyut=50, bosta_bekleme=2.0):
+        super().__init__(name="ExcelYazici", daemon=True)
+        self.toplu_boyut = toplu_boyut
+        self.bosta_bekleme = bosta_bekleme
+        self._kuyruk = queue.Queue()
+        self._hatalar = queue.Queue()
+        self._bekleyen = {}
+        self._bekleyen_sayisi = 0
+        self._kirli = set()
+        # (islem_tipi, aşama) -> son bildirilen hata metni; aynı hata her döngüde tekrar bildirilmez
+        self._bildirilen = {}
+        self.olcum = None
+
+    def ekle(self, islem_tipi, veri_dict):
+        """Kaydı yazma kuyruğuna ekle, hemen döner"""
+        self._kuyruk.put((islem_tipi, dict(veri_dict)))
+
+    def yenile(self):
+        """Bekleyen kayıtları yazdır ve değişen Excel dosyalarını üret, beklemeden döner"""
+        self._kuyruk.put((self._YENILE, None))
+
+    def bosalt(self, zaman_asimi=None):
+        """Bekleyen tüm kayıtları yazdır, değişen Excel dosyalarını üret ve bitene kadar bekle"""
+        if not self.is_alive():
+            self._yaz(kalici=True, yeniden_uret=True)
+            return True
+        bitti = threading.Event()
+        self._kuyruk.put((self._BOSALT, bitti))
+        return bitti.wait(zaman_asimi)
+
+    def durdur(self, zaman_asimi=None):
+        """Bekleyen kayıtları kalıcı olarak yaz ve iş parçacığını durdur"""
+        if self.is_alive():
+            self._kuyruk.put((self._DUR, None))
+            self.join(zaman_asimi)
+        else:
+            self._yaz(kalici=True, yeniden_uret=True)
+
+    def _hata_bildir(self, islem_tipi, asama, e):
+        """Hatayı bildir; aynı aşamada aynı hata sürüyorsa yalnızca ilk seferde"""
+        mesaj = f"{type(e).__name__}: {e}"
+        if self._bildirilen.get((islem_tipi, asama)) == mesaj:
+            return
+        self._bildirilen[(islem_tipi, asama)] = mesaj
+        self._hatalar.put((islem_tipi, e))
+
+    def _hata_gecti(self, islem_tipi, *asamalar):
+        """Aşama başarılı oldu; sonraki hatası yeniden bildirilir"""
+        for asama in asamalar:
+            self._bildirilen.pop((islem_tipi, asama), None)
+
+    def hatalari_al(self):
+        """Yazma sırasında oluşan hataları (islem_tipi, hata) olarak getir"""
+        hatalar = []
+        while True:
+            try:
+                hatalar.append(self._hatalar.get_nowait())
+            except queue.Empty:
+                return hatalar
+
+    def run(self):
+        while True:
+            try:
+                islem_tipi, veri = self._kuyruk.get(timeout=self.bosta_bekleme)
+            except queue.Empty:
+                # Kuyruk boşta: bekleyenleri günlüklere yaz
+                if self._bekleyen:
+                    self._yaz()
+                continue
+
+            if islem_tipi is self._DUR:
+                self._yaz(kalici=True, yeniden_uret=True)
+                return
+            if islem_tipi is self._BOSALT:
+                self._yaz(kalici=True, yeniden_uret=True)
+                veri.set()
+                continue
+            if islem_tipi is self._YENILE:
+                self._yaz(yeniden_uret=True)
+                continue
+
+            self._bekleyen.setdefault(islem_tipi, []).append(veri)
+            self._bekleyen_sayisi += 1
+            if self._bekleyen_sayisi >= self.toplu_boyut:
+                self._yaz()
+
+    def _yaz(self, kalici=False, yeniden_uret=False):
+        """Bekleyen kayıtları günlüklere ekle; yeniden_uret ise değişen Excel dosyalarını üret"""
+        if self.olcum is None or not (self._bekleyen or (yeniden_uret and self._kirli)):
+            self._toplu_yaz(kalici, yeniden_uret)
+            return
+        with self.olcum.isleyici("Excel yazıcısı"), self.olcum.bilesen("excel"):
+            self._toplu_yaz(kalici, yeniden_uret)
+
+    def _toplu_yaz(self, kalici, yeniden_uret):
+        bekleyen, self._bekleyen = self._bekleyen, {}
+        self._bekleyen_sayisi = 0
+
+        for islem_tipi, veri_listesi in bekleyen.items():
+            try:
+                gunluge_toplu_ekle(islem_tipi, veri_listesi, kalici=kalici)
+            except GenislikHatasi as e:
+                # Kayıtlar günlükte: yeniden kuyruğa alınmaz, yalnızca hata bildirilir
+                self._kirli.add(islem_tipi)
+                self._hata_gecti(islem_tipi, "gunluk")
+                self._hata_bildir(islem_tipi, "genislik", e)
+                continue
+            except Exception as e:
+                # Ekleme geri alındı; kayıtlar kaybolmasın, sıralarını koruyarak sonraki yazımda yeniden dene
+                self._bekleyen[islem_tipi] = veri_listesi + self._bekleyen.get(islem_tipi, [])
+                self._bekleyen_sayisi += len(veri_listesi)
+                self._hata_bildir(islem_tipi, "gunluk", e)
+                continue
+            self._kirli.add(islem_tipi)
+            self._hata_gecti(islem_tipi, "gunluk", "genislik")
+
+        if not yeniden_uret:
+            return
+        for islem_tipi in sorted(self._kirli):
+            try:
+                excel_olustur(islem_tipi)
+            except Exception as e:
+                # Dosya kilitliyse (ör. Excel'de açık) sonraki yenilemede yeniden denenir
+                self._hata_bildir(islem_tipi, "excel", e)
+                continue
+            self._kirli.discard(islem_tipi)
+            self._hata_gecti(islem_tipi, "excel")
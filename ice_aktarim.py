@@ -0,0 +1,391 @@
+# ice_aktarim.py
+# Geçmiş kayıtların toplu içe aktarımı.
+# excel_kayitlari günlükleriyle aynı biçimdeki CSV/XLSX/JSONL dosyaları (ör. Alislar.xlsx,
+# Satislar.csv) pandas ile sütun bazında doğrulanır, geçici tablolara COPY ile yüklenir
+# ve tek işlemde asıl tablolara aktarılır. Stok bakiyeleri sonunda tek bir küme
+# sorgusuyla güncellenir: alışlar ve iadeler eklenir, üretimlerin reçete tüketimi düşülür.
+# Her stok etkisi, kaydın kendi tarihiyle stok_hareketleri defterine de yazılır.
+# Üretimlerin toplam reçete tüketimi, yüklenmeden önce kilitli stok bakiyeleriyle (aynı
+# aktarımdaki alışlar dahil) karşılaştırılır; net kârı boş satışlar satis_kaydet gibi
+# seçili yöntemin güncel birim maliyetleriyle hesaplanır.
+# pandas yalnızca dosyalar okunurken gerekir; arayüzün açılışını yavaşlatmaması için
+# kullanan fonksiyonların içinde import edilir.
+import io
+import os
+
+from psycopg2 import sql
+
+from veritabani import KDV_ORANI
+
+# İşlem tipi: hedef tablo, günlük sütunu -> tablo sütunu eşlemesi ve stoğu etkileyen tiplerde
+# eklenen satırlardan (malzeme, miktar, kaynak_id, zaman) defter hareketlerini üreten sorgu
+ICE_AKTARIM_TURLERI = {
+    'Urun_Receteleri': {
+        'tablo': 'urunler',
+        'sutunlar': {'Urun': 'urun', 'Malzeme': 'malzeme', 'Yuzde': 'yuzde'},
+        'sayisal': ['yuzde'],
+        'pozitif': ['yuzde'],
+    },
+    'Alislar': {
+        'tablo': 'alislar',
+        'sutunlar': {'Tarih': 'tarih', 'Malzeme': 'malzeme', 'Miktar (kg)': 'miktar_kg',
+                     'Birim Fiyat': 'birim_fiyat', 'Toplam Tutar': 'toplam_tutar'},
+        'sayisal': ['miktar_kg', 'birim_fiyat', 'toplam_tutar'],
+        'pozitif': ['miktar_kg'],
+        'toplam': ('toplam_tutar', 'miktar_kg', 'birim_fiyat'),
+        'hareket': "SELECT malzeme, miktar_kg, id, tarih FROM eklenen",
+    },
+    'Uretimler': {
+        'tablo': 'uretimler',
+        'sutunlar': {'Tarih': 'tarih', 'Urun': 'urun', 'Gramaj (kg)': 'gramaj_kg'},
+        'sayisal': ['gramaj_kg'],
+        'pozitif': ['gramaj_kg'],
+        'hareket': """SELECT r.malzeme, -(e.gramaj_kg * r.yuzde / 100), e.id, e.tarih
+                      FROM eklenen e JOIN urunler r ON r.urun = e.urun""",
+    },
+    'Satislar': {
+        'tablo': 'satislar',
+        'sutunlar': {'Tarih': 'tarih', 'Urun': 'urun', 'Musteri': 'musteri',
+                     'Miktar (kg)': 'miktar_kg', 'Birim Fiyat': 'satis_fiyat',
+                     'Toplam Satis': 'toplam_satis', 'Net Kar': 'net_kar'},
+        'sayisal': ['miktar_kg', 'satis_fiyat', 'toplam_satis', 'net_kar'],
+        'pozitif': ['miktar_kg'],
+        'toplam': ('toplam_satis', 'miktar_kg', 'satis_fiyat'),
+        'istege_bagli': ['net_kar'],
+    },
+    'Iadeler_Hurda': {
+        'tablo': 'iadeler',
+        'sutunlar': {'Tarih': 'tarih', 'Tip': 'tip', 'Urun/Malzeme': 'urun',
+                     'Miktar': 'miktar', 'Sebep': 'sebep'},
+        'sayisal': ['miktar'],
+        'pozitif': ['miktar'],
+        'tipler': ['İade', 'Hurda'],
+        'hareket': "SELECT urun, miktar, id, tarih FROM eklenen WHERE tip = 'İade'",
+        'istege_bagli': ['sebep'],
+    },
+    'Tas_Gelir_Gider': {
+        'tablo': 'tas_gelir_gider',
+        'sutunlar': {'Tarih': 'tarih', 'Tip': 'tip', 'Aciklama': 'aciklama', 'Birim': 'birim',
+                     'Birim Fiyat': 'birim_fiyat', 'Miktar': 'miktar', 'Toplam Tutar': 'toplam_tutar'},
+        'sayisal': ['birim_fiyat', 'miktar', 'toplam_tutar'],
+        'pozitif': ['miktar'],
+        'toplam': ('toplam_tutar', 'miktar', 'birim_fiyat'),
+        'tipler': ['Gelir', 'Gider'],
+        'istege_bagli': ['birim'],
+    },
+    'Beton_Gelir_Gider': {
+        'tablo': 'beton_gelir_gider',
+        'sutunlar': {'Tarih': 'tarih', 'Tip': 'tip', 'Aciklama': 'aciklama', 'Birim': 'birim',
+                     'Birim Fiyat': 'birim_fiyat', 'Miktar': 'miktar', 'Toplam Tutar': 'toplam_tutar'},
+        'sayisal': ['birim_fiyat', 'miktar', 'toplam_tutar'],
+        'pozitif': ['miktar'],
+        'toplam': ('toplam_tutar', 'miktar', 'birim_fiyat'),
+        'tipler': ['Gelir', 'Gider'],
+        'istege_bagli': ['birim'],
+    },
+}
+
+# Reçeteler üretimlerden önce yüklenir; stok tüketimi güncel reçetelerle hesaplanır
+YUKLEME_SIRASI = ['Urun_Receteleri', 'Alislar', 'Uretimler', 'Satislar',
+                  'Iadeler_Hurda', 'Tas_Gelir_Gider', 'Beton_Gelir_Gider']
+
+DESTEKLENEN_UZANTILAR = ('.csv', '.xlsx', '.jsonl')
+GOSTERILECEK_HATA_SAYISI = 10
+
+# Asıl tabloya ekleme ve eklenen satırların stok_hareketleri defterine yazılması tek ifadede;
+# deftere yazılan (yuvarlanmış) miktarlar stok güncellemesi için ice_stok_etkisi'ne de eklenir
+HAREKETLI_EKLEME_SORGUSU = """
+    WITH eklenen AS (
+        INSERT INTO {tablo} ({sutunlar}) SELECT {sutunlar} FROM {gecici}
+        RETURNING *
+    ),
+    hareket AS (
+        INSERT INTO stok_hareketleri (malzeme, miktar_kg, kaynak_id, zaman, kaynak)
+        SELECT h.*, {kaynak} FROM ({hareket}) h
+        RETURNING malzeme, miktar_kg
+    ),
+    etki AS (
+        INSERT INTO ice_stok_etkisi (malzeme, miktar_kg)
+        SELECT malzeme, miktar_kg FROM hareket
+    )
+    SELECT COUNT(*) FROM eklenen
+"""
+
+# İçe aktarılan satırların stoğa etkisi: alış ve iade ekler, üretim reçete oranında düşer
+STOK_GUNCELLE_SORGUSU = """
+    INSERT INTO stok (malzeme, miktar_kg)
+    SELECT malzeme, SUM(miktar_kg)
+    FROM ice_stok_etkisi
+    GROUP BY malzeme
+    ON CONFLICT (malzeme) DO UPDATE
+    SET miktar_kg = stok.miktar_kg + EXCLUDED.miktar_kg,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+RECETESIZ_URUN_SORGUSU = """
+    SELECT DISTINCT u.urun FROM ice_uretimler u
+    WHERE NOT EXISTS (SELECT 1 FROM urunler r WHERE r.urun = u.urun)
+    ORDER BY u.urun
+"""
+
+# İçe aktarılan üretimlerin malzeme başına toplam tüketimi (deftere yazılacak yuvarlanmış
+# miktarlar) ile kilitli stok + bu aktarımda eklenen alışların karşılaştırması; yetersizler döner
+URETIM_STOK_KONTROL_SORGUSU = """
+    WITH gereken AS (
+        SELECT r.malzeme, SUM(ROUND(u.gramaj_kg * r.yuzde / 100, 2)) AS gereken
+        FROM ice_uretimler u
+        JOIN urunler r ON r.urun = u.urun
+        GROUP BY r.malzeme
+    ),
+    kilit AS MATERIALIZED (
+        SELECT s.malzeme, s.miktar_kg
+        FROM stok s
+        JOIN gereken g ON g.malzeme = s.malzeme
+        ORDER BY s.malzeme
+        FOR UPDATE OF s
+    ),
+    eklenen AS (
+        SELECT malzeme, SUM(miktar_kg) AS miktar_kg
+        FROM ice_stok_etkisi
+        GROUP BY malzeme
+    )
+    SELECT g.malzeme, g.gereken,
+           CASE WHEN k.malzeme IS NOT NULL OR e.malzeme IS NOT NULL
+                THEN COALESCE(k.miktar_kg, 0) + COALESCE(e.miktar_kg, 0) END AS mevcut
+    FROM gereken g
+    LEFT JOIN kilit k ON k.malzeme = g.malzeme
+    LEFT JOIN eklenen e ON e.malzeme = g.malzeme
+    WHERE COALESCE(k.miktar_kg, 0) + COALESCE(e.miktar_kg, 0) < g.gereken
+    ORDER BY g.malzeme
+"""
+
+# Net kârı boş satışlar: KDV hariç tutardan reçetenin seçili yöntemdeki güncel birim
+# maliyetleri düşülür (maliyeti olmayan malzemeler sayılmaz). FIFO'da, geçmiş kârların
+# yeniden hesabında olduğu gibi sıradaki lotun birim fiyatı tüm miktara uygulanır
+SATIS_NET_KAR_SORGUSU = """
+    UPDATE ice_satislar s
+    SET net_kar = s.miktar_kg * s.satis_fiyat / (1 + %(kdv)s)
+                  - s.miktar_kg * COALESCE((
+                        SELECT SUM(r.yuzde / 100 * CASE WHEN %(yontem)s = 'fifo'
+                                                        THEN m.fifo_maliyet ELSE m.ortalama_maliyet END)
+                        FROM urunler r
+                        JOIN malzeme_maliyetleri m ON m.malzeme = r.malzeme
+                        WHERE r.urun = s.urun
+                    ), 0)
+    WHERE s.net_kar IS NULL
+"""
+
+
+class IceAktarimHatasi(ValueError):
+    """Doğrulanamayan satırlar; hatalar DataFrame'i (dosya, satır, hata) taşır"""
+
+    def __init__(self, hatalar):
+        self.hatalar = hatalar
+        satirlar = [f"{h.dosya} satır {h.satir}: {h.hata}"
+                    for h in hatalar.head(GOSTERILECEK_HATA_SAYISI).itertuples()]
+        if len(hatalar) > GOSTERILECEK_HATA_SAYISI:
+            satirlar.append(f"... ve {len(hatalar) - GOSTERILECEK_HATA_SAYISI} hata daha")
+        satir_sayisi = len(hatalar[['dosya', 'satir']].drop_duplicates())
+        super().__init__(f"{satir_sayisi} satırda {len(hatalar)} hata bulundu, hiçbir kayıt yüklenmedi:\n"
+                         + "\n".join(satirlar))
+
+
+# === DOSYA OKUMA ===
+def dosya_turu(yol):
+    """Dosya adından işlem tipini bul (ör. Alislar_2019.xlsx -> Alislar)"""
+    ad = os.path.splitext(os.path.basename(yol))[0].lower()
+    for islem_tipi in sorted(ICE_AKTARIM_TURLERI, key=len, reverse=True):
+        if ad.startswith(islem_tipi.lower()):
+            return islem_tipi
+    raise ValueError(f"{os.path.basename(yol)}: dosya adından işlem tipi anlaşılamadı "
+                     f"({', '.join(ICE_AKTARIM_TURLERI)} ile başlamalı).")
+
+
+def dosya_oku(yol):
+    """CSV, XLSX ya da JSONL dosyasını DataFrame olarak oku"""
+    import pandas as pd
+
+    uzanti = os.path.splitext(yol)[1].lower()
+    if uzanti == '.csv':
+        return pd.read_csv(yol, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    if uzanti == '.xlsx':
+        return pd.read_excel(yol, dtype=object, engine='openpyxl')
+    if uzanti == '.jsonl':
+        return pd.read_json(yol, lines=True, dtype=False)
+    raise ValueError(f"{os.path.basename(yol)}: desteklenmeyen dosya türü ({', '.join(DESTEKLENEN_UZANTILAR)}).")
+
+
+# === DOĞRULAMA ===
+def dogrula(islem_tipi, df, dosya_adi=""):
+    """Günlük biçimindeki DataFrame'i tablo sütunlarına çevirip doğrula.
+
+    Tüm kontroller sütun bazındadır; hatalı satırlar IceAktarimHatasi ile bildirilir.
+    """
+    import pandas as pd
+
+    tur = ICE_AKTARIM_TURLERI[islem_tipi]
+    istege_bagli = tur.get('istege_bagli', [])
+    toplam = tur.get('toplam')
+
+    eksik = [baslik for baslik, sutun in tur['sutunlar'].items()
+             if baslik not in df.columns and sutun not in istege_bagli
+             and not (toplam and sutun == toplam[0])]
+    if eksik:
+        raise ValueError(f"{dosya_adi}: eksik sütunlar: {', '.join(eksik)}")
+
+    veri = pd.DataFrame(index=df.index)
+    for baslik, sutun in tur['sutunlar'].items():
+        veri[sutun] = df[baslik] if baslik in df.columns else None
+
+    hatalar = []
+
+    def hata_ekle(maske, mesaj):
+        if maske.any():
+            hatalar.append(pd.DataFrame({'satir': maske[maske].index, 'hata': mesaj}))
+
+    # Boş değerler: NaN ve boş/boşluk metinler
+    bos = veri.isna() | veri.astype(str).apply(lambda s: s.str.strip() == '')
+
+    for sutun in tur['sayisal']:
+        sayi = pd.to_numeric(veri[sutun], errors='coerce')
+        hata_ekle(sayi.isna() & ~bos[sutun], f"{sutun} sayı olmalı")
+        if sutun not in istege_bagli and not (toplam and sutun == toplam[0]):
+            hata_ekle(bos[sutun], f"{sutun} boş olamaz")
+        veri[sutun] = sayi.round(2)
+
+    for sutun in tur['pozitif']:
+        hata_ekle(veri[sutun] <= 0, f"{sutun} sıfırdan büyük olmalı")
+    if 'yuzde' in veri:
+        hata_ekle(veri['yuzde'] > 100, "yuzde 100'den büyük olamaz")
+    if toplam:
+        # Toplam sütunu yoksa ya da boşsa miktar x fiyat
+        hedef, miktar, fiyat = toplam
+        veri[hedef] = veri[hedef].fillna((veri[miktar] * veri[fiyat]).round(2))
+
+    if 'tarih' in veri:
+        tarih = pd.to_datetime(veri['tarih'], errors='coerce')
+        hata_ekle(tarih.isna(), "tarih geçersiz")
+        veri['tarih'] = tarih.dt.date
+
+    metinler = [s for s in veri.columns if s not in tur['sayisal'] and s != 'tarih']
+    for sutun in metinler:
+        if sutun not in istege_bagli:
+            hata_ekle(bos[sutun], f"{sutun} boş olamaz")
+        veri[sutun] = veri[sutun].where(~bos[sutun], None)
+        veri.loc[~bos[sutun], sutun] = veri.loc[~bos[sutun], sutun].astype(str).str.strip()
+
+    if 'tipler' in tur:
+        hata_ekle(~bos['tip'] & ~veri['tip'].isin(tur['tipler']),
+                  f"tip {' / '.join(tur['tipler'])} olmalı")
+
+    if hatalar:
+        hata_tablosu = pd.concat(hatalar).sort_values('satir', kind='stable')
+        # Başlık satırı 1. satırdır; veri satırları 2'den başlar
+        hata_tablosu['satir'] = hata_tablosu['satir'] + 2
+        hata_tablosu.insert(0, 'dosya', dosya_adi)
+        raise IceAktarimHatasi(hata_tablosu.reset_index(drop=True))
+
+    return veri
+
+
+# === YÜKLEME ===
+def _gecici_tablolar(cursor):
+    """Her hedef tablo için ice_<tablo> adında boş, indekssiz geçici tablo oluştur"""
+    for tur in ICE_AKTARIM_TURLERI.values():
+        sutunlar = sql.SQL(', ').join(map(sql.Identifier, tur['sutunlar'].values()))
+        cursor.execute(sql.SQL("CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA").format(
+            sql.Identifier(f"ice_{tur['tablo']}"), sutunlar, sql.Identifier(tur['tablo'])))
+    cursor.execute("""CREATE TEMP TABLE ice_stok_etkisi (
+                          malzeme VARCHAR(255) NOT NULL,
+                          miktar_kg DECIMAL(12,2) NOT NULL
+                      ) ON COMMIT DROP""")
+
+
+def _copy_ile_yukle(cursor, tablo, veri):
+    """DataFrame'i bellekteki CSV üzerinden COPY ile tabloya yükle"""
+    tampon = io.StringIO()
+    veri.to_csv(tampon, index=False, header=False, na_rep='\\N')
+    tampon.seek(0)
+    komut = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '\\N')").format(
+        sql.Identifier(tablo), sql.SQL(', ').join(map(sql.Identifier, veri.columns)))
+    cursor.copy_expert(komut.as_string(cursor), tampon)
+
+
+def ice_aktar(db, dosyalar, ilerleme=None):
+    """Dosyaları doğrulayıp tek işlemde içe aktar, stok bakiyelerini güncelle.
+
+    Önce tüm dosyalar okunup doğrulanır; herhangi birinde hata varsa hiçbir şey yüklenmez.
+    ilerleme(tamamlanan, toplam, mesaj) çağrılır. {islem_tipi: satır sayısı} döner.
+    """
+    import pandas as pd
+
+    toplam_adim = len(dosyalar) + len(YUKLEME_SIRASI) + 1
+    tamamlanan = 0
+
+    def ilerle(mesaj):
+        nonlocal tamamlanan
+        tamamlanan += 1
+        if ilerleme:
+            ilerleme(tamamlanan, toplam_adim, mesaj)
+
+    # Okuma ve doğrulama: aynı tipteki dosyalar birleştirilir
+    parcalar = {}
+    hatalar = []
+    for yol in dosyalar:
+        dosya_adi = os.path.basename(yol)
+        islem_tipi = dosya_turu(yol)
+        try:
+            with db.olcum.bilesen("excel"):
+                df = dosya_oku(yol)
+            parcalar.setdefault(islem_tipi, []).append(dogrula(islem_tipi, df, dosya_adi))
+        except IceAktarimHatasi as e:
+            hatalar.append(e.hatalar)
+        ilerle(f"{dosya_adi} doğrulandı")
+    if hatalar:
+        raise IceAktarimHatasi(pd.concat(hatalar, ignore_index=True))
+
+    satir_sayilari = {}
+    with db.islem() as conn:
+        with conn.cursor() as cursor:
+            _gecici_tablolar(cursor)
+
+            for islem_tipi in YUKLEME_SIRASI:
+                if islem_tipi in parcalar:
+                    tur = ICE_AKTARIM_TURLERI[islem_tipi]
+                    veri = pd.concat(parcalar[islem_tipi], ignore_index=True)
+                    gecici = f"ice_{tur['tablo']}"
+                    _copy_ile_yukle(cursor, gecici, veri)
+
+                    if islem_tipi == 'Uretimler':
+                        cursor.execute(RECETESIZ_URUN_SORGUSU)
+                        recetesiz = [row[0] for row in cursor.fetchall()]
+                        if recetesiz:
+                            raise ValueError(f"Reçetesi olmayan ürünler için üretim var: {', '.join(recetesiz)}")
+                        cursor.execute(URETIM_STOK_KONTROL_SORGUSU)
+                        yetersiz = [f"{malzeme} stokta yok." if mevcut is None else
+                                    f"{malzeme} için yeterli stok yok. Mevcut: {mevcut}, Gereken: {gereken}"
+                                    for malzeme, gereken, mevcut in cursor.fetchall()]
+                        if yetersiz:
+                            raise ValueError("İçe aktarılan üretimler için stok yetersiz:\n" + "\n".join(yetersiz))
+                    elif islem_tipi == 'Satislar':
+                        cursor.execute(SATIS_NET_KAR_SORGUSU,
+                                       {'kdv': KDV_ORANI, 'yontem': db.config.maliyet_yontemi})
+
+                    sutunlar = sql.SQL(', ').join(map(sql.Identifier, veri.columns))
+                    if 'hareket' in tur:
+                        cursor.execute(sql.SQL(HAREKETLI_EKLEME_SORGUSU).format(
+                            tablo=sql.Identifier(tur['tablo']), sutunlar=sutunlar,
+                            gecici=sql.Identifier(gecici), kaynak=sql.Literal(tur['tablo']),
+                            hareket=sql.SQL(tur['hareket'])))
+                        satir_sayilari[islem_tipi] = cursor.fetchone()[0]
+                    else:
+                        cursor.execute(sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}").format(
+                            sql.Identifier(tur['tablo']), sutunlar, sutunlar, sql.Identifier(gecici)))
+                        satir_sayilari[islem_tipi] = cursor.rowcount
+                ilerle(f"{islem_tipi} yüklendi")
+
+            cursor.execute(STOK_GUNCELLE_SORGUSU)
+            ilerle("Stok bakiyeleri güncellendi")
+
+    db.onbellekleri_temizle()
+    return satir_sayilari
@@ -0,0 +1,597 @@
+# islemler.py
+# Arayüzden bağımsız iş işlemleri: stok girişi, reçete, üretim, satış, iade/hurda, giderler
+# ve raporlar. Tkinter kullanmaz ve içe aktarılırken veritabanına bağlanmaz; her işlem
+# kullanacağı DatabaseManager'ı (db) ilk argüman olarak alır. Böylece arayüz, toplu işler,
+# zamanlanmış görevler ve benchmark'lar aynı kodu çağırır.
+#
+# Kayıt işlemleri isteğe bağlı kayit(islem_tipi, veri) geri çağrısı alır; arayüz bunu Excel
+# günlüğüne bağlar (excel_gunluk.ExcelYazici.ekle), toplu işler None geçerek atlayabilir.
+# Yedekleme ve içe aktarım aynı düzenle yedekleme.py ve ice_aktarim.py modüllerindedir.
+import pickle
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from veritabani import KDV_ORANI
+
+# Gider türü -> (tablo, Excel günlüğü işlem tipi)
+GIDER_TABLOLARI = {
+    'tas': ('tas_gelir_gider', "Tas_Gelir_Gider"),
+    'beton': ('beton_gelir_gider', "Beton_Gelir_Gider"),
+}
+
+IADE_TIPLERI = ("İade", "Hurda")
+
+
+def _kaydet(kayit, islem_tipi, veri):
+    """Kayıt geri çağrısı verilmişse işlemin Excel satırını ilet"""
+    if kayit:
+        veri['Kayit Zamani'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        kayit(islem_tipi, veri)
+
+
+# === LİSTELER ===
+# Listeler db.katalog önbelleğinden gelir; aşağıdaki kayıt işlemleri yeni adları
+# önbelleğe kendileri ekler, böylece kayıttan sonra liste sorgusu gerekmez.
+def malzemeler(db):
+    """Stokta bulunan malzemeler"""
+    return db.katalog.malzemeler()
+
+
+def urunler(db):
+    """Tanımlı ürünler"""
+    return db.katalog.urunler()
+
+
+def malzeme_ve_urunler(db):
+    """Malzeme ve ürünlerin birleşik listesi"""
+    return db.katalog.malzeme_ve_urunler()
+
+
+# === KAYIT İŞLEMLERİ ===
+def alis_kaydet(db, malzeme, miktar, birim_fiyat, tarih=None, kayit=None):
+    """Malzeme alışını kaydet ve stoğa ekle; yeni stok miktarını döndür"""
+    if not malzeme:
+        raise ValueError("Malzeme adı girilmelidir.")
+    miktar = Decimal(str(miktar))
+    birim_fiyat = Decimal(str(birim_fiyat))
+    tarih = tarih or datetime.now().date()
+    toplam_tutar = miktar * birim_fiyat
+
+    # Alış kaydı ve stok artışı tek ifadede
+    alis_data = {
+        'malzeme': malzeme,
+        'miktar_kg': miktar,
+        'birim_fiyat': birim_fiyat,
+        'toplam_tutar': toplam_tutar,
+        'tarih': tarih
+    }
+    yeni_stok = db.stoklu_kaydet('alislar', alis_data, malzeme, miktar)
+    db.katalog.ekle(malzeme=malzeme)
+
+    _kaydet(kayit, "Alislar", {
+        'Tarih': tarih.strftime("%Y-%m-%d"),
+        'Malzeme': malzeme,
+        'Miktar (kg)': float(miktar),
+        'Birim Fiyat': float(birim_fiyat),
+        'Toplam Tutar': float(toplam_tutar),
+    })
+    return yeni_stok
+
+
+def recete_kaydet(db, satirlar, kayit=None):
+    """[(urun, malzeme, yuzde)] reçete satırlarını tek işlemde kaydet"""
+    if not satirlar:
+        raise ValueError("Hiç malzeme eklenmedi.")
+    satirlar = [(urun, malzeme, Decimal(str(yuzde))) for urun, malzeme, yuzde in satirlar]
+
+    # Tüm malzemeler tek işlem ve tek sorguyla
+    db.insert_many('urunler', [
+        {'urun': urun, 'malzeme': malzeme, 'yuzde': yuzde}
+        for urun, malzeme, yuzde in satirlar
+    ])
+
+    for urun, malzeme, yuzde in satirlar:
+        _kaydet(kayit, "Urun_Receteleri", {
+            'Tarih': datetime.now().strftime("%Y-%m-%d"),
+            'Urun': urun,
+            'Malzeme': malzeme,
+            'Yuzde': float(yuzde),
+        })
+
+    # Reçete önbelleğini güncelle (diğer istasyonlara NOTIFY ile bildirilir)
+    for urun in {urun for urun, _, _ in satirlar}:
+        db.receteler.gecersiz_kil(urun)
+        db.katalog.ekle(urun=urun)
+
+
+def uretim_kaydet(db, urun, gramaj, tarih=None, kayit=None):
+    """Üretimi kaydet ve reçete malzemelerini stoktan düş; [{'malzeme', 'gereken'}] döndür"""
+    gramaj = Decimal(str(gramaj))
+    tarih = tarih or datetime.now().date()
+
+    # Stoktan düşme ve üretim kaydı tek sorguda, hep birlikte ya da hiç
+    dusulenler = db.uretim_kaydet(urun, gramaj, tarih)
+
+    _kaydet(kayit, "Uretimler", {
+        'Tarih': tarih.strftime("%Y-%m-%d"),
+        'Urun': urun,
+        'Gramaj (kg)': float(gramaj),
+        'Kullanilan Malzemeler': " | ".join(
+            f"{row['malzeme']}: {float(row['gereken']):.2f} kg" for row in dusulenler),
+    })
+    return dusulenler
+
+
+def satis_kaydet(db, urun, musteri, miktar, fiyat, tarih=None, kayit=None):
+    """Satışı reçete maliyetiyle kaydet.
+
+    {'toplam_satis', 'toplam_maliyet', 'net_kar', 'maliyet_detay'} döndürür; net kâr KDV
+    hariç satış tutarından seçili maliyet yöntemine göre reçete maliyeti düşülerek bulunur.
+    """
+    miktar = Decimal(str(miktar))
+    fiyat = Decimal(str(fiyat))
+    tarih = tarih or datetime.now().date()
+    toplam_satis = miktar * fiyat
+
+    # Maliyet hesapla (tüm reçete tek sorguda, seçili yöntemin güncel birim maliyetleriyle)
+    toplam_maliyet = Decimal('0')
+    maliyet_detay = []
+
+    for row in db.recete_maliyeti(urun, miktar):
+        if row['maliyet'] is not None:
+            malzeme_maliyet = Decimal(str(row['maliyet']))
+            toplam_maliyet += malzeme_maliyet
+            maliyet_detay.append(f"{row['malzeme']}: {float(malzeme_maliyet):.2f} TL")
+
+    net_kar = (fiyat * miktar / (Decimal('1') + KDV_ORANI)) - toplam_maliyet
+
+    db.insert('satislar', {
+        'urun': urun,
+        'musteri': musteri,
+        'miktar_kg': miktar,
+        'satis_fiyat': fiyat,
+        'toplam_satis': toplam_satis,
+        'net_kar': net_kar,
+        'tarih': tarih
+    })
+
+    _kaydet(kayit, "Satislar", {
+        'Tarih': tarih.strftime("%Y-%m-%d"),
+        'Urun': urun,
+        'Musteri': musteri,
+        'Miktar (kg)': float(miktar),
+        'Birim Fiyat': float(fiyat),
+        'Toplam Satis': float(toplam_satis),
+        'Toplam Maliyet': float(toplam_maliyet),
+        'Net Kar': float(net_kar),
+        'Maliyet Detay': " | ".join(maliyet_detay),
+    })
+    return {
+        'toplam_satis': toplam_satis,
+        'toplam_maliyet': toplam_maliyet,
+        'net_kar': net_kar,
+        'maliyet_detay': maliyet_detay,
+    }
+
+
+def iade_kaydet(db, urun, miktar, tip, sebep="", tarih=None, kayit=None):
+    """İade ya da hurda kaydı ekle; iade edilen miktar stoğa geri eklenir"""
+    if tip not in IADE_TIPLERI:
+        raise ValueError("Tür 'İade' ya da 'Hurda' olmalıdır.")
+    miktar = Decimal(str(miktar))
+    tarih = tarih or datetime.now().date()
+
+    iade_data = {
+        'tarih': tarih,
+        'tip': tip,
+        'urun': urun,
+        'miktar': miktar,
+        'sebep': sebep
+    }
+
+    # İade ise kayıt ve stoğa geri ekleme tek ifadede; hurda stoğu değiştirmez
+    if tip == "İade":
+        db.stoklu_kaydet('iadeler', iade_data, urun, miktar)
+        db.katalog.ekle(malzeme=urun)
+    else:
+        db.insert('iadeler', iade_data)
+
+    _kaydet(kayit, "Iadeler_Hurda", {
+        'Tarih': tarih.strftime("%Y-%m-%d"),
+        'Tip': tip,
+        'Urun/Malzeme': urun,
+        'Miktar': float(miktar),
+        'Sebep': sebep,
+    })
+
+
+def gider_kaydet(db, tur, tarih, aciklama, birim, birim_fiyat, miktar, kayit=None):
+    """Taş ('tas') ya da beton ('beton') işleri gider kaydı ekle (tarih: date); toplam tutarı döndür"""
+    tablo, islem_tipi = GIDER_TABLOLARI[tur]
+    birim_fiyat = Decimal(str(birim_fiyat))
+    miktar = Decimal(str(miktar))
+    tip = "Gider"
+    toplam = birim_fiyat * miktar
+
+    db.insert(tablo, {
+        'tarih': tarih,
+        'tip': tip,
+        'aciklama': aciklama,
+        'birim': birim,
+        'birim_fiyat': birim_fiyat,
+        'miktar': miktar,
+        'toplam_tutar': toplam
+    })
+
+    _kaydet(kayit, islem_tipi, {
+        'Tarih': tarih.strftime("%Y-%m-%d"),
+        'Tip': tip,
+        'Aciklama': aciklama,
+        'Birim': birim,
+        'Birim Fiyat': float(birim_fiyat),
+        'Miktar': float(miktar),
+        'Toplam Tutar': float(toplam),
+    })
+    return toplam
+
+
+# === RAPORLAR ===
+# Rapor tipi -> (DATE_TRUNC birimi, dönem adımı, dönem gösterim biçimi)
+RAPOR_BIRIMLERI = {
+    "Günlük": ("day", "1 day", "%Y-%m-%d"),
+    "Haftalık": ("week", "1 week", "%Y-%m-%d"),
+    "Aylık": ("month", "1 month", "%Y-%m"),
+    "Çeyreklik": ("quarter", "3 months", "%Y-Ç{ceyrek}"),
+    "Yıllık": ("year", "1 year", "%Y"),
+}
+
+# Dönem ekseni generate_series ile üretilir, gunluk_ozet toplamları üzerine hizalanır;
+# böylece Satış/Taş/Beton sütunları aynı dönemleri paylaşır ve boş dönemler de görünür
+DONEM_RAPORU_SORGUSU = """
+    WITH eksen AS (
+        SELECT generate_series(
+                   DATE_TRUNC(%(birim)s, %(baslangic)s::date),
+                   DATE_TRUNC(%(birim)s, %(bitis)s::date),
+                   %(adim)s::interval
+               )::date AS donem
+    ),
+    toplamlar AS (
+        SELECT DATE_TRUNC(%(birim)s, tarih)::date AS donem,
+               SUM(satis_kar) AS satis_kar,
+               SUM(tas_net) AS tas_net,
+               SUM(beton_net) AS beton_net
+        FROM gunluk_ozet
+        WHERE tarih BETWEEN %(baslangic)s AND %(bitis)s
+        GROUP BY 1
+    )
+    SELECT e.donem,
+           COALESCE(t.satis_kar, 0) AS satis_kar,
+           COALESCE(t.tas_net, 0) AS tas_net,
+           COALESCE(t.beton_net, 0) AS beton_net,
+           COALESCE(t.satis_kar, 0) + COALESCE(t.tas_net, 0) + COALESCE(t.beton_net, 0) AS net
+    FROM eksen e
+    LEFT JOIN toplamlar t ON t.donem = e.donem
+    ORDER BY e.donem DESC
+"""
+
+STOK_RAPORU_SORGUSU = "SELECT malzeme, miktar_kg FROM stok WHERE miktar_kg > 0 ORDER BY malzeme"
+
+
+def varsayilan_baslangic(secim, bitis):
+    """Başlangıç tarihi girilmemişse rapor tipine göre varsayılan aralığın başı (dönem başına hizalı)"""
+    if secim == "Günlük":
+        return bitis - timedelta(days=29)
+    if secim == "Haftalık":
+        return bitis - timedelta(days=bitis.weekday(), weeks=11)
+    if secim == "Yıllık":
+        return bitis.replace(year=bitis.year - 4, month=1, day=1)
+
+    # Aylık: son 12 ay, Çeyreklik: son 8 çeyrek
+    ay_sirasi = bitis.year * 12 + bitis.month - 1
+    if secim == "Aylık":
+        ay_sirasi -= 11
+    else:
+        ay_sirasi = ay_sirasi - ay_sirasi % 3 - 21
+    return bitis.replace(year=ay_sirasi // 12, month=ay_sirasi % 12 + 1, day=1)
+
+
+def donem_raporu_parametreleri(secim, baslangic=None, bitis=None):
+    """DONEM_RAPORU_SORGUSU için parametreler"""
+    birim, adim, _ = RAPOR_BIRIMLERI[secim]
+    bitis = bitis or datetime.now().date()
+    baslangic = baslangic or varsayilan_baslangic(secim, bitis)
+    if baslangic > bitis:
+        raise ValueError("Başlangıç tarihi bitiş tarihinden sonra olamaz.")
+    return {'birim': birim, 'adim': adim, 'baslangic': baslangic, 'bitis': bitis}
+
+
+def donem_metni(secim, donem):
+    """Dönemi rapor tipine uygun biçimde yaz"""
+    bicim = RAPOR_BIRIMLERI[secim][2]
+    return donem.strftime(bicim.replace("{ceyrek}", str((donem.month - 1) // 3 + 1)))
+
+
+def donem_raporu(db, secim, baslangic=None, bitis=None):
+    """Dönem başına satış kârı, taş ve beton net toplamları (en yeni dönem önce).
+
+    Satırlar sunucu taraflı imleçle parça parça okunur; üreteç döner.
+    """
+    return db.fetch_iter(DONEM_RAPORU_SORGUSU, donem_raporu_parametreleri(secim, baslangic, bitis))
+
+
+def stok_raporu(db, gun=None):
+    """Pozitif stoklar; gun verilirse o günün sonundaki stok defterden hesaplanır"""
+    if gun is None:
+        return db.fetch_all(STOK_RAPORU_SORGUSU)
+    gun_sonu = datetime.combine(gun, datetime.max.time())
+    return [row for row in db.stok_durumu(gun_sonu) if row['miktar_kg'] > 0]
+
+
+def urun_receteleri(db):
+    """Tanımlı ürünlerin reçete satırları"""
+    return db.fetch_all("""
+        SELECT urun, malzeme, yuzde
+        FROM urunler
+        ORDER BY urun, malzeme
+    """)
+
+
+# === GENEL EXCEL RAPORU ===
+# Tablolar sunucu taraflı imleçle bu kadar satırlık parçalar halinde okunur
+RAPOR_PARCA_BOYUTU = 2000
+
+# Özet göstergelerinin sayfası; tablolarla aynı anlık görüntüden okunur
+OZET_SAYFASI = "Özet Rapor"
+
+# (sayfa adı, sorgu, toplam satırı) — toplam satırı: (etiket sütunu, etiket, toplanan sütunlar)
+RAPOR_TABLOLARI = [
+    ("Stok Durumu",
+     "SELECT malzeme, miktar_kg, created_at, updated_at FROM stok ORDER BY malzeme",
+     None),
+    ("Alışlar",
+     """
+        SELECT malzeme, miktar_kg, birim_fiyat, toplam_tutar, tarih, created_at
+        FROM alislar
+        ORDER BY tarih DESC, created_at DESC
+     """,
+     ("C", "TOPLAM:", ["D"])),
+    ("Ürün Reçeteleri",
+     "SELECT urun, malzeme, yuzde, created_at FROM urunler ORDER BY urun, malzeme",
+     None),
+    ("Üretimler",
+     "SELECT urun, gramaj_kg, tarih, created_at FROM uretimler ORDER BY tarih DESC",
+     ("A", "TOPLAM ÜRETİM:", ["B"])),
+    ("Satışlar",
+     """
+        SELECT urun, musteri, miktar_kg, satis_fiyat, toplam_satis, net_kar, tarih, created_at
+        FROM satislar
+        ORDER BY tarih DESC, created_at DESC
+     """,
+     ("D", "TOPLAM:", ["E", "F"])),
+    ("İadeler-Hurda",
+     "SELECT tarih, tip, urun, miktar, sebep, created_at FROM iadeler ORDER BY tarih DESC",
+     None),
+    ("Taş Gelir-Gider",
+     """
+        SELECT tarih, tip, aciklama, birim, birim_fiyat, miktar, toplam_tutar, created_at
+        FROM tas_gelir_gider
+        ORDER BY tarih DESC, created_at DESC
+     """,
+     None),
+    ("Beton Gelir-Gider",
+     """
+        SELECT tarih, tip, aciklama, birim, birim_fiyat, miktar, toplam_tutar, created_at
+        FROM beton_gelir_gider
+        ORDER BY tarih DESC, created_at DESC
+     """,
+     None),
+]
+
+
+def tablo_biriktirici(db, query):
+    """Sorgu sonucunu parçalar halinde geçici dosyaya yazan paralel dışa aktarım işi.
+
+    (başlıklar, satır sayısı, dosya, sütun genişlikleri) döner; genişlikler tüm satırlardan hesaplanır.
+    """
+    import excel_gunluk
+
+    def biriktir(conn):
+        dosya = tempfile.TemporaryFile()
+        headers = None
+        genislik = None
+        satir_sayisi = 0
+        for parca in db.imlec_parcalari(conn, query, parca_boyutu=RAPOR_PARCA_BOYUTU):
+            if headers is None:
+                headers = list(parca[0].keys())
+                genislik = excel_gunluk.SutunGenislikleri(headers)
+            satirlar = [tuple(row.values()) for row in parca]
+            for row in satirlar:
+                genislik.satir_ekle(row)
+            pickle.dump(satirlar, dosya)
+            satir_sayisi += len(parca)
+        dosya.seek(0)
+        return headers, satir_sayisi, dosya, genislik
+    return biriktir
+
+
+def biriktirilen_parcalar(dosya):
+    """tablo_biriktirici'nin yazdığı parçaları sırayla oku"""
+    while True:
+        try:
+            yield pickle.load(dosya)
+        except EOFError:
+            return
+
+
+def genel_excel_raporu(db, dosya_adi=None, ilerleme=None):
+    """Tüm tabloları ve özet göstergeleri tek bir Excel dosyasına yaz; dosya adını döndür.
+
+    Her tablo kendi havuz bağlantısında, ortak anlık görüntüden paralel okunur ve
+    sadece-yazma modundaki çalışma kitabına akış halinde yazılır.
+    ilerleme(tamamlanan, toplam, mesaj) verilirse her adımda çağrılır.
+    """
+    # openpyxl yalnızca rapor yazılırken gerekir; modülün içe aktarımını hafif tutar
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+    from openpyxl.utils import column_index_from_string
+
+    if dosya_adi is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        dosya_adi = f"beton_takip_genel_raporu_{timestamp}.xlsx"
+
+    # Her tablo için bir okuma ve bir yazma adımı, özet göstergelerinin okunması ve dosyanın kaydı
+    adim_sayisi = 2 * len(RAPOR_TABLOLARI) + 2
+    isler = [(sayfa_adi, tablo_biriktirici(db, query)) for sayfa_adi, query, _ in RAPOR_TABLOLARI]
+    # Özet de aynı anlık görüntüden okunur ki ayrıntı sayfalarıyla tutarlı olsun
+    isler.append((OZET_SAYFASI, db.ozet_gostergeleri))
+    if ilerleme:
+        def okuma_ilerlemesi(tamamlanan, toplam, ad):
+            ilerleme(tamamlanan, adim_sayisi, f"{ad} okundu")
+    else:
+        okuma_ilerlemesi = None
+    biriktirilenler = db.paralel_calistir(isler, okuma_ilerlemesi)
+    ozet = biriktirilenler.pop(OZET_SAYFASI)
+
+    def excel_dosyasi_yaz(wb):
+        # Stil tanımlamaları
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        border = Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        )
+
+        def hucre(ws, value, font=None):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.border = border
+            if font:
+                cell.font = font
+            return cell
+
+        def header_satiri(ws, headers):
+            cells = []
+            for h in headers:
+                cell = WriteOnlyCell(ws, value=h)
+                cell.font = header_font
+                cell.fill = header_fill
+                cell.alignment = Alignment(horizontal='center', vertical='center')
+                cell.border = border
+                cells.append(cell)
+            return cells
+
+        def tablo_sayfasi_yaz(sayfa_adi, headers, satir_sayisi, dosya, genislik, toplam):
+            """Biriktirilen parçaları yeni bir sheet'e yaz; veri yoksa sheet açılmaz"""
+            if not satir_sayisi:
+                return
+
+            # write_only modunda sütun genişlikleri ilk satırdan önce verilmeli;
+            # genişlikler biriktirme sırasında tüm satırlardan hesaplandı
+            ws = wb.create_sheet(sayfa_adi)
+            genislik.uygula(ws)
+            ws.append(header_satiri(ws, headers))
+
+            for parca in biriktirilen_parcalar(dosya):
+                for row in parca:
+                    ws.append([hucre(ws, value) for value in row])
+
+            # Toplam satırı (bir boş satır bırakarak)
+            if toplam:
+                etiket_sutunu, etiket, toplam_sutunlari = toplam
+                son_satir = satir_sayisi + 1
+                toplam_satiri = {column_index_from_string(etiket_sutunu): etiket}
+                for sutun in toplam_sutunlari:
+                    toplam_satiri[column_index_from_string(sutun)] = f"=SUM({sutun}2:{sutun}{son_satir})"
+
+                cells = []
+                for i in range(1, max(toplam_satiri) + 1):
+                    if i in toplam_satiri:
+                        cell = WriteOnlyCell(ws, value=toplam_satiri[i])
+                        cell.font = Font(bold=True)
+                        cells.append(cell)
+                    else:
+                        cells.append(None)
+                ws.append([])
+                ws.append(cells)
+
+        # 1-8. TABLO RAPORLARI
+        for i, (sayfa_adi, _, toplam) in enumerate(RAPOR_TABLOLARI, start=1):
+            headers, satir_sayisi, dosya, genislik = biriktirilenler[sayfa_adi]
+            with db.olcum.bilesen("excel"):
+                tablo_sayfasi_yaz(sayfa_adi, headers, satir_sayisi, dosya, genislik, toplam)
+            if ilerleme:
+                ilerleme(len(RAPOR_TABLOLARI) + 1 + i, adim_sayisi, f"{sayfa_adi} yazıldı")
+
+        # 9. ÖZET RAPORU
+        ws_ozet = wb.create_sheet(OZET_SAYFASI)
+        wb.active = len(wb.worksheets) - 1  # Özet raporu aktif sheet yap
+
+        ozet_data = [
+            ["Toplam Stok (kg)", ozet['toplam_stok']],
+            ["Toplam Alış Tutarı (TL)", ozet['toplam_alis']],
+            ["Toplam Üretim (kg)", ozet['toplam_uretim']],
+            ["Toplam Satış Tutarı (TL)", ozet['toplam_satis']],
+            ["Toplam Net Kar (TL)", ozet['toplam_kar']],
+            ["Taş İşleri Net (TL)", ozet['tas_net']],
+            ["Beton İşleri Net (TL)", ozet['beton_net']],
+        ]
+
+        # Sütun genişliklerini ayarla
+        ws_ozet.column_dimensions['A'].width = 25
+        ws_ozet.column_dimensions['B'].width = 20
+
+        # Özet tablosunu oluştur
+        ws_ozet.append(header_satiri(ws_ozet, ["Kategori", "Değer"]))
+
+        for kategori, deger in ozet_data:
+            ws_ozet.append([hucre(ws_ozet, kategori, Font(bold=True)), hucre(ws_ozet, deger)])
+
+        # Rapor oluşturma tarihi ekle
+        tarih_etiketi = WriteOnlyCell(ws_ozet, value="Rapor Tarihi:")
+        tarih_etiketi.font = Font(bold=True)
+        ws_ozet.append([])
+        ws_ozet.append([tarih_etiketi, datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
+
+        # Excel dosyasını kaydet
+        with db.olcum.bilesen("excel"):
+            wb.save(dosya_adi)
+
+    # Sadece-yazma modunda workbook: satırlar bellekte tutulmadan dosyaya akar
+    wb = openpyxl.Workbook(write_only=True)
+    try:
+        excel_dosyasi_yaz(wb)
+    except BaseException:
+        # Yarıda kalan (ör. iptal edilen) sayfaların geçici dosyalarını kapat; rapor kaydedilmez
+        for ws in wb.worksheets:
+            if not ws.closed:
+                ws.close()
+        raise
+    finally:
+        for _, _, dosya, _ in biriktirilenler.values():
+            dosya.close()
+    if ilerleme:
+        ilerleme(adim_sayisi, adim_sayisi, "Excel dosyası yazıldı")
+    return dosya_adi
+
+
+# === VERİ TEMİZLİĞİ ===
+# Kaynak tablolar ve onlardan türetilen özet, defter ve maliyet tabloları (schema_version hariç)
+TEMIZLENEN_TABLOLAR = ['satislar', 'uretimler', 'iadeler', 'tas_gelir_gider',
+                       'beton_gelir_gider', 'urunler', 'alislar', 'stok',
+                       'stok_anlik_bakiyeleri', 'stok_anliklari', 'stok_hareketleri',
+                       'maliyet_gecmisi', 'maliyet_lotlari', 'malzeme_maliyetleri', 'gunluk_ozet']
+
+
+def tum_verileri_sil(db):
+    """Tüm veri tablolarını tek işlemde TRUNCATE ile boşalt; hata olursa hiçbiri boşalmaz.
+
+    TRUNCATE satır tetikleyicilerini çalıştırmaz; türetilmiş tablolar da listede olduğundan
+    özet ve defter tabloları kaynaklarla tutarlı kalır. Önbellekler işlem bittikten sonra temizlenir.
+    """
+    with db.islem() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {', '.join(TEMIZLENEN_TABLOLAR)} RESTART IDENTITY CASCADE")
+    db.onbellekleri_temizle()
@@ -0,0 +1,326 @@
+# olcum.py
+# Sorgu ve işleyici ölçümleri: ifade başına süre ve satır sayısı, eşiği aşan sorgular için
+# parametreleri gizlenmiş yavaş sorgu günlüğü, düğme işleyicileri için bileşen başına
+# (veritabanı / Excel / arayüz) gecikme histogramları. Sonuçlar JSON ya da CSV'ye aktarılır.
+import csv
+import json
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+# Histogram kova üst sınırları (ms); son kova bunların üstünü toplar
+HISTOGRAM_SINIRLARI_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# İşleyici bileşenleri: worker iş parçacığında ölçülenler ve Tk tarafında eklenenler
+BILESENLER = ("veritabani", "excel", "diger", "arayuz", "toplam")
+
+ANAHTAR_AZAMI_UZUNLUK = 2000
+
+_BOSLUK = re.compile(r"\s+")
+_METIN = re.compile(r"'(?:[^']|'')*'")
+_SAYI = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?(?![\w.])")
+# execute_values'un ürettiği (?, ?), (?, ?) ... değer grupları tek gruba indirilir
+_DEGER_GRUPLARI = re.compile(r"(\((?:\?|NULL|%s)(?:, (?:\?|NULL|%s))*\))(?:, \((?:\?|NULL|%s)(?:, (?:\?|NULL|%s))*\))+")
+
+
+@lru_cache(maxsize=1024)
+def _normallestir(metin):
+    metin = _BOSLUK.sub(" ", metin).strip()
+    metin = _METIN.sub("?", metin)
+    metin = _SAYI.sub("?", metin)
+    return _DEGER_GRUPLARI.sub(r"\1, ...", metin)
+
+
+def ifade_anahtari(sorgu):
+    """SQL metnini gruplama anahtarına çevir: boşluklar sadeleşir, sabit değerler ? olur"""
+    if isinstance(sorgu, bytes):
+        sorgu = sorgu[:ANAHTAR_AZAMI_UZUNLUK].decode("utf-8", errors="replace")
+    elif len(sorgu) > ANAHTAR_AZAMI_UZUNLUK:
+        sorgu = sorgu[:ANAHTAR_AZAMI_UZUNLUK]
+    return _normallestir(sorgu)
+
+
+def parametreleri_gizle(params):
+    """Bağlı parametrelerin değerlerini tür adlarıyla değiştir (günlüğe veri sızmasın)"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {anahtar: parametreleri_gizle(deger) for anahtar, deger in params.items()}
+    if isinstance(params, (list, tuple)):
+        if len(params) > 20:
+            return f"<{type(params).__name__}[{len(params)}]>"
+        return [parametreleri_gizle(deger) for deger in params]
+    return f"<{type(params).__name__}>"
+
+
+class Histogram:
+    """Sabit kovalı gecikme histogramı (ms)"""
+
+    def __init__(self):
+        self.kovalar = [0] * (len(HISTOGRAM_SINIRLARI_MS) + 1)
+        self.adet = 0
+        self.toplam_ms = 0.0
+        self.azami_ms = 0.0
+
+    def ekle(self, ms):
+        """Bir ölçümü ilgili kovaya ekle"""
+        i = 0
+        while i < len(HISTOGRAM_SINIRLARI_MS) and ms > HISTOGRAM_SINIRLARI_MS[i]:
+            i += 1
+        self.kovalar[i] += 1
+        self.adet += 1
+        self.toplam_ms += ms
+        if ms > self.azami_ms:
+            self.azami_ms = ms
+
+    def yuzdelik(self, oran):
+        """Ölçümlerin oran kadarının altında kaldığı kova üst sınırı (ms)"""
+        if not self.adet:
+            return 0.0
+        hedef = oran * self.adet
+        birikimli = 0
+        for i, sayi in enumerate(self.kovalar):
+            birikimli += sayi
+            if birikimli >= hedef:
+                if i < len(HISTOGRAM_SINIRLARI_MS):
+                    return round(min(HISTOGRAM_SINIRLARI_MS[i], self.azami_ms), 3)
+                return round(self.azami_ms, 3)
+        return round(self.azami_ms, 3)
+
+    def ozet(self):
+        """Sayılar, ortalama, p50/p95 ve kovalar"""
+        return {
+            'adet': self.adet,
+            'toplam_ms': round(self.toplam_ms, 3),
+            'ort_ms': round(self.toplam_ms / self.adet, 3) if self.adet else 0.0,
+            'p50_ms': self.yuzdelik(0.5),
+            'p95_ms': self.yuzdelik(0.95),
+            'azami_ms': round(self.azami_ms, 3),
+            'kovalar': dict(zip([f"<={s}" for s in HISTOGRAM_SINIRLARI_MS]
+                                + [f">{HISTOGRAM_SINIRLARI_MS[-1]}"], self.kovalar)),
+        }
+
+
+class _IfadeIstatistigi:
+    __slots__ = ("histogram", "satir")
+
+    def __init__(self):
+        self.histogram = Histogram()
+        self.satir = 0
+
+
+class _Birikim:
+    """Bir işleyici çalışırken bileşen sürelerini toplar (birden çok iş parçacığından)"""
+
+    def __init__(self):
+        self.kilit = threading.Lock()
+        self.sureler = {"veritabani": 0.0, "excel": 0.0}
+
+    def ekle(self, bilesen, sure):
+        with self.kilit:
+            self.sureler[bilesen] += sure
+
+
+class Olcum:
+    """İş parçacığı güvenli sorgu ve işleyici ölçüm deposu.
+
+    ifade_kaydet her SQL ifadesinden sonra çağrılır (veritabani.OlcumluBaglanti). Süre
+    yavas_esik_ms'yi aşarsa ifade, gizlenmiş parametreleriyle yavaş sorgu listesine ve
+    yavas_dosyasi verildiyse o dosyaya eklenir. isleyici() bloğu içindeki ifadelerin
+    süresi o işleyicinin veritabanı bileşenine yazılır.
+    """
+
+    def __init__(self, yavas_esik_ms=200, yavas_dosyasi=None, yavas_kayit_sayisi=200):
+        self.yavas_esik_ms = yavas_esik_ms
+        self.yavas_dosyasi = yavas_dosyasi
+        self._kilit = threading.Lock()
+        self._dosya_kilidi = threading.Lock()
+        self._yerel = threading.local()
+        self._ifadeler = {}
+        self._yavaslar = deque(maxlen=yavas_kayit_sayisi)
+        self._isleyiciler = {}
+
+    # --- SQL ifadeleri ---
+
+    def ifade_kaydet(self, sorgu, params, sure, satir):
+        """Bir ifadenin süresini (sn) ve satır sayısını kaydet; sorgu metin ya da anahtar olabilir"""
+        ms = sure * 1000
+        anahtar = ifade_anahtari(sorgu)
+        with self._kilit:
+            istatistik = self._ifadeler.get(anahtar)
+            if istatistik is None:
+                istatistik = self._ifadeler[anahtar] = _IfadeIstatistigi()
+            istatistik.histogram.ekle(ms)
+            if satir is not None and satir > 0:
+                istatistik.satir += satir
+        birikim = getattr(self._yerel, "birikim", None)
+        if birikim is not None:
+            birikim.ekle("veritabani", sure)
+        if ms >= self.yavas_esik_ms:
+            self._yavas_ekle(anahtar, params, ms, satir)
+
+    def satir_ekle(self, sorgu, sure, satir):
+        """İsimli imleçte sonradan okunan parçaların süresini ve satırlarını aynı ifadeye ekle"""
+        anahtar = ifade_anahtari(sorgu)
+        with self._kilit:
+            istatistik = self._ifadeler.get(anahtar)
+            if istatistik is not None:
+                istatistik.histogram.toplam_ms += sure * 1000
+                istatistik.satir += satir
+        birikim = getattr(self._yerel, "birikim", None)
+        if birikim is not None:
+            birikim.ekle("veritabani", sure)
+
+    def _yavas_ekle(self, anahtar, params, ms, satir):
+        kayit = {
+            'zaman': datetime.now().isoformat(timespec="seconds"),
+            'sure_ms': round(ms, 1),
+            'satir': satir,
+            'sorgu': anahtar,
+            'parametreler': parametreleri_gizle(params),
+            'is_parcacigi': threading.current_thread().name,
+        }
+        with self._kilit:
+            self._yavaslar.append(kayit)
+        if self.yavas_dosyasi:
+            try:
+                with self._dosya_kilidi, open(self.yavas_dosyasi, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(kayit, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"Yavaş sorgu günlüğü yazılamadı: {e}")
+
+    def ifadeler(self):
+        """İfade özetleri, toplam süreye göre azalan sırada"""
+        with self._kilit:
+            ozetler = [dict(istatistik.histogram.ozet(), sorgu=anahtar, satir=istatistik.satir)
+                       for anahtar, istatistik in self._ifadeler.items()]
+        ozetler.sort(key=lambda ozet: ozet['toplam_ms'], reverse=True)
+        return ozetler
+
+    def yavas_sorgular(self):
+        """Eşiği aşan son sorgular (en yenisi sonda)"""
+        with self._kilit:
+            return list(self._yavaslar)
+
+    # --- İşleyiciler ---
+
+    @contextmanager
+    def isleyici(self, ad):
+        """Bloktaki veritabanı ve Excel sürelerini ad işleyicisine kaydet.
+
+        Blok bitince veritabani, excel ve diger (kalan Python/bekleme süresi) bileşenleri
+        histograma eklenir; arayüz ve toplam süreler isleyici_kaydet ile ayrıca eklenir.
+        """
+        onceki = getattr(self._yerel, "birikim", None)
+        birikim = self._yerel.birikim = _Birikim()
+        baslangic = time.perf_counter()
+        try:
+            yield birikim
+        finally:
+            sure = time.perf_counter() - baslangic
+            self._yerel.birikim = onceki
+            with birikim.kilit:
+                veritabani, excel = birikim.sureler["veritabani"], birikim.sureler["excel"]
+            # Paralel okumalarda veritabanı süresi toplamı duvar saatini aşabilir
+            diger = max(0.0, sure - veritabani - excel)
+            with self._kilit:
+                for bilesen, deger in (("veritabani", veritabani), ("excel", excel), ("diger", diger)):
+                    self._histogram(ad, bilesen).ekle(deger * 1000)
+            if onceki is not None:
+                onceki.ekle("veritabani", veritabani)
+                onceki.ekle("excel", excel)
+
+    def birikim(self):
+        """Bu iş parçacığındaki etkin işleyici birikimi (yoksa None); devral ile başka iş parçacığına taşınır"""
+        return getattr(self._yerel, "birikim", None)
+
+    @contextmanager
+    def devral(self, birikim):
+        """Başka iş parçacığında açılmış işleyicinin sürelerini bu iş parçacığında da topla"""
+        onceki = getattr(self._yerel, "birikim", None)
+        self._yerel.birikim = birikim
+        try:
+            yield
+        finally:
+            self._yerel.birikim = onceki
+
+    @contextmanager
+    def bilesen(self, bilesen):
+        """Bloğun süresini etkin işleyicinin bilesen ('excel' gibi) süresine ekle"""
+        baslangic = time.perf_counter()
+        try:
+            yield
+        finally:
+            birikim = getattr(self._yerel, "birikim", None)
+            if birikim is not None:
+                birikim.ekle(bilesen, time.perf_counter() - baslangic)
+
+    def isleyici_kaydet(self, ad, bilesen, sure):
+        """ad işleyicisinin bilesen histogramına bir ölçüm (sn) ekle"""
+        with self._kilit:
+            self._histogram(ad, bilesen).ekle(sure * 1000)
+
+    def _histogram(self, ad, bilesen):
+        bilesenler = self._isleyiciler.setdefault(ad, {})
+        histogram = bilesenler.get(bilesen)
+        if histogram is None:
+            histogram = bilesenler[bilesen] = Histogram()
+        return histogram
+
+    def isleyiciler(self):
+        """{işleyici: {bileşen: özet}}"""
+        with self._kilit:
+            return {ad: {bilesen: histogram.ozet() for bilesen, histogram in bilesenler.items()}
+                    for ad, bilesenler in sorted(self._isleyiciler.items())}
+
+    # --- Dışa aktarım ---
+
+    def anlik_goruntu(self):
+        """Tüm ölçümlerin JSON'a yazılabilir kopyası"""
+        return {
+            'zaman': datetime.now().isoformat(timespec="seconds"),
+            'yavas_esik_ms': self.yavas_esik_ms,
+            'histogram_sinirlari_ms': list(HISTOGRAM_SINIRLARI_MS),
+            'isleyiciler': self.isleyiciler(),
+            'ifadeler': self.ifadeler(),
+            'yavas_sorgular': self.yavas_sorgular(),
+        }
+
+    def json_aktar(self, dosya_yolu):
+        """Ölçümleri JSON dosyasına yaz"""
+        with open(dosya_yolu, "w", encoding="utf-8") as f:
+            json.dump(self.anlik_goruntu(), f, ensure_ascii=False, indent=2)
+
+    def csv_aktar(self, dosya_yolu):
+        """İşleyici bileşenlerini ve ifadeleri tek tabloda CSV dosyasına yaz"""
+        kova_adlari = [f"<={s}" for s in HISTOGRAM_SINIRLARI_MS] + [f">{HISTOGRAM_SINIRLARI_MS[-1]}"]
+        with open(dosya_yolu, "w", encoding="utf-8", newline="") as f:
+            yazici = csv.writer(f)
+            yazici.writerow(["tur", "ad", "bilesen", "adet", "toplam_ms", "ort_ms", "p50_ms",
+                             "p95_ms", "azami_ms", "satir"] + kova_adlari)
+            for ad, bilesenler in self.isleyiciler().items():
+                for bilesen in BILESENLER:
+                    ozet = bilesenler.get(bilesen)
+                    if ozet:
+                        yazici.writerow(["isleyici", ad, bilesen] + self._csv_degerleri(ozet, "")
+                                        + list(ozet['kovalar'].values()))
+            for ozet in self.ifadeler():
+                yazici.writerow(["ifade", ozet['sorgu'], "veritabani"]
+                                + self._csv_degerleri(ozet, ozet['satir'])
+                                + list(ozet['kovalar'].values()))
+
+    @staticmethod
+    def _csv_degerleri(ozet, satir):
+        return [ozet['adet'], ozet['toplam_ms'], ozet['ort_ms'], ozet['p50_ms'],
+                ozet['p95_ms'], ozet['azami_ms'], satir]
+
+    def sifirla(self):
+        """Tüm ölçümleri sil (yavaş sorgu dosyası korunur)"""
+        with self._kilit:
+            self._ifadeler.clear()
+            self._yavaslar.clear()
+            self._isleyiciler.clear()
@@ -0,0 +1,1560 @@
+# veritabani.py
+# PostgreSQL bağlantı ayarları ve bağlantı havuzlu, iş parçacığı güvenli veritabanı yöneticisi.
+import configparser
+import os
+import select
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from decimal import Decimal
+
+import psycopg2
+from psycopg2 import pool, sql
+from psycopg2.extras import RealDictCursor, execute_values
+
+from olcum import Olcum
+
+# === VERİTABANI BAĞLANTI AYARLARI ===
+class DatabaseConfig:
+    def __init__(self):
+        self.config_file = "db_config.ini"
+        # Dosya yoktu ve varsayılanlarla oluşturulduysa True; arayüz kullanıcıyı uyarır
+        self.yeni_olusturuldu = False
+        self.load_config()
+    
+    def load_config(self):
+        """Konfigürasyon dosyasından veritabanı ayarlarını yükle"""
+        config = configparser.ConfigParser()
+        
+        if not os.path.exists(self.config_file):
+            self.create_default_config()
+        
+        config.read(self.config_file)
+        
+        self.host = config.get('database', 'host', fallback='localhost')
+        self.port = config.get('database', 'port', fallback='5432')
+        self.database = config.get('database', 'database', fallback='beton_takip')
+        self.username = config.get('database', 'username', fallback='postgres')
+        self.password = config.get('database', 'password', fallback='password')
+        self.pool_min = config.getint('database', 'pool_min', fallback=1)
+        self.pool_max = config.getint('database', 'pool_max', fallback=5)
+        self.maliyet_yontemi = config.get('maliyet', 'yontem', fallback='ortalama')
+        self.yavas_sorgu_ms = config.getint('izleme', 'yavas_sorgu_ms', fallback=200)
+        self.yavas_sorgu_dosyasi = config.get('izleme', 'yavas_sorgu_dosyasi', fallback='yavas_sorgular.jsonl')
+    
+    def maliyet_yontemi_kaydet(self, yontem):
+        """Maliyet yöntemini konfigürasyon dosyasına yaz"""
+        config = configparser.ConfigParser()
+        config.read(self.config_file)
+        if not config.has_section('maliyet'):
+            config.add_section('maliyet')
+        config.set('maliyet', 'yontem', yontem)
+        
+        with open(self.config_file, 'w') as configfile:
+            config.write(configfile)
+        self.maliyet_yontemi = yontem
+    
+    def create_default_config(self):
+        """Varsayılan konfigürasyon dosyası oluştur"""
+        config = configparser.ConfigParser()
+        config['database'] = {
+            'host': 'localhost',
+            'port': '5432',
+            'database': 'beton_takip',
+            'username': 'postgres',
+            'password': 'password',
+            'pool_min': '1',
+            'pool_max': '5'
+        }
+        config['maliyet'] = {
+            'yontem': 'ortalama'
+        }
+        config['izleme'] = {
+            'yavas_sorgu_ms': '200',
+            'yavas_sorgu_dosyasi': 'yavas_sorgular.jsonl'
+        }
+        
+        with open(self.config_file, 'w') as configfile:
+            config.write(configfile)
+        
+        self.yeni_olusturuldu = True
+        print(f"{self.config_file} dosyası oluşturuldu. Veritabanı bağlantı ayarlarınızı düzenleyin.")
+
+# === ŞEMA GÖÇLERİ ===
+# gunluk_ozet tablosunu kaynak tablolardan baştan hesaplar (göç 6 ve yedekten geri yükleme)
+GUNLUK_OZET_DOLDUR = [
+    "DELETE FROM gunluk_ozet",
+    """INSERT INTO gunluk_ozet (tarih, satis_kar, tas_net, beton_net, kayit_sayisi)
+       SELECT tarih, SUM(satis), SUM(tas), SUM(beton), COUNT(*)
+       FROM (
+           SELECT tarih, COALESCE(net_kar, 0) AS satis, 0 AS tas, 0 AS beton
+           FROM satislar
+           UNION ALL
+           SELECT tarih, 0, CASE WHEN tip = 'Gelir' THEN toplam_tutar ELSE -toplam_tutar END, 0
+           FROM tas_gelir_gider
+           UNION ALL
+           SELECT tarih, 0, 0, CASE WHEN tip = 'Gelir' THEN toplam_tutar ELSE -toplam_tutar END
+           FROM beton_gelir_gider
+       ) hareketler
+       GROUP BY tarih""",
+]
+
+# (sürüm, açıklama, SQL ifadeleri) — sıralı; yeni adımlar sona eklenir, eskileri değiştirilmez
+MIGRATIONS = [
+    (1, "alislar son alis fiyati indeksi", [
+        """CREATE INDEX IF NOT EXISTS idx_alislar_malzeme_tarih
+           ON alislar (malzeme, tarih DESC, id DESC)""",
+    ]),
+    (2, "urunler urun indeksi", [
+        """CREATE INDEX IF NOT EXISTS idx_urunler_urun
+           ON urunler (urun, malzeme)""",
+    ]),
+    (3, "tarih sutunlari icin BRIN indeksleri", [
+        "CREATE INDEX IF NOT EXISTS brin_satislar_tarih ON satislar USING BRIN (tarih)",
+        "CREATE INDEX IF NOT EXISTS brin_tas_gelir_gider_tarih ON tas_gelir_gider USING BRIN (tarih)",
+        "CREATE INDEX IF NOT EXISTS brin_beton_gelir_gider_tarih ON beton_gelir_gider USING BRIN (tarih)",
+        "CREATE INDEX IF NOT EXISTS brin_alislar_tarih ON alislar USING BRIN (tarih)",
+        "CREATE INDEX IF NOT EXISTS brin_uretimler_tarih ON uretimler USING BRIN (tarih)",
+        "CREATE INDEX IF NOT EXISTS brin_iadeler_tarih ON iadeler USING BRIN (tarih)",
+    ]),
+    (4, "stok pozitif miktar indeksi", [
+        """CREATE INDEX IF NOT EXISTS idx_stok_pozitif
+           ON stok (malzeme) INCLUDE (miktar_kg) WHERE miktar_kg > 0""",
+    ]),
+    (5, "urunler degisikliklerini NOTIFY ile bildir", [
+        """CREATE OR REPLACE FUNCTION urunler_recete_bildir() RETURNS trigger AS $$
+           BEGIN
+               IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                   PERFORM pg_notify('recete_degisti', OLD.urun);
+               END IF;
+               IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                   PERFORM pg_notify('recete_degisti', NEW.urun);
+               END IF;
+               RETURN NULL;
+           END;
+           $$ LANGUAGE plpgsql""",
+        "DROP TRIGGER IF EXISTS trg_urunler_recete_bildir ON urunler",
+        """CREATE TRIGGER trg_urunler_recete_bildir
+           AFTER INSERT OR UPDATE OR DELETE ON urunler
+           FOR EACH ROW EXECUTE FUNCTION urunler_recete_bildir()""",
+        """CREATE OR REPLACE FUNCTION urunler_recete_bildir_truncate() RETURNS trigger AS $$
+           BEGIN
+               PERFORM pg_notify('recete_degisti', '');
+               RETURN NULL;
+           END;
+           $$ LANGUAGE plpgsql""",
+        "DROP TRIGGER IF EXISTS trg_urunler_recete_bildir_truncate ON urunler",
+        """CREATE TRIGGER trg_urunler_recete_bildir_truncate
+           AFTER TRUNCATE ON urunler
+           FOR EACH STATEMENT EXECUTE FUNCTION urunler_recete_bildir_truncate()""",
+    ]),
+    (6, "gunluk_ozet donem toplamlari ve tetikleyicileri", [
+        """CREATE TABLE IF NOT EXISTS gunluk_ozet (
+               tarih DATE PRIMARY KEY,
+               satis_kar NUMERIC NOT NULL DEFAULT 0,
+               tas_net NUMERIC NOT NULL DEFAULT 0,
+               beton_net NUMERIC NOT NULL DEFAULT 0,
+               kayit_sayisi INTEGER NOT NULL DEFAULT 0
+           )""",
+        """CREATE OR REPLACE FUNCTION gunluk_ozet_ekle(
+               p_tarih DATE, p_satis NUMERIC, p_tas NUMERIC, p_beton NUMERIC, p_sayi INTEGER
+           ) RETURNS void AS $$
+               INSERT INTO gunluk_ozet (tarih, satis_kar, tas_net, beton_net, kayit_sayisi)
+               VALUES (p_tarih, p_satis, p_tas, p_beton, p_sayi)
+               ON CONFLICT (tarih) DO UPDATE SET
+                   satis_kar = gunluk_ozet.satis_kar + EXCLUDED.satis_kar,
+                   tas_net = gunluk_ozet.tas_net + EXCLUDED.tas_net,
+                   beton_net = gunluk_ozet.beton_net + EXCLUDED.beton_net,
+                   kayit_sayisi = gunluk_ozet.kayit_sayisi + EXCLUDED.kayit_sayisi
+           $$ LANGUAGE sql""",
+        """CREATE OR REPLACE FUNCTION gunluk_ozet_satislar() RETURNS trigger AS $$
+           BEGIN
+               IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                   PERFORM gunluk_ozet_ekle(OLD.tarih, -COALESCE(OLD.net_kar, 0), 0, 0, -1);
+               END IF;
+               IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                   PERFORM gunluk_ozet_ekle(NEW.tarih, COALESCE(NEW.net_kar, 0), 0, 0, 1);
+               END IF;
+               RETURN NULL;
+           END;
+           $$ LANGUAGE plpgsql""",
+        "DROP TRIGGER IF EXISTS trg_gunluk_ozet ON satislar",
+        """CREATE TRIGGER trg_gunluk_ozet
+           AFTER INSERT OR UPDATE OR DELETE ON satislar
+           FOR EACH ROW EXECUTE FUNCTION gunluk_ozet_satislar()""",
+        """CREATE OR REPLACE FUNCTION gunluk_ozet_tas_gelir_gider() RETURNS trigger AS $$
+           BEGIN
+               IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                   PERFORM gunluk_ozet_ekle(OLD.tarih, 0, -(CASE WHEN OLD.tip = 'Gelir' THEN OLD.toplam_tutar ELSE -OLD.toplam_tutar END), 0, -1);
+               END IF;
+               IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                   PERFORM gunluk_ozet_ekle(NEW.tarih, 0, CASE WHEN NEW.tip = 'Gelir' THEN NEW.toplam_tutar ELSE -NEW.toplam_tutar END, 0, 1);
+               END IF;
+               RETURN NULL;
+           END;
+           $$ LANGUAGE plpgsql""",
+        "DROP TRIGGER IF EXISTS trg_gunluk_ozet ON tas_gelir_gider",
+        """CREATE TRIGGER trg_gunluk_ozet
+           AFTER INSERT OR UPDATE OR DELETE ON tas_gelir_gider
+           FOR EACH ROW EXECUTE FUNCTION gunluk_ozet_tas_gelir_gider()""",
+        """CREATE OR REPLACE FUNCTION gunluk_ozet_beton_gelir_gider() RETURNS trigger AS $$
+           BEGIN
+               IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                   PERFORM gunluk_ozet_ekle(OLD.tarih, 0, 0, -(CASE WHEN OLD.tip = 'Gelir' THEN OLD.toplam_tutar ELSE -OLD.toplam_tutar END), -1);
+               END IF;
+               IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                   PERFORM gunluk_ozet_ekle(NEW.tarih, 0, 0, CASE WHEN NEW.tip = 'Gelir' THEN NEW.toplam_tutar ELSE -NEW.toplam_tutar END, 1);
+               END IF;
+               RETURN NULL;
+           END;
+           $$ LANGUAGE plpgsql""",
+        "DROP TRIGGER IF EXISTS trg_gunluk_ozet ON beton_gelir_gider",
+        """CREATE TRIGGER trg_gunluk_ozet
+           AFTER INSERT OR UPDATE OR DELETE ON beton_gelir_gider
+           FOR EACH ROW EXECUTE FUNCTION gunluk_ozet_beton_gelir_gider()""",
+        # Tetikleyiciler tablo kilidini aldıktan sonra mevcut verilerle doldur
+        *GUNLUK_OZET_DOLDUR,
+    ]),
+    (7, "stok hareket defteri ve bakiye anliklari", [
+        # Her stok değişikliği işaretli miktarla bir hareket satırıdır; stok tablosu bu
+        # defterin güncel bakiye projeksiyonudur. kaynak: hareketi doğuran tablo (alislar,
+        # iadeler, uretimler) ya da 'acilis'; zaman: hareketin iş zamanı
+        """CREATE TABLE IF NOT EXISTS stok_hareketleri (
+               id BIGSERIAL PRIMARY KEY,
+               malzeme VARCHAR(255) NOT NULL,
+               miktar_kg DECIMAL(12,2) NOT NULL,
+               kaynak VARCHAR(50) NOT NULL,
+               kaynak_id INTEGER,
+               zaman TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+               created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+           )""",
+        """CREATE INDEX IF NOT EXISTS idx_stok_hareketleri_malzeme
+           ON stok_hareketleri (malzeme, id)""",
+        "CREATE INDEX IF NOT EXISTS brin_stok_hareketleri_zaman ON stok_hareketleri USING BRIN (zaman)",
+        # Anlık: son_hareket_id'ye kadarki tüm hareketlerin malzeme bazında toplamı
+        """CREATE TABLE IF NOT EXISTS stok_anliklari (
+               id SERIAL PRIMARY KEY,
+               son_hareket_id BIGINT NOT NULL UNIQUE,
+               zaman TIMESTAMP NOT NULL
+           )""",
+        "CREATE INDEX IF NOT EXISTS idx_stok_anliklari_zaman ON stok_anliklari (zaman)",
+        """CREATE TABLE IF NOT EXISTS stok_anlik_bakiyeleri (
+               anlik_id INTEGER NOT NULL REFERENCES stok_anliklari (id) ON DELETE CASCADE,
+               malzeme VARCHAR(255) NOT NULL,
+               miktar_kg DECIMAL(12,2) NOT NULL,
+               PRIMARY KEY (anlik_id, malzeme)
+           )""",
+        # Mevcut bakiyeler defterin açılış hareketleri olur
+        "LOCK TABLE stok IN SHARE MODE",
+        """INSERT INTO stok_hareketleri (malzeme, miktar_kg, kaynak)
+           SELECT malzeme, miktar_kg, 'acilis' FROM stok WHERE miktar_kg <> 0""",
+    ]),
+    (8, "malzeme maliyetleri: agirlikli ortalama ve FIFO lotlari", [
+        # Eldeki miktar ve toplam değerden yürüyen ağırlıklı ortalama; satış maliyeti
+        # malzeme başına birincil anahtar okuması olur. giris_kg / cikis_kg: FIFO konumu
+        # için kümülatif giriş ve çıkış miktarları
+        """CREATE TABLE IF NOT EXISTS malzeme_maliyetleri (
+               malzeme VARCHAR(255) PRIMARY KEY,
+               miktar_kg NUMERIC NOT NULL DEFAULT 0,
+               toplam_deger NUMERIC NOT NULL DEFAULT 0,
+               ortalama_maliyet NUMERIC(14,4),
+               giris_kg NUMERIC NOT NULL DEFAULT 0,
+               cikis_kg NUMERIC NOT NULL DEFAULT 0,
+               fifo_maliyet NUMERIC(14,4),
+               son_hareket_id BIGINT,
+               updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+           )""",
+        # Her giriş hareketi bir lottur ve kümülatif girişte [baslangic_kg, baslangic_kg + miktar_kg)
+        # aralığını kaplar. Lotlar hiç güncellenmez; sıradaki FIFO lotu cikis_kg'yi kapsayan lottur
+        """CREATE TABLE IF NOT EXISTS maliyet_lotlari (
+               hareket_id BIGINT PRIMARY KEY,
+               malzeme VARCHAR(255) NOT NULL,
+               baslangic_kg NUMERIC NOT NULL,
+               miktar_kg NUMERIC NOT NULL,
+               birim_maliyet NUMERIC(14,4) NOT NULL
+           )""",
+        """CREATE INDEX IF NOT EXISTS idx_maliyet_lotlari_malzeme
+           ON maliyet_lotlari (malzeme, baslangic_kg)""",
+        # Her hareketten sonraki birim maliyetler; geçmiş satışlar o günkü maliyetle yeniden hesaplanır
+        """CREATE TABLE IF NOT EXISTS maliyet_gecmisi (
+               hareket_id BIGINT PRIMARY KEY,
+               malzeme VARCHAR(255) NOT NULL,
+               zaman TIMESTAMP NOT NULL,
+               ortalama_maliyet NUMERIC(14,4),
+               fifo_maliyet NUMERIC(14,4)
+           )""",
+        """CREATE INDEX IF NOT EXISTS idx_maliyet_gecmisi_malzeme_zaman
+           ON maliyet_gecmisi (malzeme, zaman, hareket_id)""",
+        """CREATE OR REPLACE FUNCTION malzeme_maliyeti_yaz(m malzeme_maliyetleri) RETURNS void AS $$
+               UPDATE malzeme_maliyetleri
+               SET miktar_kg = m.miktar_kg,
+                   toplam_deger = m.toplam_deger,
+                   ortalama_maliyet = m.ortalama_maliyet,
+                   giris_kg = m.giris_kg,
+                   cikis_kg = m.cikis_kg,
+                   fifo_maliyet = m.fifo_maliyet,
+                   son_hareket_id = m.son_hareket_id,
+                   updated_at = CURRENT_TIMESTAMP
+               WHERE malzeme = m.malzeme
+           $$ LANGUAGE sql""",
+        # Verilen hareketleri malzeme ve id sırasıyla işler. Malzeme satırı bir kez kilitlenip
+        # bir kez yazılır; toplu eklemelerde aynı satır tekrar tekrar güncellenmez
+        """CREATE OR REPLACE FUNCTION maliyet_hareketlerini_uygula(p_idler BIGINT[]) RETURNS void AS $$
+           DECLARE
+               m malzeme_maliyetleri%ROWTYPE;
+               h RECORD;
+               birim NUMERIC;
+               lot_birim NUMERIC;
+               lot_acik BOOLEAN;
+           BEGIN
+               FOR h IN SELECT sh.id, sh.malzeme, sh.miktar_kg, sh.zaman, a.birim_fiyat
+                        FROM unnest(p_idler) AS i(id)
+                        JOIN stok_hareketleri sh ON sh.id = i.id
+                        LEFT JOIN alislar a ON sh.kaynak = 'alislar' AND a.id = sh.kaynak_id
+                        WHERE sh.miktar_kg <> 0
+                        ORDER BY sh.malzeme, sh.id LOOP
+                   IF m.malzeme IS DISTINCT FROM h.malzeme THEN
+                       IF m.malzeme IS NOT NULL THEN
+                           PERFORM malzeme_maliyeti_yaz(m);
+                       END IF;
+                       INSERT INTO malzeme_maliyetleri (malzeme) VALUES (h.malzeme)
+                       ON CONFLICT (malzeme) DO NOTHING;
+                       SELECT * INTO m FROM malzeme_maliyetleri WHERE malzeme = h.malzeme FOR UPDATE;
+                   END IF;
+
+                   IF h.miktar_kg > 0 THEN
+                       -- Alış kendi fiyatıyla; iade ve açılış eldeki ortalamayla, o da yoksa
+                       -- geçmiş alışların ortalamasıyla değerlenir
+                       birim := COALESCE(h.birim_fiyat, m.ortalama_maliyet);
+                       IF birim IS NULL THEN
+                           SELECT SUM(toplam_tutar) / NULLIF(SUM(miktar_kg), 0) INTO birim
+                           FROM alislar WHERE malzeme = h.malzeme;
+                       END IF;
+                       birim := COALESCE(birim, 0);
+
+                       IF m.miktar_kg <= 0 THEN
+                           m.toplam_deger := GREATEST(m.miktar_kg + h.miktar_kg, 0) * birim;
+                           m.ortalama_maliyet := birim;
+                       ELSE
+                           m.toplam_deger := m.toplam_deger + h.miktar_kg * birim;
+                           m.ortalama_maliyet := m.toplam_deger / (m.miktar_kg + h.miktar_kg);
+                       END IF;
+                       INSERT INTO maliyet_lotlari (hareket_id, malzeme, baslangic_kg, miktar_kg, birim_maliyet)
+                       VALUES (h.id, h.malzeme, m.giris_kg, h.miktar_kg, birim);
+                       m.giris_kg := m.giris_kg + h.miktar_kg;
+                   ELSE
+                       -- Çıkış ortalamayı değiştirmez; değer ortalama maliyetle düşülür
+                       m.toplam_deger := CASE WHEN m.miktar_kg + h.miktar_kg > 0
+                                              THEN m.toplam_deger + h.miktar_kg * COALESCE(m.ortalama_maliyet, 0)
+                                              ELSE 0 END;
+                       m.cikis_kg := m.cikis_kg - h.miktar_kg;
+                   END IF;
+                   m.miktar_kg := m.miktar_kg + h.miktar_kg;
+
+                   -- Sıradaki çıkışı karşılayacak lot; tüm lotlar tükendiyse son değer korunur
+                   SELECT l.birim_maliyet, l.baslangic_kg + l.miktar_kg > m.cikis_kg
+                   INTO lot_birim, lot_acik
+                   FROM maliyet_lotlari l
+                   WHERE l.malzeme = h.malzeme AND l.baslangic_kg <= m.cikis_kg
+                   ORDER BY l.baslangic_kg DESC
+                   LIMIT 1;
+                   IF lot_acik THEN
+                       m.fifo_maliyet := lot_birim;
+                   END IF;
+                   m.fifo_maliyet := COALESCE(m.fifo_maliyet, m.ortalama_maliyet);
+
+                   INSERT INTO maliyet_gecmisi (hareket_id, malzeme, zaman, ortalama_maliyet, fifo_maliyet)
+                   VALUES (h.id, h.malzeme, h.zaman, m.ortalama_maliyet, m.fifo_maliyet);
+                   m.son_hareket_id := h.id;
+               END LOOP;
+
+               IF m.malzeme IS NOT NULL THEN
+                   PERFORM malzeme_maliyeti_yaz(m);
+               END IF;
+           END;
+           $$ LANGUAGE plpgsql""",
+        """CREATE OR REPLACE FUNCTION maliyet_hareketleri() RETURNS trigger AS $$
+           BEGIN
+               PERFORM maliyet_hareketlerini_uygula(ARRAY(SELECT id FROM yeni_hareketler));
+               RETURN NULL;
+           END;
+           $$ LANGUAGE plpgsql""",
+        "DROP TRIGGER IF EXISTS trg_maliyet ON stok_hareketleri",
+        """CREATE TRIGGER trg_maliyet
+           AFTER INSERT ON stok_hareketleri
+           REFERENCING NEW TABLE AS yeni_hareketler
+           FOR EACH STATEMENT EXECUTE FUNCTION maliyet_hareketleri()""",
+        # Maliyetleri defteri baştan oynatarak hesaplar (göç ve yedekten geri yükleme)
+        """CREATE OR REPLACE FUNCTION maliyetleri_yeniden_hesapla() RETURNS void AS $$
+           BEGIN
+               DELETE FROM maliyet_gecmisi;
+               DELETE FROM maliyet_lotlari;
+               DELETE FROM malzeme_maliyetleri;
+               PERFORM maliyet_hareketlerini_uygula(ARRAY(SELECT id FROM stok_hareketleri));
+           END;
+           $$ LANGUAGE plpgsql""",
+        "LOCK TABLE stok_hareketleri IN SHARE MODE",
+        "SELECT maliyetleri_yeniden_hesapla()",
+    ]),
+    (9, "satislar updated_at: net kar yeniden hesaplamasi artimli yedege ve ozet filigranina girsin", [
+        "ALTER TABLE satislar ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+        "CREATE INDEX IF NOT EXISTS idx_satislar_updated_at ON satislar (updated_at)",
+    ]),
+    (10, "alislar son alis fiyati indeksi kaldirildi: satis maliyeti malzeme_maliyetleri'nden okunuyor", [
+        "DROP INDEX IF EXISTS idx_alislar_malzeme_tarih",
+    ]),
+]
+
+# Göçler sırasında alınan pg_advisory_xact_lock anahtarı
+MIGRATION_KILIDI = 7301001
+
+# Kodun beklediği şema sürümü; veritabanı bu sürümdeyse açılışta DDL çalıştırılmaz
+SON_SEMA_SURUMU = MIGRATIONS[-1][0]
+
+# === MALİYETLENDİRME ===
+# Birim maliyet yöntemleri: yürüyen ağırlıklı ortalama ya da FIFO lotları (göç 8). Yeni satışta
+# FIFO, gereken miktarı sıradaki lotlara yayar ve her dilimi kendi lotunun fiyatıyla değerler.
+# Geçmiş kârların yeniden hesabı ise basitleştirilmiştir: satış günü sonundaki sıradaki lotun
+# birim fiyatı (maliyet_gecmisi.fifo_maliyet) tüm miktara uygulanır.
+MALIYET_YONTEMLERI = ('ortalama', 'fifo')
+
+# Satış fiyatlarına dahil KDV; net kâr KDV hariç satış tutarından maliyet düşülerek bulunur
+KDV_ORANI = Decimal('0.20')
+
+# Reçetedeki her malzemenin ağırlıklı ortalama maliyetle maliyeti (satis_kaydet);
+# malzeme başına malzeme_maliyetleri birincil anahtar okuması
+RECETE_MALIYETI_SORGUSU = """
+    SELECT r.malzeme,
+           %(miktar)s * r.oran AS gereken_miktar,
+           m.ortalama_maliyet AS birim_fiyat,
+           %(miktar)s * r.oran * m.ortalama_maliyet AS maliyet
+    FROM unnest(%(malzemeler)s::varchar[], %(oranlar)s::numeric[])
+         WITH ORDINALITY AS r(malzeme, oran, sira)
+    LEFT JOIN malzeme_maliyetleri m ON m.malzeme = r.malzeme
+    ORDER BY r.sira
+"""
+
+# FIFO reçete maliyeti: malzemenin kümülatif çıkış konumundan (cikis_kg) başlayan
+# [cikis_kg, cikis_kg + gereken) aralığı lotların kümülatif giriş aralıklarıyla kesiştirilir ve
+# her dilim kendi lotunun fiyatıyla değerlenir. Lot başlangıçları kümülatif tutulduğundan bu,
+# çıkış konumunu kapsayan lottan başlayan bir idx_maliyet_lotlari_malzeme aralık taramasıdır.
+# Açık lotları aşan kısım son FIFO birim maliyetiyle değerlenir; birim_fiyat dilimlerin ortalamasıdır
+FIFO_RECETE_MALIYETI_SORGUSU = """
+    SELECT r.malzeme,
+           r.gereken AS gereken_miktar,
+           f.maliyet / NULLIF(r.gereken, 0) AS birim_fiyat,
+           f.maliyet
+    FROM (
+        SELECT malzeme, %(miktar)s * oran AS gereken, sira
+        FROM unnest(%(malzemeler)s::varchar[], %(oranlar)s::numeric[])
+             WITH ORDINALITY AS u(malzeme, oran, sira)
+    ) r
+    LEFT JOIN malzeme_maliyetleri m ON m.malzeme = r.malzeme
+    LEFT JOIN LATERAL (
+        SELECT COALESCE(SUM(d.dilim * l.birim_maliyet), 0)
+               + CASE WHEN SUM(d.dilim) >= r.gereken THEN 0
+                      ELSE (r.gereken - COALESCE(SUM(d.dilim), 0)) * m.fifo_maliyet END AS maliyet
+        FROM maliyet_lotlari l
+        CROSS JOIN LATERAL (
+            SELECT LEAST(l.baslangic_kg + l.miktar_kg, m.cikis_kg + r.gereken)
+                   - GREATEST(l.baslangic_kg, m.cikis_kg) AS dilim
+        ) d
+        WHERE l.malzeme = r.malzeme
+          AND l.baslangic_kg >= COALESCE((SELECT MAX(baslangic_kg) FROM maliyet_lotlari
+                                          WHERE malzeme = r.malzeme AND baslangic_kg <= m.cikis_kg), 0)
+          AND l.baslangic_kg < m.cikis_kg + r.gereken
+          AND l.baslangic_kg + l.miktar_kg > m.cikis_kg
+    ) f ON TRUE
+    ORDER BY r.sira
+"""
+
+# Tüm satışların net kârını satış günü sonundaki birim maliyetlerle yeniden hesaplar. Maliyet
+# ürün ve gün başına bir kez bulunur (satış sayısından bağımsız); maliyet geçmişi satış gününden
+# sonra başlıyorsa (defterden önceki satışlar) ilk kayıt kullanılır. Yalnızca değişen satırlar
+# yazılır, gunluk_ozet tetikleyicisi farkları işler
+NET_KAR_YENIDEN_HESAPLA_SORGUSU = """
+    WITH recete AS (
+        SELECT urun, malzeme, SUM(yuzde) / 100 AS oran
+        FROM urunler
+        GROUP BY urun, malzeme
+    ),
+    gunler AS (
+        SELECT DISTINCT urun, tarih FROM satislar
+    ),
+    birim_maliyet AS (
+        SELECT g.urun, g.tarih, SUM(r.oran * COALESCE(once.birim, sonra.birim)) AS kg_maliyeti
+        FROM gunler g
+        JOIN recete r ON r.urun = g.urun
+        LEFT JOIN LATERAL (
+            SELECT CASE WHEN %(yontem)s = 'fifo' THEN fifo_maliyet ELSE ortalama_maliyet END AS birim
+            FROM maliyet_gecmisi
+            WHERE malzeme = r.malzeme AND zaman < g.tarih + 1
+            ORDER BY zaman DESC, hareket_id DESC
+            LIMIT 1
+        ) once ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT CASE WHEN %(yontem)s = 'fifo' THEN fifo_maliyet ELSE ortalama_maliyet END AS birim
+            FROM maliyet_gecmisi
+            WHERE malzeme = r.malzeme AND once.birim IS NULL
+            ORDER BY zaman, hareket_id
+            LIMIT 1
+        ) sonra ON TRUE
+        GROUP BY g.urun, g.tarih
+    ),
+    yeni AS (
+        SELECT s.id,
+               ROUND(s.miktar_kg * s.satis_fiyat / (1 + %(kdv)s)
+                     - s.miktar_kg * COALESCE(b.kg_maliyeti, 0), 2) AS net_kar
+        FROM satislar s
+        LEFT JOIN birim_maliyet b ON b.urun = s.urun AND b.tarih = s.tarih
+    )
+    UPDATE satislar s
+    SET net_kar = y.net_kar,
+        updated_at = CURRENT_TIMESTAMP
+    FROM yeni y
+    WHERE y.id = s.id
+      AND s.net_kar IS DISTINCT FROM y.net_kar
+"""
+
+# === STOK DEFTERİ ===
+# Belirli bir andaki stok: o andan önceki son anlık + anlıktan sonraki hareketler.
+# Anlıktaki hareketlerin hepsi anlık zamanından öncedir, bu yüzden maliyet
+# O(son anlıktan bu yana hareket) olur; hiç anlık yoksa tüm defter toplanır.
+STOK_DURUMU_SORGUSU = """
+    WITH anlik AS (
+        SELECT id, son_hareket_id FROM stok_anliklari
+        WHERE zaman <= %(zaman)s
+        ORDER BY zaman DESC
+        LIMIT 1
+    )
+    SELECT malzeme, SUM(miktar_kg) AS miktar_kg
+    FROM (
+        SELECT b.malzeme, b.miktar_kg
+        FROM stok_anlik_bakiyeleri b
+        JOIN anlik a ON b.anlik_id = a.id
+        UNION ALL
+        SELECT h.malzeme, h.miktar_kg
+        FROM stok_hareketleri h
+        WHERE h.id > COALESCE((SELECT son_hareket_id FROM anlik), 0)
+          AND h.zaman <= %(zaman)s
+    ) hareketler
+    GROUP BY malzeme
+    ORDER BY malzeme
+"""
+
+# Yeni anlık: önceki anlığın bakiyeleri + aradaki hareketler. Defter SHARE kilidiyle
+# alındığı için yarıda kalmış ekleme yoktur; son_hareket_id'ye kadarki her hareket işlenmiştir
+STOK_ANLIGI_SORGUSU = """
+    WITH onceki AS (
+        SELECT id, son_hareket_id FROM stok_anliklari
+        ORDER BY son_hareket_id DESC
+        LIMIT 1
+    ),
+    son AS (
+        SELECT COALESCE(MAX(id), 0) AS son_hareket_id,
+               COUNT(*) FILTER (WHERE id > COALESCE((SELECT son_hareket_id FROM onceki), 0)) AS yeni_hareket
+        FROM stok_hareketleri
+    ),
+    anlik AS (
+        INSERT INTO stok_anliklari (son_hareket_id, zaman)
+        SELECT son_hareket_id, clock_timestamp() FROM son
+        WHERE yeni_hareket > 0 AND yeni_hareket >= %(esik)s
+        RETURNING id, son_hareket_id
+    ),
+    bakiyeler AS (
+        INSERT INTO stok_anlik_bakiyeleri (anlik_id, malzeme, miktar_kg)
+        SELECT (SELECT id FROM anlik), malzeme, SUM(miktar_kg)
+        FROM (
+            SELECT malzeme, miktar_kg FROM stok_anlik_bakiyeleri
+            WHERE anlik_id = (SELECT id FROM onceki)
+            UNION ALL
+            SELECT malzeme, miktar_kg FROM stok_hareketleri
+            WHERE id > COALESCE((SELECT son_hareket_id FROM onceki), 0)
+              AND id <= (SELECT son_hareket_id FROM anlik)
+        ) hareketler
+        WHERE EXISTS (SELECT 1 FROM anlik)
+        GROUP BY malzeme
+        RETURNING 1
+    )
+    SELECT a.id, a.son_hareket_id, (SELECT COUNT(*) FROM bakiyeler) AS malzeme_sayisi
+    FROM anlik a
+"""
+
+# === ÖZET GÖSTERGELERİ ===
+# Tabloların değişip değişmediğini ucuzca anlamak için filigran: tablo başına MAX(id)
+# (birincil anahtar indeksinden okunur); yerinde güncellenen stok ve satislar (net kâr
+# yeniden hesaplaması) için MAX(updated_at)
+OZET_FILIGRAN_SORGUSU = """
+    SELECT (SELECT MAX(id) FROM stok) AS stok_id,
+           (SELECT MAX(updated_at) FROM stok) AS stok_updated_at,
+           (SELECT MAX(id) FROM alislar) AS alislar_id,
+           (SELECT MAX(id) FROM uretimler) AS uretimler_id,
+           (SELECT MAX(id) FROM satislar) AS satislar_id,
+           (SELECT MAX(updated_at) FROM satislar) AS satislar_updated_at,
+           (SELECT MAX(id) FROM tas_gelir_gider) AS tas_gelir_gider_id,
+           (SELECT MAX(id) FROM beton_gelir_gider) AS beton_gelir_gider_id
+"""
+
+# Genel rapordaki tüm toplamlar tek ifadede; satislar tek taramada iki toplamı birlikte verir
+OZET_GOSTERGE_SORGUSU = """
+    SELECT COALESCE((SELECT SUM(miktar_kg) FROM stok), 0) AS toplam_stok,
+           COALESCE((SELECT SUM(toplam_tutar) FROM alislar), 0) AS toplam_alis,
+           COALESCE((SELECT SUM(gramaj_kg) FROM uretimler), 0) AS toplam_uretim,
+           COALESCE(s.toplam_satis, 0) AS toplam_satis,
+           COALESCE(s.toplam_kar, 0) AS toplam_kar,
+           COALESCE((SELECT SUM(CASE WHEN tip = 'Gelir' THEN toplam_tutar ELSE -toplam_tutar END)
+                     FROM tas_gelir_gider), 0) AS tas_net,
+           COALESCE((SELECT SUM(CASE WHEN tip = 'Gelir' THEN toplam_tutar ELSE -toplam_tutar END)
+                     FROM beton_gelir_gider), 0) AS beton_net,
+           f.*
+    FROM (SELECT SUM(toplam_satis) AS toplam_satis, SUM(net_kar) AS toplam_kar FROM satislar) s
+    CROSS JOIN (""" + OZET_FILIGRAN_SORGUSU + """) f
+"""
+
+OZET_FILIGRAN_ALANLARI = (
+    'stok_id', 'stok_updated_at', 'alislar_id', 'uretimler_id',
+    'satislar_id', 'satislar_updated_at', 'tas_gelir_gider_id', 'beton_gelir_gider_id',
+)
+
+# === REÇETE ÖNBELLEĞİ ===
+# urunler tablosundaki değişiklikler bu kanala ürün adıyla bildirilir (göç 5)
+RECETE_KANALI = "recete_degisti"
+
+class ReceteOnbellegi:
+    """Ürün başına reçete oran vektörlerini bellekte tutar.
+    
+    Her ürün için {'malzemeler': [...], 'oranlar': [...]} saklanır; oran = yüzde / 100 ve
+    aynı malzemenin satırları toplanmıştır. recete_kaydet gecersiz_kil() çağırır,
+    başka iş istasyonlarının değişiklikleri dinle() ile LISTEN/NOTIFY üzerinden gelir.
+    """
+    
+    # Dinleyici bağlantısı koparsa yeniden denemeden önce beklenecek süre (saniye)
+    YENIDEN_DENEME_SN = 5
+    
+    def __init__(self, db):
+        self.db = db
+        self._receteler = {}
+        self._nesil = 0
+        self._kilit = threading.Lock()
+        self._dinleyici = None
+        self._dur = threading.Event()
+    
+    def getir(self, urun):
+        """Ürünün reçetesini önbellekten getir, yoksa veritabanından yükle"""
+        with self._kilit:
+            recete = self._receteler.get(urun)
+            nesil = self._nesil
+        if recete is not None:
+            return recete
+        
+        rows = self.db.fetch_all("""
+            SELECT malzeme, SUM(yuzde) / 100 AS oran
+            FROM urunler
+            WHERE urun = %s
+            GROUP BY malzeme
+            ORDER BY MIN(id)
+        """, [urun])
+        recete = {
+            'malzemeler': [row['malzeme'] for row in rows],
+            'oranlar': [row['oran'] for row in rows],
+        }
+        # Tanımsız ürünler önbelleğe alınmaz; yükleme sırasında gelen geçersiz kılma
+        # varsa okunan reçete eski olabileceğinden saklanmaz
+        if rows:
+            with self._kilit:
+                if nesil == self._nesil:
+                    self._receteler[urun] = recete
+        return recete
+    
+    def gecersiz_kil(self, urun=None):
+        """Ürünün (urun None ise tüm ürünlerin) önbellek kaydını sil"""
+        with self._kilit:
+            self._nesil += 1
+            if urun is None:
+                self._receteler.clear()
+            else:
+                self._receteler.pop(urun, None)
+    
+    def dinle(self):
+        """Diğer iş istasyonlarındaki reçete değişikliklerini arka planda dinlemeye başla"""
+        if self._dinleyici and self._dinleyici.is_alive():
+            return
+        self._dur.clear()
+        self._dinleyici = threading.Thread(target=self._dinle, name="ReceteDinleyici", daemon=True)
+        self._dinleyici.start()
+    
+    def durdur(self):
+        """Dinleyiciyi durdur"""
+        self._dur.set()
+    
+    def _dinle(self):
+        while not self._dur.is_set():
+            conn = None
+            try:
+                conn = self.db.yeni_baglanti()
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {RECETE_KANALI}")
+                # Bağlantı yokken kaçırılmış bildirimler olabilir
+                self.gecersiz_kil()
+                
+                while not self._dur.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        bildirim = conn.notifies.pop(0)
+                        self.gecersiz_kil(bildirim.payload or None)
+            except psycopg2.Error as e:
+                print(f"Reçete dinleyici hatası: {str(e)}")
+                self._dur.wait(self.YENIDEN_DENEME_SN)
+            finally:
+                if conn is not None and not conn.closed:
+                    conn.close()
+
+# === KATALOG ÖNBELLEĞİ ===
+# Combobox listeleri: stoktaki malzemeler ve tanımlı ürünler tek sorguda
+KATALOG_SORGUSU = """
+    SELECT 'malzeme' AS tur, malzeme AS ad FROM stok
+    UNION
+    SELECT 'urun', urun FROM urunler
+"""
+
+class KatalogOnbellegi:
+    """Malzeme (stok) ve ürün (urunler) adlarını bellekte tutar.
+    
+    İlk erişimde KATALOG_SORGUSU ile yüklenir. Kayıt işlemleri yeni adları ekle() ile
+    bildirir; tam yeniden yükleme yalnızca yenile() çağrılınca yapılır.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self._malzemeler = None
+        self._urunler = None
+        self._nesil = 0
+        self._kilit = threading.Lock()
+    
+    def yuklu(self):
+        """Listeler bellekte mi (okumak sorgu gerektirmez)"""
+        with self._kilit:
+            return self._malzemeler is not None
+    
+    def _listeler(self):
+        """(malzemeler, urunler) sıralı listeleri; bellekte yoksa tek sorguyla yükle"""
+        with self._kilit:
+            if self._malzemeler is not None:
+                return sorted(self._malzemeler), sorted(self._urunler)
+            nesil = self._nesil
+        
+        malzemeler, urunler = set(), set()
+        for row in self.db.fetch_all(KATALOG_SORGUSU):
+            (malzemeler if row['tur'] == 'malzeme' else urunler).add(row['ad'])
+        # Yükleme sırasında ekle() ya da yenile() geldiyse okunan liste eksik olabilir
+        with self._kilit:
+            if nesil == self._nesil:
+                self._malzemeler, self._urunler = set(malzemeler), set(urunler)
+        return sorted(malzemeler), sorted(urunler)
+    
+    def malzemeler(self):
+        """Stokta kaydı bulunan malzemeler"""
+        return self._listeler()[0]
+    
+    def urunler(self):
+        """Reçetesi tanımlı ürünler"""
+        return self._listeler()[1]
+    
+    def malzeme_ve_urunler(self):
+        """Malzeme ve ürünlerin birleşik listesi"""
+        malzemeler, urunler = self._listeler()
+        return sorted(set(malzemeler + urunler))
+    
+    def ekle(self, malzeme=None, urun=None):
+        """Az önce kaydedilen stok malzemesini ya da ürünü listelere ekle (sorgu yok)"""
+        with self._kilit:
+            if self._malzemeler is None:
+                # Sürmekte olan bir yükleme bu kaydı görmemiş olabilir
+                self._nesil += 1
+                return
+            if malzeme:
+                self._malzemeler.add(malzeme)
+            if urun:
+                self._urunler.add(urun)
+    
+    def yenile(self):
+        """Listeleri boşalt; sonraki erişim veritabanından yeniden yükler"""
+        with self._kilit:
+            self._nesil += 1
+            self._malzemeler = None
+            self._urunler = None
+
+# === SORGU ÖLÇÜMÜ ===
+class _OlcumluImlec:
+    """execute/copy_expert süresini ve satır sayısını bağlantının Olcum nesnesine yazar"""
+    # execute_values gibi sorguyu değerlerle birleştirip gönderenler için gruplama anahtarı
+    ifade_etiketi = None
+    
+    def execute(self, query, vars=None):
+        if isinstance(query, sql.Composable):
+            query = query.as_string(self)
+        baslangic = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self.connection.olcum.ifade_kaydet(self.ifade_etiketi or query, vars,
+                                               time.perf_counter() - baslangic, self.rowcount)
+    
+    def copy_expert(self, komut, file, size=8192):
+        baslangic = time.perf_counter()
+        try:
+            return super().copy_expert(komut, file, size)
+        finally:
+            self.connection.olcum.ifade_kaydet(komut, None, time.perf_counter() - baslangic, self.rowcount)
+
+class _OlcumluIsimliImlec(_OlcumluImlec):
+    """Sunucu taraflı imleç: satırlar fetchmany ile geldiğinden okuma süresi de ifadeye eklenir"""
+    _son_sorgu = None
+    
+    def execute(self, query, vars=None):
+        if isinstance(query, sql.Composable):
+            query = query.as_string(self)
+        self._son_sorgu = query
+        return super().execute(query, vars)
+    
+    def fetchmany(self, size=None):
+        baslangic = time.perf_counter()
+        satirlar = super().fetchmany() if size is None else super().fetchmany(size)
+        self.connection.olcum.satir_ekle(self.ifade_etiketi or self._son_sorgu,
+                                         time.perf_counter() - baslangic, len(satirlar))
+        return satirlar
+
+_olcumlu_imlec_siniflari = {}
+
+def _olcumlu_imlec_sinifi(temel, isimli):
+    """temel imleç sınıfının (RealDictCursor gibi) ölçümlü alt sınıfı"""
+    anahtar = (temel, isimli)
+    sinif = _olcumlu_imlec_siniflari.get(anahtar)
+    if sinif is None:
+        karisim = _OlcumluIsimliImlec if isimli else _OlcumluImlec
+        sinif = _olcumlu_imlec_siniflari[anahtar] = type(f"Olcumlu{temel.__name__}", (karisim, temel), {})
+    return sinif
+
+class OlcumluBaglanti(psycopg2.extensions.connection):
+    """İmleçlerini ölçümlü sınıflarla açan bağlantı; olcum, DatabaseManager.connect'te alt sınıfta atanır"""
+    olcum = None
+    
+    def cursor(self, *args, **kwargs):
+        temel = kwargs.get('cursor_factory') or self.cursor_factory or psycopg2.extensions.cursor
+        isimli = bool(kwargs.get('name') or (args and args[0]))
+        kwargs['cursor_factory'] = _olcumlu_imlec_sinifi(temel, isimli)
+        return super().cursor(*args, **kwargs)
+
+# === VERİTABANI YÖNETİCİSİ ===
+class DatabaseManager:
+    def __init__(self, config=None):
+        self.config = config or DatabaseConfig()
+        self.pool = None
+        self._yuva = None
+        self._istatistik_kilidi = threading.Lock()
+        self._kullanimda = 0
+        self._bekleme_sayisi = 0
+        self._bekleme_suresi = 0.0
+        self._yeniden_baglanma = 0
+        self.receteler = ReceteOnbellegi(self)
+        self.katalog = KatalogOnbellegi(self)
+        self._ozet_onbellek = None
+        # Sorgu süreleri, yavaş sorgu günlüğü ve işleyici gecikme histogramları
+        self.olcum = Olcum(self.config.yavas_sorgu_ms, self.config.yavas_sorgu_dosyasi or None)
+        # Açılış aşamalarının süreleri (saniye); --profile-startup raporunda kullanılır
+        self.acilis_sureleri = {}
+        baslangic = time.perf_counter()
+        self.connect()
+        self.acilis_sureleri['baglanti'] = time.perf_counter() - baslangic
+        baslangic = time.perf_counter()
+        self.create_tables()
+        self.acilis_sureleri['sema'] = time.perf_counter() - baslangic
+    
+    def connect(self):
+        """Veritabanı bağlantı havuzunu oluştur"""
+        self.pool = pool.ThreadedConnectionPool(
+            self.config.pool_min,
+            self.config.pool_max,
+            host=self.config.host,
+            port=self.config.port,
+            database=self.config.database,
+            user=self.config.username,
+            password=self.config.password,
+            connection_factory=type("OlcumluBaglanti", (OlcumluBaglanti,), {'olcum': self.olcum})
+        )
+        # ThreadedConnectionPool dolunca hata verir; boş yuva beklemek için semafor
+        self._yuva = threading.BoundedSemaphore(self.config.pool_max)
+        print("Veritabanı bağlantısı başarılı!")
+    
+    def yeni_baglanti(self):
+        """Havuz dışında, uzun süre açık kalacak ayrı bir bağlantı aç (ör. LISTEN için)"""
+        return psycopg2.connect(
+            host=self.config.host,
+            port=self.config.port,
+            database=self.config.database,
+            user=self.config.username,
+            password=self.config.password
+        )
+    
+    def close(self):
+        """Havuzdaki tüm bağlantıları kapat"""
+        self.receteler.durdur()
+        if self.pool and not self.pool.closed:
+            self.pool.closeall()
+    
+    def _al(self, dogrula=False):
+        """Havuzdan bağlantı al, havuz doluysa boşalmasını bekle.
+        
+        dogrula=True ise bağlantı, çağırana verilmeden önce SELECT 1 ile yoklanır; kopmuşsa
+        atılıp yenisi alınır. Böylece yazma işlemleri hiçbir komut gönderilmeden önce
+        canlı bir bağlantı alır ve hata sonrası yeniden denenmeleri gerekmez.
+        """
+        if not self._yuva.acquire(blocking=False):
+            baslangic = time.perf_counter()
+            self._yuva.acquire()
+            with self._istatistik_kilidi:
+                self._bekleme_sayisi += 1
+                self._bekleme_suresi += time.perf_counter() - baslangic
+        try:
+            conn = self.pool.getconn()
+            # Sunucu yeniden başladıysa havuzdaki her bağlantı kopmuş olabilir
+            for _ in range(self.config.pool_max):
+                if not (conn.closed or (dogrula and not self._canli_mi(conn))):
+                    break
+                # Kopmuş bağlantıyı at, yenisini aç
+                self.pool.putconn(conn, close=True)
+                conn = self.pool.getconn()
+                with self._istatistik_kilidi:
+                    self._yeniden_baglanma += 1
+            conn.autocommit = True
+        except Exception:
+            self._yuva.release()
+            raise
+        with self._istatistik_kilidi:
+            self._kullanimda += 1
+        return conn
+    
+    @staticmethod
+    def _canli_mi(conn):
+        """Bağlantıyı SELECT 1 ile yokla; yoklama sorgu ölçümlerine karışmasın diye ölçümsüz imleç"""
+        try:
+            conn.autocommit = True
+            with psycopg2.extensions.connection.cursor(conn) as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            return False
+    
+    def _birak(self, conn, kapat=False):
+        """Bağlantıyı havuza geri ver"""
+        try:
+            self.pool.putconn(conn, close=kapat or bool(conn.closed))
+        finally:
+            with self._istatistik_kilidi:
+                self._kullanimda -= 1
+            self._yuva.release()
+    
+    @contextmanager
+    def baglanti(self):
+        """Havuzdan ödünç bağlantı (autocommit); with bloğu bitince geri verilir"""
+        conn = self._al()
+        try:
+            yield conn
+        finally:
+            self._birak(conn)
+    
+    @contextmanager
+    def islem(self):
+        """Havuzdan ödünç bağlantıyla işlem (transaction); hata olursa geri alınır"""
+        conn = self._al(dogrula=True)
+        try:
+            conn.autocommit = False
+            yield conn
+            conn.commit()
+        except BaseException:
+            # GeneratorExit dahil: yarıda bırakılan işlemler de geri alınmalı
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            if not conn.closed:
+                conn.autocommit = True
+            self._birak(conn)
+    
+    def _calistir(self, islem, salt_okunur=False):
+        """islem(conn) çağrısını çalıştır.
+        
+        Salt okunur çağrılar bağlantı koptuysa yeni bağlantıyla tekrar denenir. Yazmalar
+        tekrar denenmez: sunucu komutu işleyip yanıt gönderemeden kopmuş olabilir ve ikinci
+        deneme satırı iki kez yazar. Onun yerine bağlantı, gönderilmeden önce _al'da yoklanır.
+        """
+        deneme_sayisi = self.config.pool_max + 1 if salt_okunur else 1
+        for deneme in range(deneme_sayisi):
+            conn = self._al(dogrula=not salt_okunur)
+            try:
+                sonuc = islem(conn)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                kopuk = bool(conn.closed)
+                self._birak(conn, kapat=kopuk)
+                if not kopuk or deneme == deneme_sayisi - 1:
+                    raise
+                with self._istatistik_kilidi:
+                    self._yeniden_baglanma += 1
+                print("Veritabanı bağlantısı koptu, yeniden bağlanılıyor...")
+                continue
+            except Exception:
+                self._birak(conn)
+                raise
+            self._birak(conn)
+            return sonuc
+    
+    def havuz_istatistikleri(self):
+        """Bağlantı havuzu kullanım istatistikleri"""
+        with self._istatistik_kilidi:
+            return {
+                'kullanimda': self._kullanimda,
+                'azami': self.config.pool_max,
+                'bekleme_sayisi': self._bekleme_sayisi,
+                'toplam_bekleme_sn': self._bekleme_suresi,
+                'ortalama_bekleme_ms': (self._bekleme_suresi / self._bekleme_sayisi * 1000
+                                        if self._bekleme_sayisi else 0.0),
+                'yeniden_baglanma': self._yeniden_baglanma,
+            }
+    
+    def create_tables(self):
+        """Gerekli tabloları oluştur ve bekleyen şema göçlerini uygula; şema güncelse atla"""
+        if self.sema_guncel_mi():
+            return
+        with self.baglanti() as conn:
+            self._tablolari_olustur(conn)
+        self.migrate()
+    
+    def sema_guncel_mi(self):
+        """Veritabanı SON_SEMA_SURUMU'nde mi (tek sorgu, DDL ve kilit yok)"""
+        try:
+            return self.schema_version() >= SON_SEMA_SURUMU
+        except psycopg2.errors.UndefinedTable:
+            # İlk kurulum: schema_version henüz yok
+            return False
+    
+    def schema_version(self):
+        """Veritabanına uygulanmış en yüksek şema sürümü"""
+        row = self.fetch_one("SELECT COALESCE(MAX(version), 0) AS version FROM schema_version")
+        return row['version']
+    
+    def migrate(self):
+        """MIGRATIONS listesinde henüz uygulanmamış adımları sırayla uygula"""
+        uygulananlar = []
+        with self.islem() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    aciklama VARCHAR(255) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            # Aynı anda açılan iş istasyonları göçleri iki kez uygulamasın
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [MIGRATION_KILIDI])
+            cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+            mevcut = cursor.fetchone()[0]
+            
+            for version, aciklama, ifadeler in MIGRATIONS:
+                if version <= mevcut:
+                    continue
+                for ifade in ifadeler:
+                    cursor.execute(ifade)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, aciklama) VALUES (%s, %s)",
+                    [version, aciklama]
+                )
+                uygulananlar.append(version)
+            cursor.close()
+        
+        for version in uygulananlar:
+            print(f"Şema göçü uygulandı: {version}")
+        return uygulananlar
+    
+    def _tablolari_olustur(self, conn):
+        cursor = conn.cursor()
+        
+        # Stok tablosu
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stok (
+                id SERIAL PRIMARY KEY,
+                malzeme VARCHAR(255) UNIQUE NOT NULL,
+                miktar_kg DECIMAL(10,2) DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Alışlar tablosu
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS alislar (
+                id SERIAL PRIMARY KEY,
+                malzeme VARCHAR(255) NOT NULL,
+                miktar_kg DECIMAL(10,2) NOT NULL,
+                birim_fiyat DECIMAL(10,2) NOT NULL,
+                toplam_tutar DECIMAL(10,2) NOT NULL,
+                tarih DATE NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Ürünler tablosu (reçeteler)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS urunler (
+                id SERIAL PRIMARY KEY,
+                urun VARCHAR(255) NOT NULL,
+                malzeme VARCHAR(255) NOT NULL,
+                yuzde DECIMAL(5,2) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Üretimler tablosu
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS uretimler (
+                id SERIAL PRIMARY KEY,
+                urun VARCHAR(255) NOT NULL,
+                gramaj_kg DECIMAL(10,2) NOT NULL,
+                tarih DATE NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Satışlar tablosu
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS satislar (
+                id SERIAL PRIMARY KEY,
+                urun VARCHAR(255) NOT NULL,
+                musteri VARCHAR(255) NOT NULL,
+                miktar_kg DECIMAL(10,2) NOT NULL,
+                satis_fiyat DECIMAL(10,2) NOT NULL,
+                toplam_satis DECIMAL(10,2) NOT NULL,
+                net_kar DECIMAL(10,2),
+                tarih DATE NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # İade/Hurda tablosu
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS iadeler (
+                id SERIAL PRIMARY KEY,
+                tarih DATE NOT NULL,
+                tip VARCHAR(50) NOT NULL,
+                urun VARCHAR(255) NOT NULL,
+                miktar DECIMAL(10,2) NOT NULL,
+                sebep TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Taş gelir-gider tablosu
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tas_gelir_gider (
+                id SERIAL PRIMARY KEY,
+                tarih DATE NOT NULL,
+                tip VARCHAR(50) NOT NULL,
+                aciklama VARCHAR(255) NOT NULL,
+                birim VARCHAR(50),
+                birim_fiyat DECIMAL(10,2) NOT NULL,
+                miktar DECIMAL(10,2) NOT NULL,
+                toplam_tutar DECIMAL(10,2) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Beton gelir-gider tablosu
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS beton_gelir_gider (
+                id SERIAL PRIMARY KEY,
+                tarih DATE NOT NULL,
+                tip VARCHAR(50) NOT NULL,
+                aciklama VARCHAR(255) NOT NULL,
+                birim VARCHAR(50),
+                birim_fiyat DECIMAL(10,2) NOT NULL,
+                miktar DECIMAL(10,2) NOT NULL,
+                toplam_tutar DECIMAL(10,2) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        cursor.close()
+    
+    def execute_query(self, query, params=None):
+        """SQL sorgusu çalıştır, etkilenen satır sayısını döndür"""
+        def islem(conn):
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.rowcount
+        return self._calistir(islem)
+    
+    def fetch_all(self, query, params=None):
+        """Tüm sonuçları getir"""
+        def islem(conn):
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+        return self._calistir(islem, salt_okunur=True)
+    
+    def fetch_one(self, query, params=None):
+        """Tek sonuç getir"""
+        def islem(conn):
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchone()
+        return self._calistir(islem, salt_okunur=True)
+    
+    def fetch_iter(self, query, params=None, itersize=2000):
+        """Sonuçları sunucu taraflı (isimli) imleçle itersize satırlık parçalar halinde getir"""
+        with self.islem() as conn:
+            for parca in self.imlec_parcalari(conn, query, params, itersize):
+                yield from parca
+    
+    def imlec_parcalari(self, conn, query, params=None, parca_boyutu=2000):
+        """Verilen işlem bağlantısında isimli imleçle sonuçları satır listesi parçaları halinde getir"""
+        with conn.cursor(name=f"imlec_{uuid.uuid4().hex}", cursor_factory=RealDictCursor) as cursor:
+            cursor.itersize = parca_boyutu
+            cursor.execute(query, params)
+            while True:
+                parca = cursor.fetchmany(parca_boyutu)
+                if not parca:
+                    return
+                yield parca
+    
+    def paralel_calistir(self, isler, ilerleme=None):
+        """İşleri ayrı havuz bağlantılarında paralel çalıştır, hepsi aynı anlık görüntüyü görür.
+        
+        isler: [(ad, fonksiyon(conn))]. Lider bağlantı REPEATABLE READ salt okunur bir işlem
+        açıp pg_export_snapshot ile anlık görüntüyü dışa verir; her işçi bu görüntüyü
+        SET TRANSACTION SNAPSHOT ile alır, böylece tablolar birbiriyle tutarlı okunur.
+        ilerleme(tamamlanan, toplam, ad) işçi iş parçacıklarından çağrılır. {ad: sonuç} döner.
+        """
+        sonuclar = {}
+        toplam = len(isler)
+        
+        with self.islem() as lider:
+            with lider.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+                cursor.execute("SELECT pg_export_snapshot()")
+                snapshot = cursor.fetchone()[0]
+            
+            # Lider bir bağlantıyı tutar; kalanlar işçilere
+            isci_sayisi = min(toplam, self.config.pool_max - 1)
+            # İşçilerdeki sorgu süreleri çağıran işleyicinin ölçümüne eklenir
+            birikim = self.olcum.birikim()
+            if isci_sayisi < 1:
+                for ad, fonksiyon in isler:
+                    sonuclar[ad] = fonksiyon(lider)
+                    if ilerleme:
+                        ilerleme(len(sonuclar), toplam, ad)
+                return sonuclar
+            
+            def calistir(fonksiyon):
+                with self.olcum.devral(birikim), self.islem() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+                        cursor.execute("SET TRANSACTION SNAPSHOT %s", [snapshot])
+                    return fonksiyon(conn)
+            
+            with ThreadPoolExecutor(max_workers=isci_sayisi, thread_name_prefix="disa_aktarim") as havuz:
+                gorevler = {havuz.submit(calistir, fonksiyon): ad for ad, fonksiyon in isler}
+                try:
+                    for gorev in as_completed(gorevler):
+                        ad = gorevler[gorev]
+                        sonuclar[ad] = gorev.result()
+                        if ilerleme:
+                            ilerleme(len(sonuclar), toplam, ad)
+                except BaseException:
+                    for gorev in gorevler:
+                        gorev.cancel()
+                    raise
+        
+        return sonuclar
+    
+    def insert(self, table, data):
+        """Veri ekle"""
+        columns = ', '.join(data.keys())
+        placeholders = ', '.join(['%s'] * len(data))
+        query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+        self.execute_query(query, list(data.values()))
+    
+    def insert_many(self, table, rows, returning=None, conn=None, sayfa_boyutu=1000):
+        """Çok satırı execute_values ile tek işlemde ekle.
+        
+        rows aynı anahtarlara sahip sözlüklerin listesidir. returning ("id" gibi) verilirse
+        eklenen satırların bu sütunları liste olarak döner. conn verilirse çağıranın
+        işleminde çalışır, yoksa kendi işlemini açar.
+        """
+        return self._coklu_yaz(table, rows, "", returning, conn, sayfa_boyutu)
+    
+    def upsert_many(self, table, rows, conflict_columns, update_columns=None,
+                    returning=None, conn=None, sayfa_boyutu=1000):
+        """Çok satırı INSERT ... ON CONFLICT ile tek işlemde ekle ya da güncelle.
+        
+        update_columns verilmezse çakışmayan tüm sütunlar EXCLUDED değerleriyle güncellenir;
+        boş liste verilirse çakışan satırlar atlanır (DO NOTHING).
+        """
+        if update_columns is None:
+            update_columns = [k for k in rows[0] if k not in conflict_columns] if rows else []
+        if update_columns:
+            set_clause = ', '.join(f"{k} = EXCLUDED.{k}" for k in update_columns)
+            conflict = f" ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET {set_clause}"
+        else:
+            conflict = f" ON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING"
+        return self._coklu_yaz(table, rows, conflict, returning, conn, sayfa_boyutu)
+    
+    def _coklu_yaz(self, table, rows, conflict, returning, conn, sayfa_boyutu):
+        if not rows:
+            return []
+        columns = list(rows[0].keys())
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s{conflict}"
+        if returning:
+            query += f" RETURNING {returning}"
+        values = [[row[k] for k in columns] for row in rows]
+        
+        def yaz(conn):
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.ifade_etiketi = query
+                sonuc = execute_values(cursor, query, values, page_size=sayfa_boyutu,
+                                       fetch=bool(returning))
+            return sonuc if returning else []
+        
+        if conn is not None:
+            return yaz(conn)
+        with self.islem() as conn:
+            return yaz(conn)
+    
+    def update(self, table, data, where_clause, where_params):
+        """Veri güncelle"""
+        set_clause = ', '.join([f"{k} = %s" for k in data.keys()])
+        query = f"UPDATE {table} SET {set_clause} WHERE {where_clause}"
+        self.execute_query(query, list(data.values()) + where_params)
+    
+    def stoklu_kaydet(self, table, data, malzeme, miktar):
+        """Hareket satırını ekle ve miktarı stoğa tek ifadede ekle; yeni stok miktarını döndür.
+        
+        Alış ve iade gibi stoğu artıran kayıtlar için: ekleme, stok_hareketleri defter satırı
+        ve stok güncellemesi aynı ifadede (tek gidiş-dönüş) ve aynı işlemde çalışır. ON CONFLICT satırı kilitleyerek
+        topladığı için eşzamanlı girişlerde güncelleme kaybolmaz; malzeme stokta yoksa açılır.
+        """
+        columns = ', '.join(data.keys())
+        placeholders = ', '.join(['%s'] * len(data))
+        query = f"""
+            WITH kayit AS (
+                INSERT INTO {table} ({columns}) VALUES ({placeholders})
+                RETURNING id
+            ),
+            hareket AS (
+                INSERT INTO stok_hareketleri (malzeme, miktar_kg, kaynak, kaynak_id)
+                SELECT %s, %s, %s, id FROM kayit
+                RETURNING malzeme, miktar_kg
+            )
+            INSERT INTO stok (malzeme, miktar_kg)
+            SELECT malzeme, miktar_kg FROM hareket
+            ON CONFLICT (malzeme) DO UPDATE
+            SET miktar_kg = stok.miktar_kg + EXCLUDED.miktar_kg,
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING miktar_kg
+        """
+        row = self.fetch_one(query, list(data.values()) + [malzeme, miktar, table])
+        return row['miktar_kg']
+    
+    def uretim_kaydet(self, urun, gramaj, tarih):
+        """Üretimi tek sorguda kaydet: reçetedeki tüm malzemeleri stoktan düş ve üretimi ekle.
+        
+        Stok düşümleri stok_hareketleri defterine de yazılır.
+        Tek bir SQL ifadesi olduğu için ya hepsi uygulanır ya hiçbiri; stok satırları
+        malzeme sırasıyla kilitlendiğinden eşzamanlı üretimler stoğu eksiye düşüremez.
+        Reçete önbellekten okunur. Düşülen malzemeleri [{'malzeme', 'gereken'}] olarak döndürür.
+        """
+        recete = self.receteler.getir(urun)
+        if not recete['malzemeler']:
+            raise ValueError("Bu ürün için reçete tanımı yok.")
+        
+        query = """
+            WITH recete AS (
+                SELECT r.malzeme, r.oran * %(gramaj)s AS gereken
+                FROM unnest(%(malzemeler)s::varchar[], %(oranlar)s::numeric[]) AS r(malzeme, oran)
+            ),
+            kilit AS MATERIALIZED (
+                SELECT s.malzeme, s.miktar_kg
+                FROM stok s
+                JOIN recete r ON r.malzeme = s.malzeme
+                ORDER BY s.malzeme
+                FOR UPDATE OF s
+            ),
+            kontrol AS (
+                SELECT r.malzeme, r.gereken, k.miktar_kg AS mevcut,
+                       COALESCE(k.miktar_kg >= r.gereken, FALSE) AS yeterli
+                FROM recete r
+                LEFT JOIN kilit k ON k.malzeme = r.malzeme
+            ),
+            dusulen AS (
+                UPDATE stok s
+                SET miktar_kg = s.miktar_kg - r.gereken,
+                    updated_at = CURRENT_TIMESTAMP
+                FROM recete r
+                WHERE s.malzeme = r.malzeme
+                  AND s.miktar_kg >= r.gereken
+                  AND NOT EXISTS (SELECT 1 FROM kontrol WHERE NOT yeterli)
+                RETURNING s.malzeme, s.miktar_kg
+            ),
+            uretim AS (
+                INSERT INTO uretimler (urun, gramaj_kg, tarih)
+                SELECT %(urun)s, %(gramaj)s, %(tarih)s
+                WHERE EXISTS (SELECT 1 FROM recete)
+                  AND NOT EXISTS (SELECT 1 FROM kontrol WHERE NOT yeterli)
+                RETURNING id
+            ),
+            hareket AS (
+                -- Deftere stoğa uygulanan (yuvarlanmış) fark yazılır
+                INSERT INTO stok_hareketleri (malzeme, miktar_kg, kaynak, kaynak_id)
+                SELECT d.malzeme, d.miktar_kg - k.miktar_kg, 'uretimler', (SELECT id FROM uretim)
+                FROM dusulen d
+                JOIN kilit k ON k.malzeme = d.malzeme
+            )
+            SELECT k.malzeme, k.gereken, k.mevcut, k.yeterli,
+                   (SELECT id FROM uretim) AS uretim_id
+            FROM kontrol k
+            ORDER BY k.malzeme
+        """
+        params = {'urun': urun, 'gramaj': gramaj, 'tarih': tarih}
+        params.update(recete)
+        sonuc = self.fetch_all(query, params)
+        
+        for row in sonuc:
+            if row['mevcut'] is None:
+                raise ValueError(f"{row['malzeme']} stokta yok.")
+            if not row['yeterli']:
+                raise ValueError(f"{row['malzeme']} için yeterli stok yok. "
+                                 f"Mevcut: {row['mevcut']}, Gereken: {row['gereken']}")
+        
+        return [{'malzeme': row['malzeme'], 'gereken': row['gereken']} for row in sonuc]
+    
+    def stok_durumu(self, zaman=None):
+        """Malzeme bazında stok; zaman verilirse defterden o andaki bakiyeler hesaplanır"""
+        if zaman is None:
+            return self.fetch_all("SELECT malzeme, miktar_kg FROM stok ORDER BY malzeme")
+        return self.fetch_all(STOK_DURUMU_SORGUSU, {'zaman': zaman})
+    
+    def stok_anligi_al(self, esik=0):
+        """Son anlıktan bu yana en az esik hareket varsa yeni bakiye anlığı al.
+        
+        {'id', 'son_hareket_id', 'malzeme_sayisi'} ya da anlık alınmadıysa None döner.
+        """
+        with self.islem() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                # Eklemeleri kısa süre bekletir; süren eklemelerin bitmesini bekler
+                cursor.execute("LOCK TABLE stok_hareketleri IN SHARE MODE")
+                cursor.execute(STOK_ANLIGI_SORGUSU, {'esik': esik})
+                return cursor.fetchone()
+    
+    def stok_defter_farklari(self):
+        """stok tablosu ile defter toplamı arasındaki farklar (tutarlılık denetimi)"""
+        return self.fetch_all("""
+            SELECT COALESCE(s.malzeme, d.malzeme) AS malzeme,
+                   COALESCE(s.miktar_kg, 0) AS stok_kg,
+                   COALESCE(d.miktar_kg, 0) AS defter_kg
+            FROM stok s
+            FULL JOIN (SELECT malzeme, SUM(miktar_kg) AS miktar_kg
+                       FROM stok_hareketleri GROUP BY malzeme) d
+                   ON d.malzeme = s.malzeme
+            WHERE COALESCE(s.miktar_kg, 0) <> COALESCE(d.miktar_kg, 0)
+            ORDER BY 1
+        """)
+    
+    def recete_maliyeti(self, urun, miktar, yontem=None):
+        """Ürünün reçetesindeki her malzemeyi güncel birim maliyetiyle tek sorguda maliyetlendir.
+        
+        Her reçete malzemesi için {'malzeme', 'gereken_miktar', 'birim_fiyat', 'maliyet'} döner;
+        maliyeti hiç oluşmamış malzemelerde birim_fiyat ve maliyet None olur. Reçete önbellekten,
+        birim maliyet malzeme_maliyetleri tablosundan okunur; FIFO'da gereken miktar sıradaki
+        lotlara yayılır. yontem: 'ortalama' ya da 'fifo' (varsayılan konfigürasyondaki yöntem).
+        """
+        recete = self.receteler.getir(urun)
+        if not recete['malzemeler']:
+            return []
+        params = {'miktar': miktar}
+        params.update(recete)
+        if (yontem or self.config.maliyet_yontemi) == 'fifo':
+            return self.fetch_all(FIFO_RECETE_MALIYETI_SORGUSU, params)
+        return self.fetch_all(RECETE_MALIYETI_SORGUSU, params)
+    
+    def malzeme_maliyetleri(self):
+        """Malzeme bazında eldeki miktar, toplam değer ve birim maliyetler"""
+        return self.fetch_all("""
+            SELECT malzeme, miktar_kg, toplam_deger, ortalama_maliyet, fifo_maliyet
+            FROM malzeme_maliyetleri
+            ORDER BY malzeme
+        """)
+    
+    def net_kar_yeniden_hesapla(self, yontem):
+        """Geçmiş tüm satışların net kârını verilen yöntemin o günkü maliyetleriyle yeniden hesapla.
+        
+        Tek UPDATE ifadesidir; değişen satış sayısını döndürür.
+        """
+        if yontem not in MALIYET_YONTEMLERI:
+            raise ValueError(f"Geçersiz maliyet yöntemi: {yontem}")
+        with self.islem() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(NET_KAR_YENIDEN_HESAPLA_SORGUSU, {'yontem': yontem, 'kdv': KDV_ORANI})
+                degisen = cursor.rowcount
+        self._ozet_onbellek = None
+        return degisen
+    
+    def sorgu_indeksleri(self, query, params=None):
+        """Sorgunun planında kullanılan indeksleri ve sıralı taranan tabloları getir (EXPLAIN)"""
+        row = self.fetch_one("EXPLAIN (FORMAT JSON) " + query, params)
+        plan = row['QUERY PLAN'][0]['Plan']
+        
+        indeksler = []
+        sirali_taramalar = []
+        dugumler = [plan]
+        while dugumler:
+            dugum = dugumler.pop()
+            if 'Index Name' in dugum and dugum['Index Name'] not in indeksler:
+                indeksler.append(dugum['Index Name'])
+            if dugum.get('Node Type') == 'Seq Scan' and dugum['Relation Name'] not in sirali_taramalar:
+                sirali_taramalar.append(dugum['Relation Name'])
+            dugumler.extend(dugum.get('Plans', []))
+        
+        return {'indeksler': indeksler, 'sirali_taramalar': sirali_taramalar}
+    
+    def ozet_gostergeleri(self, conn=None):
+        """Genel rapor özet toplamlarını getir; filigran değişmediyse önbellekten döner.
+        
+        conn verilirse o bağlantının işleminde (ör. paylaşılan anlık görüntü) önbellek
+        kullanılmadan hesaplanır ve önbellek değiştirilmez.
+        """
+        if conn is not None:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(OZET_GOSTERGE_SORGUSU)
+                row = cursor.fetchone()
+            return {k: v for k, v in row.items() if k not in OZET_FILIGRAN_ALANLARI}
+        
+        onbellek = self._ozet_onbellek
+        if onbellek is not None:
+            filigran = self.fetch_one(OZET_FILIGRAN_SORGUSU)
+            if tuple(filigran[alan] for alan in OZET_FILIGRAN_ALANLARI) == onbellek[0]:
+                return onbellek[1]
+        
+        row = self.fetch_one(OZET_GOSTERGE_SORGUSU)
+        filigran = tuple(row[alan] for alan in OZET_FILIGRAN_ALANLARI)
+        gostergeler = {k: v for k, v in row.items() if k not in OZET_FILIGRAN_ALANLARI}
+        self._ozet_onbellek = (filigran, gostergeler)
+        return gostergeler
+    
+    def onbellekleri_temizle(self):
+        """Reçete, katalog ve özet önbelleklerini boşalt (toplu veri değişikliklerinden sonra)"""
+        self.receteler.gecersiz_kil()
+        self.katalog.yenile()
+        self._ozet_onbellek = None
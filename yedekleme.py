@@ -0,0 +1,394 @@
+# yedekleme.py
+# COPY tabanlı veritabanı yedekleme ve geri yükleme.
+#
+# Her yedek veritabani_yedekleri/<zaman_damgası>/ klasörüdür: tablo başına sıkıştırılmış
+# bir CSV (<tablo>.csv.gz) ve satır sayıları, sütunlar ile SHA-256 özetlerini tutan
+# manifest.json. Veri COPY ... TO STDOUT ile sunucudan doğrudan gzip dosyasına akar;
+# Python tarafında satır nesnesi oluşmaz. Geri yükleme COPY ... FROM STDIN ile tek
+# işlemde yapılır; özet ya da satır sayısı tutmazsa işlem geri alınır.
+#
+# Artımlı yedekler (<zaman_damgası>_artimli/) yalnızca zincirdeki önceki yedekten sonra
+# eklenen satırları içerir. Tablolar yalnızca eklenerek büyüdüğü için anahtar id'dir;
+# yerinde güncellenen stok ve satislar (net kâr yeniden hesaplaması) için updated_at
+# kullanılır. Geri yükleme tam yedeği ve ardından gelen artımlı yedekleri sırayla uygular.
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+
+from psycopg2 import sql
+
+from veritabani import GUNLUK_OZET_DOLDUR
+
+YEDEK_KLASORU = "veritabani_yedekleri"
+MANIFEST_ADI = "manifest.json"
+MANIFEST_SURUMU = 2
+SIKISTIRMA_DUZEYI = 6
+OKUMA_BOYUTU = 1024 * 1024
+
+YEDEK_TABLOLARI = ['stok', 'alislar', 'urunler', 'uretimler', 'satislar',
+                   'iadeler', 'tas_gelir_gider', 'beton_gelir_gider', 'stok_hareketleri']
+
+# Yedeklenmeyen, geri yüklemede boşaltılan türetilmiş tablolar (defter anlıkları yeniden alınır,
+# maliyetler defterden yeniden hesaplanır)
+TURETILMIS_TABLOLAR = ['stok_anlik_bakiyeleri', 'stok_anliklari',
+                       'maliyet_gecmisi', 'maliyet_lotlari', 'malzeme_maliyetleri']
+
+# Defterden önceki yedeklerde stok_hareketleri yoktur; geri yüklenen stok açılış hareketi olur
+ACILIS_HAREKETLERI_SORGUSU = """
+    INSERT INTO stok_hareketleri (malzeme, miktar_kg, kaynak)
+    SELECT malzeme, miktar_kg, 'acilis' FROM stok WHERE miktar_kg <> 0
+"""
+
+# Yerinde güncellenen tablolar: artımlı yedekte updated_at ile izlenir, geri yüklemede id'ye göre birleştirilir
+GUNCELLENEN_TABLOLAR = ['stok', 'satislar']
+
+# updated_at işlem başlangıç zamanıdır; anlık görüntüden sonra işlenen uzun bir işlem daha eski
+# bir zaman damgası yazabilir. Artımlı yedek bu kadar geriden başlar (birleştirme tekrarı zararsızdır)
+GUNCELLEME_GUVENLIK_PAYI = timedelta(minutes=10)
+
+# Geri yüklemede satır satır çalışmak yerine sonunda toplu yeniden hesaplanan tetikleyiciler
+OZET_TETIKLEYICILI_TABLOLAR = ['satislar', 'tas_gelir_gider', 'beton_gelir_gider']
+
+
+class ZincirKirik(ValueError):
+    """Önceki yedekten bu yana satır silinmiş ya da geç işlenmiş; artımlı yedek alınamaz"""
+
+
+# === YARDIMCI SINIFLAR ===
+class _OzetliYazici:
+    """COPY çıktısını gzip dosyasına yazarken sıkıştırılmamış veri üzerinden SHA-256 hesaplar"""
+
+    def __init__(self, dosya):
+        self.dosya = dosya
+        self.ozet = hashlib.sha256()
+        self.bayt = 0
+
+    def write(self, veri):
+        self.ozet.update(veri)
+        self.bayt += len(veri)
+        return self.dosya.write(veri)
+
+
+class _OzetliOkuyucu:
+    """gzip dosyasını COPY FROM STDIN'e okurken SHA-256 hesaplar"""
+
+    def __init__(self, dosya):
+        self.dosya = dosya
+        self.ozet = hashlib.sha256()
+
+    def read(self, boyut=-1):
+        veri = self.dosya.read(boyut if boyut and boyut > 0 else OKUMA_BOYUTU)
+        self.ozet.update(veri)
+        return veri
+
+
+# === YEDEKLEME ===
+def tablo_sutunlari(conn, tablo):
+    """Tablonun sütun adlarını tablo sırasıyla getir"""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = %s
+            ORDER BY ordinal_position
+        """, [tablo])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _filigran_al(conn, tablo, onceki=None):
+    """Anlık görüntüdeki en büyük id/created_at (yerinde güncellenenler için updated_at) ve satır sayısı.
+
+    onceki verilirse o yedekteki id'ye kadarki satır sayısının değişmediği doğrulanır;
+    değiştiyse arada silme ya da geç işlenen bir ekleme vardır ve ZincirKirik yükseltilir.
+    """
+    alanlar = [
+        sql.SQL("COUNT(*) AS satir_toplami"),
+        sql.SQL("COALESCE(MAX(id), 0) AS id"),
+        sql.SQL("MAX(created_at) AS created_at"),
+        sql.SQL("COUNT(*) FILTER (WHERE id <= %(onceki_id)s) AS eski_satir"),
+    ]
+    if tablo in GUNCELLENEN_TABLOLAR:
+        alanlar.append(sql.SQL("MAX(updated_at) AS updated_at"))
+
+    with conn.cursor() as cursor:
+        cursor.execute(sql.SQL("SELECT {} FROM {}").format(
+            sql.SQL(', ').join(alanlar), sql.Identifier(tablo)),
+            {'onceki_id': onceki['id'] if onceki else 0})
+        degerler = dict(zip([k[0] for k in cursor.description], cursor.fetchone()))
+
+    eski_satir = degerler.pop('eski_satir')
+    if onceki and eski_satir != onceki['satir_toplami']:
+        raise ZincirKirik(f"{tablo}: önceki yedekten bu yana satır silinmiş ya da geç eklenmiş.")
+
+    for alan in ('created_at', 'updated_at'):
+        if degerler.get(alan) is not None:
+            degerler[alan] = degerler[alan].isoformat()
+    return degerler
+
+
+def _tablo_disa_aktarici(yedek_dizini, tablo, onceki=None):
+    """Tabloyu COPY ile yedek_dizini/<tablo>.csv.gz dosyasına yazan iş.
+
+    onceki (önceki yedeğin filigranı) verilirse yalnızca o yedekten sonraki satırlar yazılır.
+    """
+    def disa_aktar(conn):
+        sutunlar = tablo_sutunlari(conn, tablo)
+        filigran = _filigran_al(conn, tablo, onceki)
+
+        if onceki is None:
+            kip, kosul, parametreler = 'tam', sql.SQL("TRUE"), []
+        elif tablo in GUNCELLENEN_TABLOLAR:
+            kip = 'guncelleme'
+            kosul = sql.SQL("id > %s OR updated_at > %s")
+            # Tablo güncellenenlere sonradan eklendiyse önceki filigranda updated_at yoktur: hepsi alınır
+            esik = onceki.get('updated_at') and datetime.fromisoformat(onceki['updated_at']) - GUNCELLEME_GUVENLIK_PAYI
+            parametreler = [onceki['id'], esik or datetime.min]
+        else:
+            kip, kosul, parametreler = 'ekleme', sql.SQL("id > %s"), [onceki['id']]
+
+        kaynak = sql.SQL("SELECT {} FROM {} WHERE {} ORDER BY id").format(
+            sql.SQL(', ').join(map(sql.Identifier, sutunlar)), sql.Identifier(tablo), kosul)
+        komut = sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv, HEADER true)").format(kaynak)
+
+        dosya_adi = f"{tablo}.csv.gz"
+        with gzip.open(os.path.join(yedek_dizini, dosya_adi), 'wb',
+                       compresslevel=SIKISTIRMA_DUZEYI) as dosya:
+            yazici = _OzetliYazici(dosya)
+            with conn.cursor() as cursor:
+                cursor.copy_expert(cursor.mogrify(komut, parametreler).decode(), yazici)
+                satir_sayisi = cursor.rowcount
+
+        return {
+            'dosya': dosya_adi,
+            'kip': kip,
+            'sutunlar': sutunlar,
+            'satir_sayisi': satir_sayisi,
+            'bayt': yazici.bayt,
+            'sha256': yazici.ozet.hexdigest(),
+            'filigran': filigran,
+        }
+    return disa_aktar
+
+
+def _yedek_yaz(db, klasor, tur, ilerleme, onceki_dizin=None, onceki_manifest=None):
+    """Yedeği geçici klasöre yazıp manifestle birlikte yerine taşı, yedek klasörünün yolunu döndür.
+
+    Dosyalar önce geçici bir klasöre yazılır ve manifest tamamlandıktan sonra klasör
+    adıyla yerine taşınır; yarım kalan yedek hiçbir zaman geçerli görünmez.
+    """
+    zaman = datetime.now()
+    ad = zaman.strftime("%Y%m%d_%H%M%S") + ("_artimli" if tur == 'artimli' else "")
+    yedek_dizini = os.path.join(klasor, ad)
+    gecici_dizin = yedek_dizini + ".tmp"
+    os.makedirs(gecici_dizin)
+
+    try:
+        isler = []
+        for tablo in YEDEK_TABLOLARI:
+            onceki = onceki_manifest['tablolar'][tablo]['filigran'] if onceki_manifest else None
+            isler.append((tablo, _tablo_disa_aktarici(gecici_dizin, tablo, onceki)))
+        tablolar = db.paralel_calistir(isler, ilerleme)
+
+        manifest = {
+            'surum': MANIFEST_SURUMU,
+            'tur': tur,
+            'olusturma': zaman.isoformat(timespec='seconds'),
+            'sema_surumu': db.schema_version(),
+            'tablolar': {tablo: tablolar[tablo] for tablo in YEDEK_TABLOLARI},
+        }
+        if onceki_manifest:
+            manifest['onceki'] = os.path.basename(onceki_dizin)
+            manifest['temel'] = onceki_manifest.get('temel', manifest['onceki'])
+        _manifest_yaz(gecici_dizin, manifest)
+        os.replace(gecici_dizin, yedek_dizini)
+    except BaseException:
+        shutil.rmtree(gecici_dizin, ignore_errors=True)
+        raise
+
+    return yedek_dizini
+
+
+def yedek_al(db, klasor=YEDEK_KLASORU, ilerleme=None):
+    """Tüm tabloları tutarlı bir anlık görüntüden paralel yedekle, yedek klasörünün yolunu döndür.
+
+    ilerleme(tamamlanan, toplam, tablo) işçi iş parçacıklarından çağrılır.
+    """
+    os.makedirs(klasor, exist_ok=True)
+    return _yedek_yaz(db, klasor, 'tam', ilerleme)
+
+
+def artimli_yedek_al(db, klasor=YEDEK_KLASORU, ilerleme=None):
+    """Son yedekten bu yana eklenen/değişen satırları yedekle; (yedek klasörü, tur) döndür.
+
+    Zincire eklenecek uygun bir yedek yoksa (hiç yedek yok, eski manifest sürümü, şema
+    değişmiş) ya da arada satır silinmişse tam yedek alınır ve tur 'tam' olur.
+    """
+    os.makedirs(klasor, exist_ok=True)
+    yedekler = yedekleri_listele(klasor)
+    if yedekler:
+        onceki_dizin = yedekler[-1]
+        onceki_manifest = manifest_oku(onceki_dizin)
+        if (onceki_manifest.get('surum', 1) >= 2
+                and onceki_manifest['sema_surumu'] == db.schema_version()):
+            try:
+                return _yedek_yaz(db, klasor, 'artimli', ilerleme,
+                                  onceki_dizin, onceki_manifest), 'artimli'
+            except ZincirKirik:
+                pass
+    return _yedek_yaz(db, klasor, 'tam', ilerleme), 'tam'
+
+
+def _manifest_yaz(dizin, manifest):
+    yol = os.path.join(dizin, MANIFEST_ADI)
+    with open(yol, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def manifest_oku(yedek_dizini):
+    """Yedek klasörünün manifestini oku; manifest yoksa ValueError"""
+    yol = os.path.join(yedek_dizini, MANIFEST_ADI)
+    if not os.path.exists(yol):
+        raise ValueError(f"{yedek_dizini} geçerli bir yedek klasörü değil ({MANIFEST_ADI} yok).")
+    with open(yol, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def yedekleri_listele(klasor=YEDEK_KLASORU):
+    """Tamamlanmış (tam ve artımlı) yedek klasörlerini eskiden yeniye listele"""
+    if not os.path.isdir(klasor):
+        return []
+    return sorted(
+        os.path.join(klasor, ad) for ad in os.listdir(klasor)
+        if not ad.endswith(".tmp") and os.path.exists(os.path.join(klasor, ad, MANIFEST_ADI))
+    )
+
+
+def yedek_zinciri(yedek_dizini):
+    """Yedeği geri yüklemek için uygulanacak klasörler: tam yedek ve ardından gelen artımlılar"""
+    zincir = [yedek_dizini]
+    manifest = manifest_oku(yedek_dizini)
+    while manifest['tur'] != 'tam':
+        onceki_dizin = os.path.join(os.path.dirname(zincir[0]), manifest['onceki'])
+        if not os.path.isdir(onceki_dizin):
+            raise ValueError(f"Yedek zinciri eksik: {manifest['onceki']} bulunamadı.")
+        zincir.insert(0, onceki_dizin)
+        manifest = manifest_oku(onceki_dizin)
+    return zincir
+
+
+# === GERİ YÜKLEME ===
+def _tablo_yukle(conn, yedek_dizini, hedef, tablo, bilgi):
+    """Tek bir yedek dosyasını COPY FROM STDIN ile hedef tabloya ekle, özeti ve satır sayısını doğrula"""
+    komut = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER true)").format(
+        sql.Identifier(hedef), sql.SQL(', ').join(map(sql.Identifier, bilgi['sutunlar'])))
+
+    with gzip.open(os.path.join(yedek_dizini, bilgi['dosya']), 'rb') as dosya:
+        okuyucu = _OzetliOkuyucu(dosya)
+        with conn.cursor() as cursor:
+            cursor.copy_expert(komut.as_string(conn), okuyucu, size=OKUMA_BOYUTU)
+            satir_sayisi = cursor.rowcount
+
+    if okuyucu.ozet.hexdigest() != bilgi['sha256']:
+        raise ValueError(f"{tablo} yedeği bozuk: SHA-256 özeti manifest ile uyuşmuyor.")
+    if satir_sayisi != bilgi['satir_sayisi']:
+        raise ValueError(f"{tablo} yedeği eksik: {satir_sayisi} satır yüklendi, "
+                         f"manifestte {bilgi['satir_sayisi']}.")
+    return satir_sayisi
+
+
+def _guncellemeleri_birlestir(conn, yedek_dizini, tablo, bilgi):
+    """Yerinde güncellenen tablonun artımlı dosyasını geçici tabloya yükleyip id'ye göre birleştir"""
+    gecici = f"{tablo}_artimli"
+    sutunlar = sql.SQL(', ').join(map(sql.Identifier, bilgi['sutunlar']))
+    guncellemeler = sql.SQL(', ').join(
+        sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(sutun))
+        for sutun in bilgi['sutunlar'] if sutun != 'id')
+
+    with conn.cursor() as cursor:
+        cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(gecici)))
+        cursor.execute(sql.SQL("CREATE TEMP TABLE {} (LIKE {}) ON COMMIT DROP").format(
+            sql.Identifier(gecici), sql.Identifier(tablo)))
+    satir_sayisi = _tablo_yukle(conn, yedek_dizini, gecici, tablo, bilgi)
+    with conn.cursor() as cursor:
+        cursor.execute(sql.SQL("""
+            INSERT INTO {hedef} ({sutunlar}) SELECT {sutunlar} FROM {gecici}
+            ON CONFLICT (id) DO UPDATE SET {guncellemeler}
+        """).format(hedef=sql.Identifier(tablo), sutunlar=sutunlar,
+                    gecici=sql.Identifier(gecici), guncellemeler=guncellemeler))
+    return satir_sayisi
+
+
+def _sayaclari_ayarla(conn, tablolar):
+    """SERIAL sayaçlarını yüklenen en büyük id'nin ardına taşı"""
+    with conn.cursor() as cursor:
+        for tablo in tablolar:
+            cursor.execute(sql.SQL("""
+                SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL)
+                FROM {}
+            """).format(sql.Identifier(tablo)), [tablo])
+
+
+def geri_yukle(db, yedek_dizini, ilerleme=None):
+    """Yedeği veritabanına geri yükle; mevcut veriler yedektekilerle değiştirilir.
+
+    Artımlı bir yedek seçilirse önce bağlı olduğu tam yedek, ardından zincirdeki artımlı
+    yedekler sırayla uygulanır. Tümü tek işlemde yapılır; herhangi bir dosya doğrulanamazsa
+    veritabanı hiç değişmemiş olur. {tablo: satır sayısı} döner.
+    """
+    zincir = yedek_zinciri(yedek_dizini)
+    manifestler = [manifest_oku(dizin) for dizin in zincir]
+    if manifestler[-1]['sema_surumu'] > db.schema_version():
+        raise ValueError("Yedek daha yeni bir şema sürümünden alınmış; önce uygulamayı güncelleyin.")
+
+    satir_sayilari = dict.fromkeys(YEDEK_TABLOLARI, 0)
+    toplam_adim = len(zincir) * len(YEDEK_TABLOLARI)
+    tamamlanan = 0
+
+    with db.islem() as conn:
+        with conn.cursor() as cursor:
+            # Özet tetikleyicileri satır başına çalışmasın; gunluk_ozet sonunda toplu hesaplanır
+            for tablo in OZET_TETIKLEYICILI_TABLOLAR:
+                cursor.execute(sql.SQL("ALTER TABLE {} DISABLE TRIGGER trg_gunluk_ozet").format(
+                    sql.Identifier(tablo)))
+            # Maliyetler de hareket başına değil, defter yüklendikten sonra tek geçişte hesaplanır
+            cursor.execute("ALTER TABLE stok_hareketleri DISABLE TRIGGER trg_maliyet")
+            cursor.execute(sql.SQL("TRUNCATE {}").format(
+                sql.SQL(', ').join(map(sql.Identifier, YEDEK_TABLOLARI + TURETILMIS_TABLOLAR))))
+
+        for dizin, manifest in zip(zincir, manifestler):
+            for tablo in YEDEK_TABLOLARI:
+                bilgi = manifest['tablolar'].get(tablo)
+                if bilgi is None:
+                    # Tablo yedeğin alındığı şema sürümünde yoktu
+                    pass
+                elif bilgi.get('kip') == 'guncelleme':
+                    _guncellemeleri_birlestir(conn, dizin, tablo, bilgi)
+                else:
+                    satir_sayilari[tablo] += _tablo_yukle(conn, dizin, tablo, tablo, bilgi)
+                tamamlanan += 1
+                if ilerleme:
+                    ilerleme(tamamlanan, toplam_adim, tablo)
+
+        with conn.cursor() as cursor:
+            if 'stok_hareketleri' not in manifestler[0]['tablolar']:
+                cursor.execute(ACILIS_HAREKETLERI_SORGUSU)
+                satir_sayilari['stok_hareketleri'] = cursor.rowcount
+        _sayaclari_ayarla(conn, YEDEK_TABLOLARI)
+        with conn.cursor() as cursor:
+            for tablo in GUNCELLENEN_TABLOLAR:
+                cursor.execute(sql.SQL("SELECT COUNT(*) FROM {}").format(sql.Identifier(tablo)))
+                satir_sayilari[tablo] = cursor.fetchone()[0]
+            for ifade in GUNLUK_OZET_DOLDUR:
+                cursor.execute(ifade)
+            for tablo in OZET_TETIKLEYICILI_TABLOLAR:
+                cursor.execute(sql.SQL("ALTER TABLE {} ENABLE TRIGGER trg_gunluk_ozet").format(
+                    sql.Identifier(tablo)))
+            cursor.execute("SELECT maliyetleri_yeniden_hesapla()")
+            cursor.execute("ALTER TABLE stok_hareketleri ENABLE TRIGGER trg_maliyet")
+
+    db.onbellekleri_temizle()
+    return satir_sayilari